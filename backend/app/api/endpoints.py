@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks, Query
+from fastapi.responses import StreamingResponse, FileResponse, Response
 import asyncio
-from typing import List, Dict, Any, Optional
-import io
+from typing import List, Dict, Any, Optional, AsyncIterator
 import os
 import tempfile
 from ..models.schemas import (
     ChatRequest, ChatResponse, WebScrapeRequest, WebScrapeResponse,
     VoiceRequest, VoiceResponse, TaskRequest, TaskResponse
 )
+from ..core.services import services, get_ai_service, get_voice_service, get_web_scraper
+from ..core.concurrency import OverloadedError
+from ..core.config import settings
+from .websocket import manager
+from .web_results import build_crawler, summarize_result, iter_scrape_results, iter_search_results, stream_events
 from ..services.ai_service import AdvancedAIService
 from ..services.web_scraping import WebScrapingService
 from ..services.voice_service import VoiceService
@@ -16,12 +20,41 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-# Initialize services
-ai_service = AdvancedAIService()
-voice_service = VoiceService()
-
 router = APIRouter()
 
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+async def start_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Wait for the first chunk, so failures still become an HTTP error, then stream it and the rest"""
+    first = await chunks.__anext__()
+    
+    async def replay():
+        yield first
+        async for chunk in chunks:
+            yield chunk
+    
+    return replay()
+
+async def speech_response(voice_service: VoiceService, text: str, voice: Optional[str] = None, speed: Optional[int] = None,
+                          headers: Optional[Dict[str, str]] = None) -> Response:
+    """Cached speech straight from memory or disk, otherwise a WAV streamed while it renders"""
+    try:
+        cached = voice_service.cached_speech(text, voice, speed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if isinstance(cached, str):
+        return FileResponse(cached, media_type="audio/wav", headers=headers)
+    if cached is not None:
+        return Response(cached, media_type="audio/wav", headers=headers)
+    
+    try:
+        audio_stream = await start_stream(voice_service.stream_speech(text, voice, speed))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"TTS error: {str(e)}")
+    return StreamingResponse(audio_stream, media_type="audio/wav", headers=headers)
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -29,13 +62,13 @@ async def health_check():
         "status": "healthy",
         "services": {
             "ai": "available",
-            "voice": voice_service.get_status(),
+            "voice": services.voice_service.get_status() if services.is_initialized("voice_service") else "not_initialized",
             "web_scraping": "available"
         }
     }
 
 @router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, ai_service: AdvancedAIService = Depends(get_ai_service)):
     """Main chat endpoint with enhanced AI capabilities"""
     try:
         result = await ai_service.chat(
@@ -46,12 +79,18 @@ async def chat(request: ChatRequest):
         
         return ChatResponse(**result)
         
+    except OverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Chat error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/chat/voice")
-async def voice_chat(audio_file: UploadFile = File(...)):
+async def voice_chat(
+    audio_file: UploadFile = File(...),
+    ai_service: AdvancedAIService = Depends(get_ai_service),
+    voice_service: VoiceService = Depends(get_voice_service)
+):
     """Voice chat endpoint - speech to text, process, text to speech"""
     try:
         # Read audio data
@@ -71,17 +110,10 @@ async def voice_chat(audio_file: UploadFile = File(...)):
             context={"input_type": "voice"}
         )
         
-        # Convert response to speech
-        tts_result = await voice_service.text_to_speech(ai_result["response"])
-        if not tts_result.get("success"):
-            raise HTTPException(status_code=500, detail=tts_result.get("error"))
-        
-        # Return audio response
-        audio_stream = io.BytesIO(tts_result["audio_data"])
-        
-        return StreamingResponse(
-            audio_stream,
-            media_type="audio/wav",
+        # Convert response to speech: cached, or streamed sentence by sentence while the rest render
+        return await speech_response(
+            voice_service,
+            ai_result["response"],
             headers={
                 "X-User-Message": user_message,
                 "X-AI-Response": ai_result["response"][:100] + "..." if len(ai_result["response"]) > 100 else ai_result["response"]
@@ -90,13 +122,23 @@ async def voice_chat(audio_file: UploadFile = File(...)):
         
     except HTTPException:
         raise
+    except OverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Voice chat error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    """Upload and process files (PDF, text, etc.)"""
+async def upload_file(
+    file: UploadFile = File(...),
+    session_id: Optional[str] = None,
+    ai_service: AdvancedAIService = Depends(get_ai_service)
+):
+    """Upload and process files (PDF, text, etc.)
+
+    Pass the WebSocket ``session_id`` to receive ``upload_progress`` frames
+    while the file is parsed, embedded and indexed.
+    """
     try:
         # Check file type
         file_extension = file.filename.split('.')[-1].lower()
@@ -108,20 +150,42 @@ async def upload_file(file: UploadFile = File(...)):
                 detail=f"File type not supported. Allowed: {', '.join(allowed_extensions)}"
             )
         
-        # Save file temporarily
+        # Stream the upload to disk in chunks instead of buffering it in memory
+        file_size = 0
         with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{file_extension}') as temp_file:
-            content = await file.read()
-            temp_file.write(content)
             temp_file_path = temp_file.name
+            while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > settings.MAX_FILE_SIZE:
+                    break
+                temp_file.write(chunk)
         
         try:
+            if file_size > settings.MAX_FILE_SIZE:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File too large. Maximum size is {settings.MAX_FILE_SIZE} bytes"
+                )
+            
+            async def report_progress(event: Dict[str, Any]):
+                await manager.send_personal_message({
+                    "type": "upload_progress",
+                    "file_name": file.filename,
+                    **event
+                }, session_id)
+            
             # Process file with AI service
-            result = await ai_service.process_file(temp_file_path, file_extension)
+            result = await ai_service.process_file(
+                temp_file_path,
+                file_extension,
+                progress=report_progress if session_id else None,
+                file_name=file.filename
+            )
             
             return {
                 "filename": file.filename,
                 "file_type": file_extension,
-                "file_size": len(content),
+                "file_size": file_size,
                 "processed": result["success"],
                 "summary": result["summary"],
                 "details": result
@@ -139,91 +203,136 @@ async def upload_file(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/web/scrape", response_model=List[WebScrapeResponse])
-async def scrape_web(request: WebScrapeRequest):
-    """Scrape web content from URLs"""
+async def scrape_web(request: WebScrapeRequest, scraper: WebScrapingService = Depends(get_web_scraper)):
+    """Scrape web content from URLs, or crawl from them when ``crawl`` is set"""
     try:
-        async with WebScrapingService() as scraper:
-            if isinstance(request.url, str):
-                # Single URL
-                result = await scraper.scrape_url(
-                    request.url,
-                    extract_links=request.extract_links,
-                    extract_images=request.extract_images
-                )
-                return [WebScrapeResponse(**result)]
-            else:
-                # Multiple URLs
-                urls = request.url if isinstance(request.url, list) else [request.url]
-                results = await scraper.scrape_multiple(
-                    urls[:request.max_pages],
-                    extract_links=request.extract_links,
-                    extract_images=request.extract_images
-                )
-                return [WebScrapeResponse(**result) for result in results]
-                
+        if request.crawl:
+            # Breadth-first crawl following extracted links
+            urls = request.url if isinstance(request.url, list) else [request.url]
+            results = await build_crawler(scraper, request).crawl(
+                urls,
+                extract_links=request.extract_links,
+                extract_images=request.extract_images
+            )
+            return [WebScrapeResponse(**result) for result in results]
+        elif isinstance(request.url, str):
+            # Single URL
+            result = await scraper.scrape_url(
+                request.url,
+                extract_links=request.extract_links,
+                extract_images=request.extract_images
+            )
+            return [WebScrapeResponse(**result)]
+        else:
+            # Multiple URLs
+            results = await scraper.scrape_multiple(
+                request.url[:request.max_pages],
+                extract_links=request.extract_links,
+                extract_images=request.extract_images
+            )
+            return [WebScrapeResponse(**result) for result in results]
+            
     except Exception as e:
         logger.error(f"Web scraping error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/web/scrape/stream")
+async def scrape_web_stream(
+    request: WebScrapeRequest,
+    stream_format: str = Query("ndjson", alias="format", pattern="^(ndjson|sse)$"),
+    scraper: WebScrapingService = Depends(get_web_scraper)
+):
+    """Streaming /web/scrape: one event per page as soon as it is scraped (NDJSON or SSE)"""
+    return StreamingResponse(
+        stream_events(iter_scrape_results(scraper, request), stream_format),
+        media_type=STREAM_MEDIA_TYPES[stream_format]
+    )
+
+@router.get("/web/scrape/stream")
+async def scrape_web_stream_get(
+    url: List[str] = Query([]),
+    max_pages: int = 1,
+    extract_links: bool = True,
+    extract_images: bool = False,
+    crawl: bool = False,
+    max_depth: int = 1,
+    stream_format: str = Query("sse", alias="format", pattern="^(ndjson|sse)$"),
+    scraper: WebScrapingService = Depends(get_web_scraper)
+):
+    """/web/scrape/stream for EventSource, which can only GET: the request fields as query parameters (SSE by default)"""
+    if not url:
+        raise HTTPException(status_code=422, detail="At least one url query parameter is required")
+    request = WebScrapeRequest(
+        url=url,
+        max_pages=max_pages,
+        extract_links=extract_links,
+        extract_images=extract_images,
+        crawl=crawl,
+        max_depth=max_depth
+    )
+    return await scrape_web_stream(request, stream_format, scraper)
+
 @router.post("/web/search")
-async def search_web(query: str, num_results: int = 3):
+async def search_web(
+    query: str,
+    num_results: int = 3,
+    ai_service: AdvancedAIService = Depends(get_ai_service),
+    scraper: WebScrapingService = Depends(get_web_scraper)
+):
     """Search the web and scrape results"""
     try:
-        async with WebScrapingService() as scraper:
-            results = await scraper.search_and_scrape(query, num_results)
-            
-            # Process results with AI for better summaries
-            processed_results = []
-            for result in results:
-                if result.get("content"):
-                    # Create a summary using AI
-                    summary_request = f"Summarize this web content in 2-3 sentences: {result['content'][:1000]}"
-                    ai_summary = await ai_service.chat(
-                        message=summary_request,
-                        session_id="web_search",
-                        context={"task": "summarization"}
-                    )
-                    
-                    processed_results.append({
-                        **result,
-                        "ai_summary": ai_summary["response"],
-                        "relevance_score": 0.8  # Simple scoring
-                    })
-                else:
-                    processed_results.append(result)
-            
-            return {
-                "query": query,
-                "results": processed_results,
-                "total_found": len(processed_results)
-            }
-            
+        results = await scraper.search_and_scrape(query, num_results)
+        
+        # Summarise all results concurrently, outside any chat session
+        processed_results = await asyncio.gather(*(summarize_result(ai_service, result) for result in results))
+        
+        return {
+            "query": query,
+            "results": processed_results,
+            "total_found": len(processed_results)
+        }
+        
+    except OverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Web search error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/web/search/stream")
+async def search_web_stream(
+    query: str,
+    num_results: int = 3,
+    stream_format: str = Query("ndjson", alias="format", pattern="^(ndjson|sse)$"),
+    ai_service: AdvancedAIService = Depends(get_ai_service),
+    scraper: WebScrapingService = Depends(get_web_scraper)
+):
+    """Streaming /web/search: each result is emitted once scraped and summarised (NDJSON or SSE)"""
+    return StreamingResponse(
+        stream_events(iter_search_results(scraper, ai_service, query, num_results), stream_format, query=query),
+        media_type=STREAM_MEDIA_TYPES[stream_format]
+    )
+
+@router.get("/web/search/stream")
+async def search_web_stream_get(
+    query: str,
+    num_results: int = 3,
+    stream_format: str = Query("sse", alias="format", pattern="^(ndjson|sse)$"),
+    ai_service: AdvancedAIService = Depends(get_ai_service),
+    scraper: WebScrapingService = Depends(get_web_scraper)
+):
+    """/web/search/stream for EventSource, which can only GET (SSE by default)"""
+    return await search_web_stream(query, num_results, stream_format, ai_service, scraper)
+
 @router.post("/voice/tts")
-async def text_to_speech(request: VoiceRequest):
-    """Convert text to speech"""
+async def text_to_speech(request: VoiceRequest, voice_service: VoiceService = Depends(get_voice_service)):
+    """Convert text to speech, served from the audio cache or streamed as a WAV sentence by sentence"""
     try:
-        result = await voice_service.text_to_speech(
-            text=request.text,
+        return await speech_response(
+            voice_service,
+            request.text,
             voice=request.voice,
-            speed=request.speed
-        )
-        
-        if not result.get("success"):
-            raise HTTPException(status_code=500, detail=result.get("error"))
-        
-        audio_stream = io.BytesIO(result["audio_data"])
-        
-        return StreamingResponse(
-            audio_stream,
-            media_type=f"audio/{result['format']}",
-            headers={
-                "Content-Disposition": "attachment; filename=speech.wav",
-                "X-Duration": str(result.get("duration", 0))
-            }
+            speed=request.speed,
+            headers={"Content-Disposition": "attachment; filename=speech.wav"}
         )
         
     except HTTPException:
@@ -233,7 +342,7 @@ async def text_to_speech(request: VoiceRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/voice/stt")
-async def speech_to_text(audio_file: UploadFile = File(...)):
+async def speech_to_text(audio_file: UploadFile = File(...), voice_service: VoiceService = Depends(get_voice_service)):
     """Convert speech to text"""
     try:
         audio_data = await audio_file.read()
@@ -245,6 +354,7 @@ async def speech_to_text(audio_file: UploadFile = File(...)):
         return {
             "text": result["text"],
             "confidence": result.get("confidence", 0.0),
+            "rtf": result.get("rtf"),
             "success": True
         }
         
@@ -255,7 +365,7 @@ async def speech_to_text(audio_file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/voice/voices")
-async def get_voices():
+async def get_voices(voice_service: VoiceService = Depends(get_voice_service)):
     """Get available TTS voices"""
     return voice_service.get_available_voices()
 
@@ -297,7 +407,7 @@ async def calculate(expression: str):
         }
 
 @router.get("/knowledge/summary")
-async def get_knowledge_summary():
+async def get_knowledge_summary(ai_service: AdvancedAIService = Depends(get_ai_service)):
     """Get summary of current knowledge base"""
     try:
         summary = await ai_service.get_knowledge_summary()
@@ -306,6 +416,24 @@ async def get_knowledge_summary():
         logger.error(f"Knowledge summary error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/knowledge/sources")
+async def list_knowledge_sources(ai_service: AdvancedAIService = Depends(get_ai_service)):
+    """List uploaded files in the knowledge base"""
+    try:
+        return {"sources": await asyncio.get_running_loop().run_in_executor(None, ai_service.list_sources)}
+    except Exception as e:
+        logger.error(f"Knowledge sources error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/knowledge/sources/{source_id}")
+async def delete_knowledge_source(source_id: str, ai_service: AdvancedAIService = Depends(get_ai_service)):
+    """Remove an uploaded file from the knowledge base"""
+    result = await ai_service.delete_source(source_id)
+    if not result["success"]:
+        status_code = 404 if result["error"].startswith("Unknown source") else 500
+        raise HTTPException(status_code=status_code, detail=result["error"])
+    return result
+
 @router.post("/tasks/automate")
 async def create_automation_task(request: TaskRequest, background_tasks: BackgroundTasks):
     """Create automated tasks"""
@@ -360,5 +488,9 @@ async def get_stats():
         "web_pages_scraped": 0,   # Would track in database
         "voice_interactions": 0,  # Would track in database
         "uptime": "0 days",       # Would calculate actual uptime
-        "version": "2.0.0"
+        "version": "2.0.0",
+        "ai": services.ai_service.get_stats() if services.is_initialized("ai_service") else None,
+        "http_pool": services.http_pool.get_stats() if services.is_initialized("http_pool") else None,
+        "page_cache": services.page_cache.get_stats() if services.is_initialized("page_cache") else None,
+        "html_extractor": services.html_extractor.get_stats() if services.is_initialized("html_extractor") else None
     }
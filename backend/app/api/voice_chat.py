@@ -0,0 +1,185 @@
+import asyncio
+import json
+import time
+from typing import Dict, Any, Optional, List, Tuple
+import logging
+
+from fastapi import WebSocket
+
+from ..core.concurrency import OverloadedError
+from ..services.tts import SPEECH_BOUNDARY, split_for_speech
+from ..services.vad import EnergyVad, VAD_SPEECH_START
+
+logger = logging.getLogger(__name__)
+
+# Spoken conversation over a WebSocket: PCM in, transcripts, text and audio out
+
+def take_sentences(text: str, max_chars: int = 300) -> Tuple[List[str], str]:
+    """Split streamed text into the sentences that are complete so far and the unfinished rest"""
+    end = 0
+    for match in SPEECH_BOUNDARY.finditer(text):
+        end = match.end()
+    return split_for_speech(text[:end], max_chars), text[end:]
+
+class VoiceSession:
+    """One client's voice conversation.
+
+    The client streams 16-bit mono PCM as binary frames. Voice activity
+    detection cuts the stream into utterances, and each one is sent for
+    transcription the moment it ends, even while an earlier reply is still
+    playing. Replies run one at a time, in the order they were spoken: the
+    transcript is sent, the reply streams as chat_delta frames, and each
+    sentence is synthesised as soon as it is complete. Sentences go back in
+    order as a voice_audio frame followed by a binary frame holding that
+    sentence's WAV, while the rest of the reply is still being generated.
+    """
+
+    def __init__(self, websocket: WebSocket, session_id: str, ai_service, voice_service):
+        self.websocket = websocket
+        self.session_id = session_id
+        self.ai_service = ai_service
+        self.voice_service = voice_service
+        self.sample_rate = 16000
+        self.voice: Optional[str] = None
+        self.speed: Optional[int] = None
+        self.vad = EnergyVad.from_settings(self.sample_rate)
+        # Voice frames come in pairs (metadata, then audio), so sends are serialised
+        self._send_lock = asyncio.Lock()
+        self._turns: asyncio.Queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run_turns())
+
+    def start(self, sample_rate: int = 16000, voice: Optional[str] = None, speed: Optional[int] = None):
+        """Begin a PCM stream; an utterance left open by a previous stream ends first"""
+        self.finish()
+        self.sample_rate = sample_rate
+        self.voice = voice
+        self.speed = speed
+        self.vad = EnergyVad.from_settings(sample_rate)
+
+    async def send_json(self, message: Dict[str, Any]):
+        async with self._send_lock:
+            await self.websocket.send_text(json.dumps(message))
+
+    async def feed(self, pcm: bytes):
+        """Audio from the client; cheap enough to run in the receive loop"""
+        for event, utterance in self.vad.feed(pcm):
+            if event == VAD_SPEECH_START:
+                await self.send_json({"type": "speech_start"})
+            else:
+                self._add_turn(utterance, self.sample_rate)
+
+    def add_utterance(self, audio: bytes, sample_rate: int = 0):
+        """A whole utterance at once: PCM at ``sample_rate``, or an audio file when it is 0"""
+        self._add_turn(audio, sample_rate)
+
+    def finish(self):
+        """The client stopped streaming; the utterance in progress ends here"""
+        utterance = self.vad.flush()
+        if utterance:
+            self._add_turn(utterance, self.sample_rate)
+
+    def _add_turn(self, audio: bytes, sample_rate: int):
+        ended = time.perf_counter()
+        # Transcription starts now; only the reply waits for earlier turns
+        transcript = asyncio.ensure_future(self.voice_service.stt.transcribe(audio, sample_rate))
+        self._turns.put_nowait((ended, transcript))
+
+    async def _run_turns(self):
+        while True:
+            ended, transcript = await self._turns.get()
+            try:
+                await self._reply(ended, await transcript)
+            except asyncio.CancelledError:
+                raise
+            except OverloadedError:
+                await self.send_json({
+                    "type": "error",
+                    "content": "I'm handling a lot of requests right now. Please try again in a moment."
+                })
+            except Exception as e:
+                logger.error(f"Voice turn error: {str(e)}")
+                await self.send_json({"type": "error", "content": "Sorry, I encountered an error processing your speech."})
+
+    async def _reply(self, ended: float, transcript: Dict[str, Any]):
+        timings = {"transcript_ms": (time.perf_counter() - ended) * 1000}
+        if not transcript.get("success"):
+            await self.send_json({"type": "transcript", "success": False, "error": transcript.get("error"), **timings})
+            return
+        await self.send_json({
+            "type": "transcript",
+            "success": True,
+            "content": transcript["text"],
+            "confidence": transcript.get("confidence"),
+            "rtf": transcript.get("rtf"),
+            **timings
+        })
+
+        speech: asyncio.Queue = asyncio.Queue()
+        speaker = asyncio.create_task(self._speak(speech, ended, timings))
+        try:
+            streamed = ""
+            pending = ""
+            async for frame in self.ai_service.chat_stream(
+                message=transcript["text"],
+                session_id=self.session_id,
+                context={"input_type": "voice"}
+            ):
+                if frame["type"] == "chat_delta":
+                    streamed += frame["content"]
+                    sentences, pending = take_sentences(pending + frame["content"])
+                else:
+                    content = frame["content"]
+                    if content.startswith(streamed):
+                        sentences = split_for_speech(pending + content[len(streamed):])
+                    else:
+                        # An apology after an error, rather than the end of what was streamed
+                        sentences = split_for_speech(content)
+                for sentence in sentences:
+                    speech.put_nowait(self._synthesize(sentence))
+                await self.send_json(frame)
+            speech.put_nowait(None)
+            await speaker
+        finally:
+            speaker.cancel()
+            # On a disconnect or a failed reply, sentences still queued would render in the shared
+            # TTS pool for audio nobody hears, delaying every other session's first audio
+            while not speech.empty():
+                item = speech.get_nowait()
+                if item is not None:
+                    item[1].cancel()
+
+    def _synthesize(self, sentence: str) -> Tuple[str, asyncio.Future]:
+        # Started right away, so later sentences render while earlier ones are sent
+        return sentence, asyncio.ensure_future(self.voice_service.text_to_speech(sentence, self.voice, self.speed))
+
+    async def _speak(self, speech: asyncio.Queue, ended: float, timings: Dict[str, float]):
+        sequence = 0
+        while True:
+            item = await speech.get()
+            if item is None:
+                break
+            sentence, future = item
+            result = await future
+            if not result.get("success"):
+                logger.error(f"Voice reply TTS error: {result.get('error')}")
+                continue
+            if sequence == 0:
+                timings["first_audio_ms"] = (time.perf_counter() - ended) * 1000
+            async with self._send_lock:
+                await self.websocket.send_text(json.dumps({
+                    "type": "voice_audio",
+                    "sequence": sequence,
+                    "text": sentence,
+                    "format": result["format"],
+                    "duration": result["duration"]
+                }))
+                await self.websocket.send_bytes(result["audio_data"])
+            sequence += 1
+        await self.send_json({"type": "voice_done", "sentences": sequence, **timings})
+
+    def close(self):
+        # Cancels the turn in progress as well: its reply stops and its queued sentences are dropped
+        self._worker.cancel()
+        while not self._turns.empty():
+            _, transcript = self._turns.get_nowait()
+            transcript.cancel()
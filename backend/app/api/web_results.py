@@ -0,0 +1,81 @@
+import json
+from typing import Dict, Any, AsyncIterator
+import logging
+
+from ..core.config import settings
+from ..core.services import services
+from ..models.schemas import WebScrapeRequest
+from ..services.crawler import Crawler
+from ..services.web_scraping import WebScrapingService
+
+logger = logging.getLogger(__name__)
+
+# Web results shared by the REST endpoints (batch and streaming) and the WebSocket
+
+def build_crawler(scraper: WebScrapingService, request: WebScrapeRequest) -> Crawler:
+    return Crawler(
+        scraper,
+        max_pages=min(request.max_pages, settings.MAX_SCRAPE_PAGES),
+        max_depth=min(request.max_depth, settings.CRAWL_MAX_DEPTH),
+        concurrency=settings.CRAWL_CONCURRENCY,
+        same_host=settings.CRAWL_SAME_HOST,
+        robots=services.robots_cache if settings.CRAWL_RESPECT_ROBOTS else None,
+        rate_limiter=services.host_rate_limiter
+    )
+
+async def summarize_result(ai_service, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach an AI summary to a scraped search result"""
+    if not result.get("content"):
+        return result
+
+    return {
+        **result,
+        "ai_summary": await ai_service.summarize(result["content"]),
+        "relevance_score": 0.8  # Simple scoring
+    }
+
+async def iter_scrape_results(scraper: WebScrapingService, request: WebScrapeRequest) -> AsyncIterator[Dict[str, Any]]:
+    """Scrape (or crawl) the requested URLs, yielding pages in completion order"""
+    urls = request.url if isinstance(request.url, list) else [request.url]
+    if request.crawl:
+        pages = build_crawler(scraper, request).iter_crawl(
+            urls,
+            extract_links=request.extract_links,
+            extract_images=request.extract_images
+        )
+    else:
+        pages = scraper.iter_scrape(
+            urls[:request.max_pages],
+            extract_links=request.extract_links,
+            extract_images=request.extract_images
+        )
+    async for page in pages:
+        yield page
+
+async def iter_search_results(scraper: WebScrapingService, ai_service, query: str, num_results: int) -> AsyncIterator[Dict[str, Any]]:
+    """Search and yield each result once it is both scraped and summarised"""
+    async for result in scraper.iter_search_and_scrape(
+        query,
+        num_results,
+        process=lambda result: summarize_result(ai_service, result)
+    ):
+        yield result
+
+def format_event(event: Dict[str, Any], stream_format: str) -> str:
+    """One NDJSON line, or one Server-Sent Event named after the event type"""
+    data = json.dumps(event, default=str)
+    if stream_format == "sse":
+        return f"event: {event['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+async def stream_events(results: AsyncIterator[Dict[str, Any]], stream_format: str, **done_fields) -> AsyncIterator[str]:
+    """Wrap results as ``result`` events followed by one ``done`` (or ``error``) event"""
+    total = 0
+    try:
+        async for result in results:
+            total += 1
+            yield format_event({"type": "result", "result": result}, stream_format)
+        yield format_event({"type": "done", "total": total, **done_fields}, stream_format)
+    except Exception as e:
+        logger.error(f"Web result stream error: {str(e)}")
+        yield format_event({"type": "error", "content": str(e), "total": total}, stream_format)
@@ -0,0 +1,149 @@
+from fastapi import WebSocket
+import base64
+import json
+from typing import Dict
+import logging
+
+from ..core.services import services, get_web_scraper
+from ..core.concurrency import OverloadedError
+from ..models.schemas import WebScrapeRequest
+from .web_results import iter_scrape_results, iter_search_results
+from .voice_chat import VoiceSession
+
+logger = logging.getLogger(__name__)
+
+# WebSocket connection manager for real-time chat
+class ConnectionManager:
+    def __init__(self):
+        self.active_connections: Dict[str, WebSocket] = {}
+        self.voice_sessions: Dict[str, VoiceSession] = {}
+
+    @property
+    def ai_service(self):
+        return services.ai_service
+
+    @property
+    def voice_service(self):
+        return services.voice_service
+
+    async def connect(self, websocket: WebSocket, session_id: str):
+        await websocket.accept()
+        self.active_connections[session_id] = websocket
+        logger.info(f"WebSocket connection established: {session_id}")
+
+    def disconnect(self, session_id: str):
+        voice_session = self.voice_sessions.pop(session_id, None)
+        if voice_session is not None:
+            voice_session.close()
+        if session_id in self.active_connections:
+            del self.active_connections[session_id]
+            logger.info(f"WebSocket connection closed: {session_id}")
+
+    async def send_personal_message(self, message: dict, session_id: str):
+        if session_id in self.active_connections:
+            websocket = self.active_connections[session_id]
+            await websocket.send_text(json.dumps(message))
+
+    def _voice_session(self, session_id: str) -> VoiceSession:
+        voice_session = self.voice_sessions.get(session_id)
+        if voice_session is None:
+            voice_session = VoiceSession(self.active_connections[session_id], session_id, self.ai_service, self.voice_service)
+            self.voice_sessions[session_id] = voice_session
+        return voice_session
+
+    async def handle_audio(self, data: bytes, session_id: str):
+        """Binary frames: PCM for the session's voice conversation"""
+        voice_session = self.voice_sessions.get(session_id)
+        if voice_session is None:
+            await self.send_personal_message({
+                "type": "error",
+                "content": "Send a voice message with action \"start\" before streaming audio."
+            }, session_id)
+            return
+        await voice_session.feed(data)
+
+    async def handle_message(self, message: dict, session_id: str):
+        """Handle incoming WebSocket messages"""
+        try:
+            message_type = message.get("type", "chat")
+            content = message.get("content", "")
+            
+            if message_type == "chat" and message.get("stream"):
+                # Streaming chat: chat_delta frames as tokens arrive, then chat_done
+                async for frame in self.ai_service.chat_stream(
+                    message=content,
+                    session_id=session_id,
+                    context=message.get("context")
+                ):
+                    await self.send_personal_message(frame, session_id)
+                
+            elif message_type == "chat":
+                # Regular chat message
+                response = await self.ai_service.chat(
+                    message=content,
+                    session_id=session_id,
+                    context=message.get("context")
+                )
+                
+                await self.send_personal_message({
+                    "type": "chat_response",
+                    "content": response["response"],
+                    "metadata": response.get("metadata", {}),
+                    "suggestions": response.get("suggestions", [])
+                }, session_id)
+                
+            elif message_type in ("web_search", "web_scrape"):
+                # Web results as web_result frames in completion order, then web_done
+                scraper = await get_web_scraper()
+                if message_type == "web_search":
+                    results = iter_search_results(scraper, self.ai_service, content, int(message.get("num_results", 3)))
+                else:
+                    request = WebScrapeRequest(**{"url": content, **message.get("options", {})})
+                    results = iter_scrape_results(scraper, request)
+                
+                total = 0
+                async for result in results:
+                    total += 1
+                    await self.send_personal_message({"type": "web_result", "result": result}, session_id)
+                await self.send_personal_message({"type": "web_done", "total": total}, session_id)
+                
+            elif message_type == "voice":
+                # "start" opens a conversation fed by binary 16-bit mono PCM frames, "stop" ends it;
+                # a message with base64 audio content (a WAV file) is one whole utterance
+                action = message.get("action")
+                if action == "start":
+                    try:
+                        self.voice_service.check_voice(message.get("voice"))
+                    except ValueError as e:
+                        await self.send_personal_message({"type": "error", "content": str(e)}, session_id)
+                        return
+                    voice_session = self._voice_session(session_id)
+                    voice_session.start(int(message.get("sample_rate", 16000)), message.get("voice"), message.get("speed"))
+                    await voice_session.send_json({"type": "voice_ready", "sample_rate": voice_session.sample_rate})
+                elif action == "stop":
+                    voice_session = self.voice_sessions.get(session_id)
+                    if voice_session is not None:
+                        voice_session.finish()
+                elif content:
+                    self._voice_session(session_id).add_utterance(base64.b64decode(content))
+                
+            elif message_type == "typing":
+                # Handle typing indicators
+                await self.send_personal_message({
+                    "type": "typing_response",
+                    "content": "I'm thinking..."
+                }, session_id)
+                
+        except OverloadedError:
+            await self.send_personal_message({
+                "type": "error",
+                "content": "I'm handling a lot of requests right now. Please try again in a moment."
+            }, session_id)
+        except Exception as e:
+            logger.error(f"Error handling WebSocket message: {str(e)}")
+            await self.send_personal_message({
+                "type": "error",
+                "content": "Sorry, I encountered an error processing your message."
+            }, session_id)
+
+manager = ConnectionManager()
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional, Dict, Any
+
+class OverloadedError(Exception):
+    """Raised when a limiter's wait queue is full or a slot is not granted in time"""
+
+class ReadWriteLock:
+    """Many readers or one writer, for state shared between worker threads.
+
+    Blocking, so take it inside executor threads rather than on the event
+    loop. A waiting writer holds back new readers, so a steady stream of
+    searches cannot starve an upload.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writing or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._writers_waiting += 1
+            try:
+                while self._writing or self._readers:
+                    self._condition.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+class ConcurrencyLimiter:
+    """Caps the number of concurrent calls and bounds how many callers may queue for a slot.
+
+    Callers beyond ``max_queue`` are rejected immediately instead of piling up
+    on the event loop, which gives the API backpressure under load.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: Optional[float] = None):
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._active = 0
+        self._waiting = 0
+        self._rejected = 0
+        self._completed = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore is None:
+            # Created lazily so it binds to the running loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        if self._semaphore.locked():
+            if self._waiting >= self.max_queue:
+                self._rejected += 1
+                raise OverloadedError(f"{self.name} queue is full ({self.max_queue} waiting)")
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._rejected += 1
+                raise OverloadedError(f"Timed out waiting for a {self.name} slot")
+            finally:
+                self._waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self._active += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._completed += 1
+            self._semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "waiting": self._waiting,
+            "completed": self._completed,
+            "rejected": self._rejected
+        }
@@ -25,9 +25,55 @@ class Settings(BaseSettings):
     DEFAULT_MODEL: str = "gpt-3.5-turbo"
     MAX_TOKENS: int = 2000
     TEMPERATURE: float = 0.7
+    FAKE_LLM: bool = False  # Offline canned-token model for benchmarks
+    FAKE_LLM_TOKEN_DELAY: float = 0.05  # Seconds between streamed tokens
+    LLM_MAX_CONCURRENCY: int = 8  # Concurrent LLM/RAG calls per worker
+    LLM_MAX_QUEUE: int = 100  # Requests allowed to wait for a slot before rejecting
+    LLM_QUEUE_TIMEOUT: float = 30.0  # Seconds a request may wait for a slot
+    
+    # Conversation memory settings
+    MEMORY_MAX_SESSIONS: int = 1000  # Sessions kept resident in process (LRU)
+    MEMORY_SESSION_TTL: int = 1800  # Idle seconds before a session is spilled
+    MEMORY_MAX_HISTORY_TOKENS: int = 1500  # History budget per prompt
+    MEMORY_MAX_TURNS: int = 20  # Exchanges stored per session
+    MEMORY_SPILL_BACKEND: str = "database"  # "database", "redis" or "local"
+    MEMORY_SPILL_TTL: int = 7 * 24 * 3600  # Expiry of spilled sessions in Redis
+    
+    # Response cache settings
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_SIZE: int = 1000  # Cached answers (LRU)
+    RESPONSE_CACHE_TTL: int = 3600  # Seconds before a cached answer expires
+    RESPONSE_CACHE_SIMILARITY: float = 0.92  # Cosine threshold for near-duplicate questions
+    RESPONSE_CACHE_FIRST_TURN_ONLY: bool = True  # Only cache questions asked without prior history
+    
+    # Summarisation
+    SUMMARY_INPUT_CHARS: int = 1000  # Characters of each document sent to the LLM
+    SUMMARY_CACHE_SIZE: int = 1000  # Cached summaries by content hash (LRU)
+    UPLOAD_SUMMARY_SENTENCES: int = 5  # Sentences in the extractive summary of each upload
+    
+    # Knowledge base settings
+    KNOWLEDGE_BASE_COMPACT_SEGMENTS: int = 16  # Segments appended before compaction
+    VECTOR_INDEX_TYPE: str = "flat"  # "flat", "ivfpq" or "hnsw"
+    VECTOR_INDEX_TRAIN_THRESHOLD: int = 50000  # Chunks before switching from flat to VECTOR_INDEX_TYPE
+    IVF_NLIST: int = 0  # IVF centroids, 0 = ~4*sqrt(chunks)
+    IVF_NPROBE: int = 16  # Centroids scanned per query (recall vs speed)
+    PQ_M: int = 48  # PQ sub-quantizers (reduced to a divisor of the embedding size)
+    PQ_NBITS: int = 8  # Bits per PQ code
+    HNSW_M: int = 32  # Graph neighbours per node
+    HNSW_EF_CONSTRUCTION: int = 200
+    HNSW_EF_SEARCH: int = 64  # Candidate list size per query (recall vs speed)
+    
+    # Embedding Cache
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = "cache/embeddings.db"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 200000  # Cached vectors (LRU), ~1.5KB each at 384 dims
     
     # File upload settings
     MAX_FILE_SIZE: int = 50 * 1024 * 1024  # 50MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # Bytes copied to disk per read
+    INGEST_WORKERS: int = 0  # PDF parsing processes, 0 = one per CPU
+    INGEST_PAGES_PER_TASK: int = 25  # PDF pages parsed per worker task
+    INGEST_EMBED_BATCH_SIZE: int = 64  # Chunks per embedding call
     ALLOWED_EXTENSIONS: List[str] = [
         "pdf", "txt", "docx", "xlsx", "csv", 
         "jpg", "jpeg", "png", "gif", "mp3", "wav"
@@ -36,10 +82,45 @@ class Settings(BaseSettings):
     # Web scraping settings
     MAX_SCRAPE_PAGES: int = 10
     SCRAPE_TIMEOUT: int = 30
+    HTTP_USER_AGENT: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    HTTP_POOL_LIMIT: int = 100  # Open connections across all hosts
+    HTTP_POOL_LIMIT_PER_HOST: int = 10  # Open connections per host
+    HTTP_KEEPALIVE_TIMEOUT: float = 30.0  # Seconds an idle connection is kept for reuse
+    HTTP_DNS_CACHE_TTL: int = 300  # Seconds DNS answers are cached
+    CRAWL_MAX_DEPTH: int = 3  # Upper bound on a crawl request's max_depth
+    CRAWL_CONCURRENCY: int = 8  # Pages fetched at once per crawl
+    CRAWL_HOST_RATE: float = 2.0  # Requests per second per host
+    CRAWL_HOST_BURST: int = 4  # Requests a host may receive back to back
+    CRAWL_SAME_HOST: bool = True  # Only follow links to the start URLs' hosts
+    CRAWL_RESPECT_ROBOTS: bool = True
+    CRAWL_USER_AGENT: str = "DariusAI/1.0 (+https://github.com/Jinish2170/Web-Assistant-AI)"  # Sent by the crawler; robots.txt is read for its product token
+    ROBOTS_CACHE_TTL: int = 3600  # Seconds a fetched robots.txt is reused
+    HTML_PARSER: str = "lxml"  # "html.parser", "lxml" or "selectolax" (optional dependency)
+    HTML_PARSE_WORKERS: int = 0  # HTML extraction processes, 0 = one per CPU
+    PAGE_CACHE_ENABLED: bool = True  # Reuse scraped pages per Cache-Control/ETag/Last-Modified
+    PAGE_CACHE_PATH: str = "cache/pages.db"
+    PAGE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # Extracted results kept on disk (LRU)
+    PAGE_CACHE_MAX_AGE: int = 7 * 24 * 3600  # Seconds since last fetch before an entry is dropped
     
     # Voice settings
-    TTS_ENGINE: str = "pyttsx3"  # or "openai" for better quality
+    TTS_ENGINE: str = "pyttsx3"  # "pyttsx3" or "stub" (offline tone generator for benchmarks)
+    TTS_WORKERS: int = 2  # Synthesis processes, each with its own engine
+    TTS_CHUNK_CHARS: int = 300  # Longest piece of text rendered at once; sentences are split past this
+    TTS_CACHE_ENABLED: bool = True  # Serve repeated phrases without re-synthesising them
+    TTS_CACHE_DIR: str = "cache/tts"
+    TTS_CACHE_MEMORY_BYTES: int = 32 * 1024 * 1024  # Most recently used clips kept in memory (LRU)
+    TTS_CACHE_DISK_BYTES: int = 512 * 1024 * 1024  # Clips kept on disk (LRU)
     DEFAULT_VOICE_SPEED: int = 150
+    STT_ENGINE: str = "google"  # "google", "vosk" (offline, optional dependency) or "stub" (for benchmarks)
+    STT_MODEL_PATH: str = "models/vosk-model-small-en-us-0.15"  # Vosk model directory
+    STT_WORKERS: int = 2  # Recognition processes, each with its own engine
+    STT_BATCH_SIZE: int = 8  # Most utterances decoded in one worker call
+    STT_BATCH_WINDOW: float = 0.02  # Seconds an utterance waits for others to batch with
+    VAD_FRAME_MS: int = 20  # Voice activity detection frame length for WebSocket voice chat
+    VAD_ENERGY_THRESHOLD: float = 500.0  # Lowest RMS (16-bit samples) that counts as speech
+    VAD_START_MS: int = 60  # Speech needed to start an utterance
+    VAD_END_SILENCE_MS: int = 500  # Silence that ends an utterance; lower replies sooner but cuts pauses
+    VAD_MAX_UTTERANCE_SECONDS: float = 15.0
     
     # CORS settings
     BACKEND_CORS_ORIGINS: List[str] = [
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from typing import Optional, Dict, Any
+import aiohttp
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+class HttpClientPool:
+    """One app-lifetime aiohttp session with a bounded, keep-alive connection pool.
+
+    Outbound requests share its connector, so repeated calls to the same host
+    reuse open TCP/TLS connections and cached DNS answers instead of paying
+    for a handshake and a lookup every time. The session is created lazily
+    on the running event loop and closed on application shutdown.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10, keepalive_timeout: float = 30.0,
+                 dns_cache_ttl: int = 300, timeout: float = 30.0, headers: Optional[Dict[str, str]] = None):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = timeout
+        self.headers = headers or {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.sessions_created = 0
+
+    @classmethod
+    def from_settings(cls) -> "HttpClientPool":
+        return cls(
+            limit=settings.HTTP_POOL_LIMIT,
+            limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+            dns_cache_ttl=settings.HTTP_DNS_CACHE_TTL,
+            timeout=settings.SCRAPE_TIMEOUT,
+            headers={"User-Agent": settings.HTTP_USER_AGENT}
+        )
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=self.headers
+            )
+            self.sessions_created += 1
+        return self._session
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "open": self._session is not None and not self._session.closed,
+            "sessions_created": self.sessions_created
+        }
+
+    async def aclose(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            # Let the transports finish closing before the loop goes away
+            await asyncio.sleep(0)
+        self._session = None
@@ -0,0 +1,110 @@
+import inspect
+import threading
+import logging
+from typing import Any, Callable, Dict
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+class ServiceContainer:
+    """Process-wide registry of the heavy services.
+
+    Each service is built once, on first access, and shared by the REST router
+    and the WebSocket manager so they see the same knowledge base, memory and
+    audio engines.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instances: Dict[str, Any] = {}
+
+    def _get_or_create(self, name: str, factory: Callable[[], Any]) -> Any:
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    logger.info(f"Initializing {name}")
+                    instance = factory()
+                    self._instances[name] = instance
+        return instance
+
+    @property
+    def ai_service(self):
+        from ..services.ai_service import AdvancedAIService
+        return self._get_or_create("ai_service", AdvancedAIService)
+
+    @property
+    def http_pool(self):
+        from .http import HttpClientPool
+        return self._get_or_create("http_pool", HttpClientPool.from_settings)
+
+    @property
+    def page_cache(self):
+        from ..services.page_cache import PageCache
+        return self._get_or_create("page_cache", PageCache.from_settings)
+
+    @property
+    def html_extractor(self):
+        from ..services.html_extract import HtmlExtractor
+        return self._get_or_create("html_extractor", HtmlExtractor.from_settings)
+
+    @property
+    def robots_cache(self):
+        from ..services.crawler import RobotsCache
+        return self._get_or_create("robots_cache", RobotsCache.from_settings)
+
+    @property
+    def host_rate_limiter(self):
+        from ..services.crawler import HostRateLimiter
+        return self._get_or_create("host_rate_limiter", HostRateLimiter.from_settings)
+
+    @property
+    def voice_service(self):
+        from ..services.voice_service import VoiceService
+        return self._get_or_create("voice_service", VoiceService)
+
+    def is_initialized(self, name: str) -> bool:
+        return name in self._instances
+
+    async def startup(self):
+        """Hook for the application lifespan; services stay lazy until first use"""
+        logger.info("Service container ready")
+
+    async def shutdown(self):
+        """Release services on application shutdown"""
+        with self._lock:
+            instances = list(self._instances.items())
+            self._instances.clear()
+        for name, instance in reversed(instances):
+            close = getattr(instance, "aclose", None) or getattr(instance, "close", None)
+            if close is None:
+                continue
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+                logger.info(f"Released {name}")
+            except Exception as e:
+                logger.error(f"Error releasing {name}: {str(e)}")
+
+services = ServiceContainer()
+
+# FastAPI dependencies
+def get_ai_service():
+    return services.ai_service
+
+def get_voice_service():
+    return services.voice_service
+
+async def get_http_session():
+    return await services.http_pool.get_session()
+
+async def get_web_scraper():
+    """A scraper on the shared connection pool, page cache and HTML extractor"""
+    from ..services.web_scraping import WebScrapingService
+    return WebScrapingService(
+        session=await services.http_pool.get_session(),
+        page_cache=services.page_cache if settings.PAGE_CACHE_ENABLED else None,
+        extractor=services.html_extractor
+    )
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, Text, Float
+from ..core.database import Base
+
+class ConversationMemory(Base):
+    """Conversation history of a session that was evicted from the in-process memory store"""
+    __tablename__ = "conversation_memory"
+
+    session_id = Column(String(255), primary_key=True)
+    messages = Column(Text, nullable=False)  # JSON list of {"role", "content"}
+    updated_at = Column(Float, nullable=False)
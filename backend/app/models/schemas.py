@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from datetime import datetime
 from enum import Enum
 
@@ -66,17 +66,19 @@ class FileUploadResponse(BaseModel):
 
 # Web scraping models
 class WebScrapeRequest(BaseModel):
-    url: str
+    url: Union[str, List[str]]
     max_pages: int = 1
     extract_links: bool = True
     extract_images: bool = False
+    crawl: bool = False  # Follow extracted links breadth-first
+    max_depth: int = 1  # Link hops from the start URLs when crawling
 
 class WebScrapeResponse(BaseModel):
     url: str
     title: Optional[str] = None
     content: str
-    links: Optional[List[str]] = None
-    images: Optional[List[str]] = None
+    links: Optional[List[Dict[str, Any]]] = None
+    images: Optional[List[Dict[str, Any]]] = None
     metadata: Optional[Dict[str, Any]] = None
 
 # Task automation models
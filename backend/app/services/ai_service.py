@@ -1,18 +1,29 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
+from collections import OrderedDict
+import asyncio
+import hashlib
 import openai
 from langchain.llms import OpenAI
 from langchain.chat_models import ChatOpenAI
 from langchain.schema import HumanMessage, AIMessage, SystemMessage
-from langchain.memory import ConversationBufferWindowMemory
 from langchain.chains import ConversationalRetrievalChain
 from langchain.vectorstores import FAISS
-from langchain.embeddings import OpenAIEmbeddings, HuggingFaceEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.document_loaders import PyPDFLoader, TextLoader
+from langchain.embeddings import OpenAIEmbeddings, HuggingFaceEmbeddings, FakeEmbeddings
 import pickle
 import os
+import re
 import logging
 from ..core.config import settings
+from ..core.concurrency import ConcurrencyLimiter, OverloadedError, ReadWriteLock
+from .fake_llm import FakeStreamingChatModel
+from .memory_store import SessionMemoryStore
+from .response_cache import ResponseCache
+from .knowledge_store import KnowledgeStore, LockedRetriever
+from .vector_index import VectorIndexConfig
+from .ingestion import IngestionPipeline, ProgressCallback
+from .embedding_cache import CachedEmbeddings
+from .content_registry import ContentRegistry, REGISTRY_NAME, hash_file, hash_chunk
+from .summarizer import summarize
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +35,13 @@ class AdvancedAIService:
         self.temperature = settings.TEMPERATURE
         
         # Initialize embeddings
-        if self.openai_api_key:
+        if settings.FAKE_LLM:
+            # Offline benchmarking mode, no model downloads or API calls
+            self.embeddings = FakeEmbeddings(size=384)
+            self.llm = FakeStreamingChatModel(token_delay=settings.FAKE_LLM_TOKEN_DELAY)
+            self.model_name = "fake-streaming-chat"
+            logger.warning("FAKE_LLM enabled, responses are simulated")
+        elif self.openai_api_key:
             self.embeddings = OpenAIEmbeddings(openai_api_key=self.openai_api_key)
             self.llm = ChatOpenAI(
                 openai_api_key=self.openai_api_key,
@@ -38,16 +55,58 @@ class AdvancedAIService:
             self.llm = None
             logger.warning("No OpenAI API key provided, using local embeddings only")
         
-        # Initialize memory and vector store
-        self.memory = ConversationBufferWindowMemory(
-            memory_key="chat_history",
-            return_messages=True,
-            k=10  # Remember last 10 exchanges
+        # Persist computed vectors so identical text is never embedded twice
+        if settings.EMBEDDING_CACHE_ENABLED:
+            self.embeddings = CachedEmbeddings(
+                self.embeddings,
+                settings.EMBEDDING_CACHE_PATH,
+                max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES
+            )
+        
+        # Initialize per-session memory and vector store
+        self.memory_store = SessionMemoryStore.from_settings()
+        
+        # Cache of answers to repeated questions, invalidated by kb_version
+        self.kb_version = 0
+        self.response_cache = ResponseCache(
+            embeddings=self.embeddings,
+            max_entries=settings.RESPONSE_CACHE_SIZE,
+            ttl=settings.RESPONSE_CACHE_TTL,
+            similarity_threshold=settings.RESPONSE_CACHE_SIMILARITY
+        ) if settings.RESPONSE_CACHE_ENABLED else None
+        
+        # Bounded concurrency for LLM calls so a burst of chats queues with backpressure
+        self.llm_limiter = ConcurrencyLimiter(
+            "LLM",
+            max_concurrent=settings.LLM_MAX_CONCURRENCY,
+            max_queue=settings.LLM_MAX_QUEUE,
+            queue_timeout=settings.LLM_QUEUE_TIMEOUT
         )
         
+        # Summaries by content hash; identical pages are summarised once
+        self._summary_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._summary_inflight: Dict[str, asyncio.Future] = {}
+        self.summary_stats = {"hits": 0, "misses": 0}
+        
         self.vector_store = None
         self.qa_chain = None
         self.knowledge_base_path = "knowledge_base"
+        self.knowledge_store = KnowledgeStore(
+            self.knowledge_base_path,
+            compact_segments=settings.KNOWLEDGE_BASE_COMPACT_SEGMENTS,
+            index_config=VectorIndexConfig.from_settings()
+        )
+        self.ingestion = IngestionPipeline(
+            workers=settings.INGEST_WORKERS,
+            pages_per_task=settings.INGEST_PAGES_PER_TASK,
+            embed_batch_size=settings.INGEST_EMBED_BATCH_SIZE
+        )
+        # File and chunk fingerprints, so re-uploaded content is not embedded twice
+        self.content_registry = ContentRegistry(os.path.join(self.knowledge_base_path, REGISTRY_NAME))
+        # Serialises index mutation and segment writes across concurrent uploads
+        self._kb_lock = asyncio.Lock()
+        # Searches read the live index while uploads and deletions change it in place
+        self._index_lock = ReadWriteLock()
         
         # Load existing knowledge base
         self.load_knowledge_base()
@@ -68,6 +127,18 @@ class AdvancedAIService:
     async def chat(self, message: str, session_id: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Enhanced chat function with context awareness and multiple AI capabilities"""
         try:
+            # Serve repeated questions without an LLM round trip
+            cacheable = await self._is_cacheable(session_id)
+            cached, query_vector = await self.response_cache.get(message, self.kb_version) if cacheable else (None, None)
+            if cached:
+                await self.memory_store.add_exchange(session_id, message, cached["response"])
+                return {
+                    "response": cached["response"],
+                    "session_id": session_id,
+                    "metadata": {**self._response_metadata(context), "cache": cached["cache"]},
+                    "suggestions": cached["suggestions"]
+                }
+            
             # Check if we have a knowledge base to query
             if self.qa_chain and self.vector_store:
                 # Use retrieval-augmented generation
@@ -79,20 +150,23 @@ class AdvancedAIService:
                 # Fallback to rule-based responses
                 response = await self._fallback_response(message, session_id)
             
+            await self.memory_store.add_exchange(session_id, message, response)
+            
             # Add metadata and suggestions
             response_data = {
                 "response": response,
                 "session_id": session_id,
-                "metadata": {
-                    "model_used": self.model_name if self.llm else "fallback",
-                    "has_knowledge_base": self.vector_store is not None,
-                    "context_used": context is not None
-                },
+                "metadata": self._response_metadata(context),
                 "suggestions": self._generate_suggestions(message, response)
             }
             
+            if cacheable:
+                await self._cache_store(message, response, response_data["suggestions"], query_vector)
+            
             return response_data
             
+        except OverloadedError:
+            raise
         except Exception as e:
             logger.error(f"Error in chat: {str(e)}")
             return {
@@ -102,14 +176,191 @@ class AdvancedAIService:
                 "suggestions": ["Try rephrasing your question", "Check your internet connection"]
             }
     
+    async def chat_stream(self, message: str, session_id: str, context: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming variant of chat: yields chat_delta frames as tokens arrive, then one chat_done frame"""
+        tokens = []
+        try:
+            cacheable = await self._is_cacheable(session_id)
+            cached, query_vector = await self.response_cache.get(message, self.kb_version) if cacheable else (None, None)
+            if cached:
+                await self.memory_store.add_exchange(session_id, message, cached["response"])
+                yield {"type": "chat_delta", "content": cached["response"]}
+                yield {
+                    "type": "chat_done",
+                    "content": cached["response"],
+                    "session_id": session_id,
+                    "metadata": {**self._response_metadata(context), "cache": cached["cache"]},
+                    "suggestions": cached["suggestions"]
+                }
+                return
+            
+            if self.vector_store and self.llm:
+                stream = self._rag_stream(message, session_id)
+            elif self.llm:
+                stream = self._direct_llm_stream(message, session_id)
+            else:
+                stream = self._fallback_stream(message, session_id)
+            
+            async for token in stream:
+                if not token:
+                    continue
+                tokens.append(token)
+                yield {"type": "chat_delta", "content": token}
+            
+            response = "".join(tokens)
+            suggestions = self._generate_suggestions(message, response)
+            await self.memory_store.add_exchange(session_id, message, response)
+            if cacheable:
+                await self._cache_store(message, response, suggestions, query_vector)
+            yield {
+                "type": "chat_done",
+                "content": response,
+                "session_id": session_id,
+                "metadata": self._response_metadata(context),
+                "suggestions": suggestions
+            }
+            
+        except OverloadedError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in chat stream: {str(e)}")
+            yield {
+                "type": "chat_done",
+                "content": "".join(tokens) or "I apologize, but I encountered an error processing your request. Please try again.",
+                "session_id": session_id,
+                "metadata": {"error": str(e)},
+                "suggestions": ["Try rephrasing your question", "Check your internet connection"]
+            }
+    
+    async def summarize(self, text: str) -> str:
+        """Summarise one document in 2-3 sentences, outside any chat session.
+
+        Goes straight to the LLM without conversation memory, shares the LLM
+        concurrency limit, and caches by content hash. Concurrent requests for
+        the same content share one LLM call, so callers can simply gather
+        many summaries at once.
+        """
+        text = text[:settings.SUMMARY_INPUT_CHARS]
+        key = hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+        
+        cached = self._summary_cache.get(key)
+        if cached is not None:
+            self._summary_cache.move_to_end(key)
+            self.summary_stats["hits"] += 1
+            return cached
+        inflight = self._summary_inflight.get(key)
+        if inflight is not None:
+            self.summary_stats["hits"] += 1
+            return await asyncio.shield(inflight)
+        
+        self.summary_stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._summary_inflight[key] = future
+        try:
+            summary, cacheable = await self._generate_summary(text)
+            if cacheable:
+                self._summary_cache[key] = summary
+                while len(self._summary_cache) > settings.SUMMARY_CACHE_SIZE:
+                    self._summary_cache.popitem(last=False)
+            future.set_result(summary)
+            return summary
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters see the exception; mark it retrieved so it is not logged twice
+            future.exception()
+            raise
+        finally:
+            del self._summary_inflight[key]
+    
+    async def _generate_summary(self, text: str):
+        """Returns (summary, cacheable); LLM failures degrade to an extractive summary that is not cached"""
+        if self.llm:
+            try:
+                messages = [
+                    SystemMessage(content="You write faithful, concise summaries of web pages and documents."),
+                    HumanMessage(content=f"Summarize this web content in 2-3 sentences: {text}")
+                ]
+                async with self.llm_limiter.slot():
+                    response = await self.llm.ainvoke(messages)
+                return response.content, True
+            except OverloadedError:
+                logger.warning("LLM busy, using an extractive summary")
+            except Exception as e:
+                logger.error(f"Summary error: {str(e)}")
+        return summarize(text, 3, max_chars=500), not self.llm
+    
+    async def _is_cacheable(self, session_id: str) -> bool:
+        """Cached answers are only safe when they cannot depend on earlier turns"""
+        if self.response_cache is None or not self.llm:
+            return False
+        if settings.RESPONSE_CACHE_FIRST_TURN_ONLY:
+            return not await self.memory_store.has_history(session_id)
+        return True
+    
+    async def _cache_store(self, message: str, response: str, suggestions: List[str], query_vector):
+        # LLM failures degrade to rule-based answers; never cache those
+        if response == await self._fallback_response(message, ""):
+            return
+        self.response_cache.put(message, self.kb_version, {"response": response, "suggestions": suggestions}, query_vector)
+    
+    def _response_metadata(self, context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "model_used": self.model_name if self.llm else "fallback",
+            "has_knowledge_base": self.vector_store is not None,
+            "context_used": context is not None
+        }
+    
+    async def _rag_stream(self, message: str, session_id: str) -> AsyncIterator[str]:
+        """Stream a RAG answer: retrieve context first, then stream the LLM over it"""
+        try:
+            docs = await self._retriever().aget_relevant_documents(message)
+        except Exception as e:
+            logger.error(f"RAG retrieval error: {str(e)}")
+            docs = []
+        
+        context = "\n\n".join(doc.page_content for doc in docs)
+        system_prompt = self.system_prompt
+        if context:
+            system_prompt += f"\n\nUse the following context from the knowledge base when it is relevant:\n{context}"
+        
+        messages = [
+            SystemMessage(content=system_prompt),
+            *await self.memory_store.get_messages(session_id),
+            HumanMessage(content=message)
+        ]
+        async with self.llm_limiter.slot():
+            async for chunk in self.llm.astream(messages):
+                yield chunk.content
+    
+    async def _direct_llm_stream(self, message: str, session_id: str) -> AsyncIterator[str]:
+        """Stream a direct LLM response token by token"""
+        messages = [
+            SystemMessage(content=self.system_prompt),
+            *await self.memory_store.get_messages(session_id),
+            HumanMessage(content=message)
+        ]
+        async with self.llm_limiter.slot():
+            async for chunk in self.llm.astream(messages):
+                yield chunk.content
+    
+    async def _fallback_stream(self, message: str, session_id: str) -> AsyncIterator[str]:
+        """Rule-based responses are instant, stream them word by word for a uniform protocol"""
+        response = await self._fallback_response(message, session_id)
+        for token in re.findall(r"\S+\s*", response):
+            yield token
+    
     async def _rag_response(self, message: str, session_id: str) -> str:
         """Retrieval-Augmented Generation response"""
         if not self.qa_chain:
             return await self._direct_llm_response(message, session_id)
         
         try:
-            result = self.qa_chain({"question": message, "chat_history": []})
+            chat_history = await self.memory_store.get_history_pairs(session_id)
+            async with self.llm_limiter.slot():
+                result = await self.qa_chain.acall({"question": message, "chat_history": chat_history})
             return result["answer"]
+        except OverloadedError:
+            raise
         except Exception as e:
             logger.error(f"RAG response error: {str(e)}")
             return await self._direct_llm_response(message, session_id)
@@ -122,11 +373,15 @@ class AdvancedAIService:
         try:
             messages = [
                 SystemMessage(content=self.system_prompt),
+                *await self.memory_store.get_messages(session_id),
                 HumanMessage(content=message)
             ]
             
-            response = self.llm(messages)
+            async with self.llm_limiter.slot():
+                response = await self.llm.ainvoke(messages)
             return response.content
+        except OverloadedError:
+            raise
         except Exception as e:
             logger.error(f"LLM response error: {str(e)}")
             return await self._fallback_response(message, session_id)
@@ -177,45 +432,80 @@ class AdvancedAIService:
         
         return suggestions[:3]  # Return top 3 suggestions
     
-    async def process_file(self, file_path: str, file_type: str) -> Dict[str, Any]:
+    async def process_file(self, file_path: str, file_type: str, progress: Optional[ProgressCallback] = None, file_name: Optional[str] = None) -> Dict[str, Any]:
         """Process uploaded files and add to knowledge base"""
+        file_name = file_name or os.path.basename(file_path)
         try:
-            # Load document based on type
-            if file_type == "pdf":
-                loader = PyPDFLoader(file_path)
-            elif file_type in ["txt", "md"]:
-                loader = TextLoader(file_path, encoding="utf-8")
-            else:
-                raise ValueError(f"Unsupported file type: {file_type}")
+            loop = asyncio.get_running_loop()
             
-            # Load and split documents
-            documents = loader.load()
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=1000,
-                chunk_overlap=200
-            )
-            splits = text_splitter.split_documents(documents)
+            # Identical files are recognised before any parsing or embedding
+            source_id = await loop.run_in_executor(None, hash_file, file_path)
+            known_source = await loop.run_in_executor(None, self.content_registry.get_source, source_id)
+            if known_source:
+                return {
+                    "success": True,
+                    "duplicate": True,
+                    "source_id": source_id,
+                    "summary": f"{file_name} is already in the knowledge base",
+                    "chunks_processed": 0,
+                    "chunks_skipped": known_source["chunks"],
+                    "file_name": file_name
+                }
             
-            # Add to vector store
-            if self.vector_store is None:
-                self.vector_store = FAISS.from_documents(splits, self.embeddings)
-            else:
-                self.vector_store.add_documents(splits)
+            # Parse (page-parallel for PDFs) and split off the event loop
+            documents = await self.ingestion.load_documents(file_path, file_type, progress)
+            splits = await self.ingestion.split(documents)
+            if not splits:
+                raise ValueError("No text content found in file")
             
-            # Update QA chain
-            self._update_qa_chain()
+            # Only chunks not seen in this file or any earlier one are embedded
+            chunk_hashes = [hash_chunk(doc.page_content) for doc in splits]
+            known = await loop.run_in_executor(None, self.content_registry.known_chunks, set(chunk_hashes))
+            docs_by_hash: Dict[str, Any] = {}
+            for chunk_hash, doc in zip(chunk_hashes, splits):
+                docs_by_hash.setdefault(chunk_hash, doc)
+            new_chunks = {chunk_hash: doc for chunk_hash, doc in docs_by_hash.items() if chunk_hash not in known}
             
-            # Save knowledge base
-            self.save_knowledge_base()
+            # Embed in batches; the vectors are both indexed and appended to the segment log
+            texts = [doc.page_content for doc in new_chunks.values()]
+            vectors = await self.ingestion.embed(self.embeddings, texts, progress)
+            
+            # Bulk insert, persist and register the source in one step
+            await self.ingestion.report(progress, "indexing", 0, len(new_chunks))
+            async with self._kb_lock:
+                # A source deleted since the snapshot may have taken chunks it counted as indexed; embed those now
+                still_known = await loop.run_in_executor(None, self.content_registry.known_chunks, set(known))
+                gone = [chunk_hash for chunk_hash in known if chunk_hash not in still_known]
+                if gone:
+                    vectors = vectors + await self.ingestion.embed(
+                        self.embeddings, [docs_by_hash[chunk_hash].page_content for chunk_hash in gone]
+                    )
+                    new_chunks.update((chunk_hash, docs_by_hash[chunk_hash]) for chunk_hash in gone)
+                inserted = await loop.run_in_executor(
+                    None, self._insert_chunks, list(new_chunks.values()), vectors, list(new_chunks.keys())
+                )
+                await loop.run_in_executor(
+                    None, self.content_registry.add_source, source_id, file_name, chunk_hashes, inserted
+                )
+            await self.ingestion.report(progress, "indexing", len(new_chunks), len(new_chunks))
             
             # Generate summary
-            summary = f"Processed {len(splits)} chunks from {os.path.basename(file_path)}"
+            skipped = len(splits) - len(inserted)
+            summary = f"Processed {len(inserted)} chunks from {file_name}"
+            if skipped:
+                summary += f" ({skipped} duplicate chunks skipped)"
+            text = "\n\n".join(doc.page_content for doc in documents)
+            document_summary = await loop.run_in_executor(None, summarize, text, settings.UPLOAD_SUMMARY_SENTENCES)
             
             return {
                 "success": True,
+                "duplicate": False,
+                "source_id": source_id,
                 "summary": summary,
-                "chunks_processed": len(splits),
-                "file_name": os.path.basename(file_path)
+                "document_summary": document_summary,
+                "chunks_processed": len(inserted),
+                "chunks_skipped": skipped,
+                "file_name": file_name
             }
             
         except Exception as e:
@@ -223,34 +513,117 @@ class AdvancedAIService:
             return {
                 "success": False,
                 "error": str(e),
-                "summary": f"Failed to process {os.path.basename(file_path)}"
+                "summary": f"Failed to process {file_name}"
             }
     
+    def _insert_chunks(self, splits, vectors: List[List[float]], chunk_hashes: List[str]) -> Dict[str, str]:
+        """Add embedded chunks to the index and append them to the segment log.
+
+        Returns the vector store id of every inserted chunk by hash. Chunks a
+        concurrent upload indexed while these were being embedded are dropped.
+        """
+        known = self.content_registry.known_chunks(chunk_hashes)
+        if known:
+            keep = [i for i, chunk_hash in enumerate(chunk_hashes) if chunk_hash not in known]
+            splits = [splits[i] for i in keep]
+            vectors = [vectors[i] for i in keep]
+            chunk_hashes = [chunk_hashes[i] for i in keep]
+        if not splits:
+            return {}
+        
+        if self.vector_store is None:
+            self.vector_store = self.knowledge_store.create_vector_store(self.embeddings, len(vectors[0]))
+        with self._index_lock.write():
+            ids = self.vector_store.add_embeddings(
+                [(doc.page_content, vector) for doc, vector in zip(splits, vectors)],
+                metadatas=[doc.metadata for doc in splits]
+            )
+        
+        # Update QA chain; cached answers from the old corpus no longer match
+        self._update_qa_chain()
+        self.kb_version += 1
+        
+        # Persist only the new chunks
+        self.knowledge_store.append(ids, splits, vectors)
+        if self.knowledge_store.needs_compaction() or self.knowledge_store.needs_index_upgrade(self.vector_store.index):
+            self.save_knowledge_base()
+        return dict(zip(chunk_hashes, ids))
+    
+    async def delete_source(self, source_id: str) -> Dict[str, Any]:
+        """Remove an uploaded file's chunks unless another source still references them"""
+        try:
+            loop = asyncio.get_running_loop()
+            async with self._kb_lock:
+                removed = await loop.run_in_executor(None, self._delete_source, source_id)
+            if removed is None:
+                return {"success": False, "error": f"Unknown source: {source_id}"}
+            return {"success": True, "source_id": source_id, "chunks_removed": removed}
+        except Exception as e:
+            logger.error(f"Source deletion error: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    def _delete_source(self, source_id: str) -> Optional[int]:
+        doc_ids = self.content_registry.orphaned_chunks(source_id)
+        if doc_ids is None:
+            return None
+        
+        if doc_ids:
+            self.knowledge_store.delete(doc_ids)
+            if self.vector_store is not None:
+                try:
+                    with self._index_lock.write():
+                        indexed = set(self.vector_store.index_to_docstore_id.values())
+                        self.vector_store.delete([doc_id for doc_id in doc_ids if doc_id in indexed])
+                except RuntimeError:
+                    # HNSW cannot remove vectors; compact the tombstones away and swap in the reloaded store
+                    self.knowledge_store.compact()
+                    self.vector_store = self.knowledge_store.load(self.embeddings)
+                self._update_qa_chain()
+            self.kb_version += 1
+        
+        # The registry goes last: if removing the chunks fails, the source is still listed and can be deleted again
+        self.content_registry.remove_source(source_id)
+        if doc_ids and self.knowledge_store.needs_compaction():
+            self.knowledge_store.compact()
+        return len(doc_ids)
+    
+    def list_sources(self) -> List[Dict[str, Any]]:
+        return self.content_registry.list_sources()
+    
+    def _retriever(self) -> LockedRetriever:
+        return LockedRetriever(vectorstore=self.vector_store, lock=self._index_lock)
+    
     def _update_qa_chain(self):
         """Update the QA chain with current vector store"""
         if self.vector_store and self.llm:
             self.qa_chain = ConversationalRetrievalChain.from_llm(
                 self.llm,
-                self.vector_store.as_retriever(),
-                memory=self.memory,
+                self._retriever(),
                 return_source_documents=True
             )
     
     def save_knowledge_base(self):
-        """Save the vector store to disk"""
-        if self.vector_store:
-            os.makedirs(self.knowledge_base_path, exist_ok=True)
-            self.vector_store.save_local(self.knowledge_base_path)
+        """Compact the on-disk segment log; new chunks are persisted as they are added"""
+        self.knowledge_store.compact()
+        if self.vector_store and self.knowledge_store.needs_index_upgrade(self.vector_store.index):
+            # The corpus crossed the training threshold, switch to the trained index
+            self.vector_store = self.knowledge_store.load(self.embeddings)
+            self._update_qa_chain()
     
     def load_knowledge_base(self):
         """Load existing vector store from disk"""
         try:
-            if os.path.exists(self.knowledge_base_path):
-                self.vector_store = FAISS.load_local(
+            self.vector_store = self.knowledge_store.load(self.embeddings)
+            if self.vector_store is None and os.path.exists(os.path.join(self.knowledge_base_path, "index.faiss")):
+                # Migrate a knowledge base written by FAISS.save_local
+                legacy_store = FAISS.load_local(
                     self.knowledge_base_path, 
                     self.embeddings,
                     allow_dangerous_deserialization=True
                 )
+                self.knowledge_store.import_vector_store(legacy_store)
+                self.vector_store = self.knowledge_store.load(self.embeddings)
+            if self.vector_store:
                 self._update_qa_chain()
                 logger.info("Knowledge base loaded successfully")
         except Exception as e:
@@ -275,3 +648,22 @@ class AdvancedAIService:
             }
         except Exception as e:
             return {"error": str(e), "status": "Error accessing knowledge base"}
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Runtime counters for the stats endpoint"""
+        return {
+            "response_cache": self.response_cache.get_stats() if self.response_cache else {"enabled": False},
+            "memory": self.memory_store.get_stats(),
+            "llm_queue": self.llm_limiter.get_stats(),
+            "summaries": {**self.summary_stats, "cached": len(self._summary_cache)},
+            "content": self.content_registry.get_stats(),
+            "embedding_cache": self.embeddings.get_stats() if isinstance(self.embeddings, CachedEmbeddings) else {"enabled": False}
+        }
+    
+    async def aclose(self):
+        """Persist session memory and stop ingestion workers on shutdown"""
+        await self.memory_store.aclose()
+        self.ingestion.close()
+        self.content_registry.close()
+        if isinstance(self.embeddings, CachedEmbeddings):
+            self.embeddings.close()
@@ -0,0 +1,129 @@
+import hashlib
+import os
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Union
+from ..core.config import settings
+from .tts import VoiceSettings
+
+logger = logging.getLogger(__name__)
+
+class AudioCache:
+    """Content-addressed cache of synthesised speech, in memory and on disk.
+
+    Entries are keyed on everything that changes the audio: text, voice,
+    rate, volume and format. New audio is written to both tiers. The memory tier
+    holds the most recently used clips as ``bytes`` and the disk tier keeps
+    one file per clip so it can be served with a file response; each tier
+    evicts its least recently used entries past its byte budget. The disk
+    tier is rebuilt from the directory on start-up, oldest file first.
+    """
+
+    def __init__(self, directory: str, memory_bytes: int = 32 * 1024 * 1024, disk_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_size = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._load()
+
+    @classmethod
+    def from_settings(cls) -> "AudioCache":
+        return cls(settings.TTS_CACHE_DIR, memory_bytes=settings.TTS_CACHE_MEMORY_BYTES, disk_bytes=settings.TTS_CACHE_DISK_BYTES)
+
+    @staticmethod
+    def key(text: str, voice: VoiceSettings, audio_format: str) -> str:
+        parts = [text, voice.voice or "", str(voice.rate), f"{voice.volume:g}", audio_format]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if len(name) == 64:
+                    stat = os.stat(os.path.join(root, name))
+                    files.append((stat.st_mtime, name, stat.st_size))
+        for _, key, size in sorted(files):
+            self._disk[key] = size
+            self._disk_size += size
+
+    def get(self, key: str) -> Optional[Union[bytes, str]]:
+        """The audio itself from memory, the path of its file on disk, or None"""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return audio
+            if key in self._disk:
+                self._disk.move_to_end(key)
+                path = self._path(key)
+                try:
+                    # mtime orders entries when the index is rebuilt after a restart
+                    now = time.time()
+                    os.utime(path, (now, now))
+                    self.stats["disk_hits"] += 1
+                    return path
+                except FileNotFoundError:
+                    self._disk_size -= self._disk.pop(key)
+            self.stats["misses"] += 1
+            return None
+
+    def read(self, key: str) -> Optional[bytes]:
+        """The audio as bytes from either tier"""
+        entry = self.get(key)
+        if isinstance(entry, str):
+            with open(entry, "rb") as f:
+                return f.read()
+        return entry
+
+    def put(self, key: str, audio: bytes):
+        """Store audio in both tiers; blocking disk I/O, so call it from a worker thread"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(audio)
+        os.replace(temp_path, path)
+
+        evicted = []
+        with self._lock:
+            if len(audio) <= self.memory_bytes:
+                self._memory_size += len(audio) - len(self._memory.pop(key, b""))
+                self._memory[key] = audio
+                while self._memory_size > self.memory_bytes:
+                    _, dropped = self._memory.popitem(last=False)
+                    self._memory_size -= len(dropped)
+
+            self._disk_size += len(audio) - self._disk.pop(key, 0)
+            self._disk[key] = len(audio)
+            while self._disk_size > self.disk_bytes and len(self._disk) > 1:
+                dropped_key, size = self._disk.popitem(last=False)
+                self._disk_size -= size
+                evicted.append(dropped_key)
+
+        for dropped_key in evicted:
+            try:
+                os.unlink(self._path(dropped_key))
+            except FileNotFoundError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_size
+            }
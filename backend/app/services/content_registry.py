@@ -0,0 +1,167 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+from typing import Optional, List, Dict, Any, Iterable
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_NAME = "content.db"
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of the raw file bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while block := f.read(chunk_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+def normalize_chunk_text(text: str) -> str:
+    """Collapse whitespace and case so re-extracted copies of a chunk hash the same"""
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+def hash_chunk(text: str) -> str:
+    return hashlib.sha256(normalize_chunk_text(text).encode("utf-8")).hexdigest()
+
+class ContentRegistry:
+    """Fingerprints of ingested files and chunks, kept in SQLite next to the knowledge base.
+
+    ``sources`` holds one row per ingested file (SHA-256 of its bytes),
+    ``chunks`` maps a normalised-text hash to the vector store id it was
+    indexed under, and ``chunk_refs`` records which sources contain which
+    chunk. A chunk's refcount is the number of sources referencing it, so
+    deleting a source only drops the chunks no other source still needs.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS sources (
+                    source_hash TEXT PRIMARY KEY,
+                    file_name TEXT,
+                    chunk_count INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS chunks (
+                    chunk_hash TEXT PRIMARY KEY,
+                    doc_id TEXT NOT NULL,
+                    refcount INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS chunk_refs (
+                    chunk_hash TEXT NOT NULL,
+                    source_hash TEXT NOT NULL,
+                    PRIMARY KEY (chunk_hash, source_hash)
+                );
+                CREATE INDEX IF NOT EXISTS chunk_refs_source ON chunk_refs (source_hash);
+            """)
+            self._conn = conn
+        return self._conn
+
+    def get_source(self, source_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT source_hash, file_name, chunk_count, created_at FROM sources WHERE source_hash = ?",
+                (source_hash,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"source_id": row[0], "file_name": row[1], "chunks": row[2], "created_at": row[3]}
+
+    def list_sources(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT source_hash, file_name, chunk_count, created_at FROM sources ORDER BY created_at"
+            ).fetchall()
+        return [{"source_id": row[0], "file_name": row[1], "chunks": row[2], "created_at": row[3]} for row in rows]
+
+    def known_chunks(self, chunk_hashes: Iterable[str]) -> Dict[str, str]:
+        """Map each already indexed chunk hash to its vector store id"""
+        chunk_hashes = list(chunk_hashes)
+        known: Dict[str, str] = {}
+        with self._lock:
+            conn = self._connect()
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(chunk_hashes), 500):
+                batch = chunk_hashes[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT chunk_hash, doc_id FROM chunks WHERE chunk_hash IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                known.update(rows)
+        return known
+
+    def add_source(self, source_hash: str, file_name: str, chunk_hashes: List[str], new_chunks: Dict[str, str]):
+        """Record a source, its newly indexed chunks and a reference to every chunk it contains"""
+        unique_hashes = list(dict.fromkeys(chunk_hashes))
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sources (source_hash, file_name, chunk_count, created_at) VALUES (?, ?, ?, ?)",
+                    (source_hash, file_name, len(unique_hashes), time.time())
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO chunks (chunk_hash, doc_id, refcount) VALUES (?, ?, 0)",
+                    list(new_chunks.items())
+                )
+                for chunk_hash in unique_hashes:
+                    inserted = conn.execute(
+                        "INSERT OR IGNORE INTO chunk_refs (chunk_hash, source_hash) VALUES (?, ?)",
+                        (chunk_hash, source_hash)
+                    ).rowcount
+                    if inserted:
+                        conn.execute("UPDATE chunks SET refcount = refcount + 1 WHERE chunk_hash = ?", (chunk_hash,))
+
+    def orphaned_chunks(self, source_hash: str) -> Optional[List[str]]:
+        """Ids of the chunks only this source references, which removing it would drop; None if unknown"""
+        with self._lock:
+            conn = self._connect()
+            if conn.execute("SELECT 1 FROM sources WHERE source_hash = ?", (source_hash,)).fetchone() is None:
+                return None
+            return [row[0] for row in conn.execute(
+                "SELECT chunks.doc_id FROM chunk_refs JOIN chunks ON chunks.chunk_hash = chunk_refs.chunk_hash "
+                "WHERE chunk_refs.source_hash = ? AND chunks.refcount <= 1",
+                (source_hash,)
+            )]
+
+    def remove_source(self, source_hash: str) -> Optional[List[str]]:
+        """Drop a source; returns the ids of chunks no longer referenced, or None if unknown"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                if conn.execute("DELETE FROM sources WHERE source_hash = ?", (source_hash,)).rowcount == 0:
+                    return None
+                chunk_hashes = [row[0] for row in conn.execute(
+                    "SELECT chunk_hash FROM chunk_refs WHERE source_hash = ?", (source_hash,)
+                )]
+                conn.execute("DELETE FROM chunk_refs WHERE source_hash = ?", (source_hash,))
+                conn.executemany(
+                    "UPDATE chunks SET refcount = refcount - 1 WHERE chunk_hash = ?",
+                    [(chunk_hash,) for chunk_hash in chunk_hashes]
+                )
+                orphaned = [row[0] for row in conn.execute("SELECT doc_id FROM chunks WHERE refcount <= 0")]
+                conn.execute("DELETE FROM chunks WHERE refcount <= 0")
+        return orphaned
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            conn = self._connect()
+            sources = conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+            chunks, references = conn.execute("SELECT COUNT(*), COALESCE(SUM(refcount), 0) FROM chunks").fetchone()
+        return {"sources": sources, "unique_chunks": chunks, "chunk_references": references}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,237 @@
+import asyncio
+import time
+import logging
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple, Set
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from urllib.robotparser import RobotFileParser
+import aiohttp
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+def normalize_url(url: str) -> Optional[str]:
+    """Canonical form used for the seen-set: lowercase scheme and host, no default port, no fragment, sorted query"""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    netloc = host if parts.port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+def robots_agent(user_agent: str) -> str:
+    """The product token robots.txt groups are matched against, e.g. DariusAI for DariusAI/1.0 (+https://...)"""
+    return user_agent.split("/", 1)[0].split(" ", 1)[0] or "*"
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average with bursts of up to ``burst``"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class HostRateLimiter:
+    """One token bucket per host, shared by every crawl so politeness holds across requests"""
+
+    def __init__(self, rate: float = 2.0, burst: int = 4, max_hosts: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_hosts = max_hosts
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    @classmethod
+    def from_settings(cls) -> "HostRateLimiter":
+        return cls(rate=settings.CRAWL_HOST_RATE, burst=settings.CRAWL_HOST_BURST)
+
+    async def acquire(self, url: str, crawl_delay: Optional[float] = None):
+        host = urlsplit(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            # robots.txt Crawl-delay can only slow a host down, never speed it up
+            rate = min(self.rate, 1 / crawl_delay) if crawl_delay else self.rate
+            bucket = TokenBucket(rate, 1 if crawl_delay else self.burst)
+            self._buckets[host] = bucket
+            while len(self._buckets) > self.max_hosts:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(host)
+        await bucket.acquire()
+
+class RobotsCache:
+    """Fetched and parsed robots.txt per origin, reused for ``ttl`` seconds.
+
+    Follows RFC 9309: a missing robots.txt (4xx) allows everything, an
+    unreachable one (5xx or network error) disallows everything until the
+    entry expires. Concurrent lookups for the same origin share one fetch.
+    """
+
+    def __init__(self, ttl: int = 3600, max_entries: int = 1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, asyncio.Future]]" = OrderedDict()
+
+    @classmethod
+    def from_settings(cls) -> "RobotsCache":
+        return cls(ttl=settings.ROBOTS_CACHE_TTL)
+
+    async def _fetch(self, session: aiohttp.ClientSession, origin: str, user_agent: str) -> RobotFileParser:
+        parser = RobotFileParser(f"{origin}/robots.txt")
+        try:
+            async with session.get(f"{origin}/robots.txt", allow_redirects=True, headers={"User-Agent": user_agent}) as response:
+                if response.status >= 500:
+                    parser.disallow_all = True
+                elif response.status >= 400:
+                    parser.allow_all = True
+                else:
+                    parser.parse((await response.text(errors="replace")).splitlines())
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"robots.txt unreachable for {origin}: {str(e)}")
+            parser.disallow_all = True
+        return parser
+
+    async def get(self, session: aiohttp.ClientSession, url: str, user_agent: str) -> RobotFileParser:
+        origin = _origin(url)
+        entry = self._entries.get(origin)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            future = asyncio.ensure_future(self._fetch(session, origin, user_agent))
+            entry = (time.monotonic(), future)
+            self._entries[origin] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return await asyncio.shield(entry[1])
+
+    async def allowed(self, session: aiohttp.ClientSession, url: str, user_agent: str) -> Tuple[bool, Optional[float]]:
+        """Whether ``user_agent`` may fetch ``url``, and the Crawl-delay requested for it"""
+        parser = await self.get(session, url, user_agent)
+        agent = robots_agent(user_agent)
+        delay = parser.crawl_delay(agent)
+        return parser.can_fetch(agent, url), float(delay) if delay else None
+
+class Crawler:
+    """Breadth-first crawl from one or more start URLs.
+
+    Links extracted from each page are followed up to ``max_depth`` hops and
+    ``max_pages`` pages in total. ``concurrency`` workers share one FIFO
+    frontier, so pages are fetched in BFS order. Each fetch waits for its
+    host's token bucket and is checked against robots.txt. A seen-set of
+    normalised URLs keeps each page from being fetched twice. Every request
+    identifies itself with ``user_agent``, the agent robots.txt is read for.
+    """
+
+    def __init__(self, scraper, max_pages: int = 10, max_depth: int = 1, concurrency: int = 8,
+                 same_host: bool = True, robots: Optional[RobotsCache] = None, rate_limiter: Optional[HostRateLimiter] = None,
+                 user_agent: Optional[str] = None):
+        self.scraper = scraper
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.concurrency = max(1, concurrency)
+        self.same_host = same_host
+        self.robots = robots
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.user_agent = user_agent or settings.CRAWL_USER_AGENT
+
+    async def iter_crawl(self, start_urls: List[str], extract_links: bool = True, extract_images: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Yield each page's result as soon as it has been scraped"""
+        frontier: asyncio.Queue = asyncio.Queue()
+        results: asyncio.Queue = asyncio.Queue()
+        seen: Set[str] = set()
+        start_hosts = set()
+        scheduled = 0
+        # Pages skipped for robots.txt do not count towards max_pages
+        refunded = 0
+
+        def schedule(url: str, depth: int):
+            nonlocal scheduled
+            normalized = normalize_url(url)
+            if normalized is None or normalized in seen or scheduled - refunded >= self.max_pages:
+                return
+            if self.same_host and depth > 0 and urlsplit(normalized).netloc not in start_hosts:
+                return
+            seen.add(normalized)
+            scheduled += 1
+            frontier.put_nowait((normalized, depth))
+
+        for url in start_urls:
+            normalized = normalize_url(url)
+            if normalized:
+                start_hosts.add(urlsplit(normalized).netloc)
+            schedule(url, 0)
+
+        async def worker():
+            nonlocal refunded
+            while True:
+                url, depth = await frontier.get()
+                try:
+                    result = await self._fetch(url, depth, schedule, extract_links, extract_images)
+                    if result is None:
+                        refunded += 1
+                    results.put_nowait(result)
+                except Exception as e:
+                    logger.error(f"Crawl error for {url}: {str(e)}")
+                    results.put_nowait({"url": url, "error": str(e), "content": "", "title": None, "metadata": {"depth": depth}})
+                finally:
+                    frontier.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            emitted = 0
+            while emitted < scheduled:
+                result = await results.get()
+                emitted += 1
+                if result is not None:
+                    yield result
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def crawl(self, start_urls: List[str], extract_links: bool = True, extract_images: bool = False) -> List[Dict[str, Any]]:
+        """Crawl and return the pages in the order they were scraped"""
+        return [result async for result in self.iter_crawl(start_urls, extract_links, extract_images)]
+
+    async def _fetch(self, url: str, depth: int, schedule, extract_links: bool, extract_images: bool) -> Optional[Dict[str, Any]]:
+        """Scrape one page and schedule its links; None when robots.txt disallows it"""
+        crawl_delay = None
+        if self.robots is not None:
+            allowed, crawl_delay = await self.robots.allowed(self.scraper.session, url, self.user_agent)
+            if not allowed:
+                logger.info(f"Skipping {url}, disallowed by robots.txt")
+                return None
+
+        await self.rate_limiter.acquire(url, crawl_delay)
+        # Links are always extracted so the crawl can follow them
+        result = await self.scraper.scrape_url(url, extract_links=True, extract_images=extract_images,
+                                               headers={"User-Agent": self.user_agent})
+        result["metadata"] = {**(result.get("metadata") or {}), "depth": depth}
+
+        if depth < self.max_depth:
+            for link in result.get("links", []):
+                schedule(link["url"], depth + 1)
+        if not extract_links:
+            result.pop("links", None)
+        return result
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import logging
+from typing import Optional, List, Dict, Any
+import numpy as np
+from langchain.schema.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+def embedding_model_name(embeddings: Embeddings) -> str:
+    """Identify the model behind an embeddings object; vectors of different models never mix"""
+    for attribute in ("model_name", "model"):
+        value = getattr(embeddings, attribute, None)
+        if isinstance(value, str) and value:
+            return value
+    size = getattr(embeddings, "size", None)
+    return f"{type(embeddings).__name__}-{size}" if size else type(embeddings).__name__
+
+class CachedEmbeddings(Embeddings):
+    """Disk-backed cache in front of an embeddings model.
+
+    Vectors are stored as float32 blobs in SQLite, keyed on SHA-256 of the
+    model name, whether the text was embedded as a document or a query, and
+    the exact text, so re-ingested files, chunks repeated across files and
+    repeated queries are embedded once. Documents and queries never share
+    entries, since many models encode them differently. Only cache misses
+    reach the wrapped model, in a single batch. The table is bounded to
+    ``max_entries``; when it overflows, the least recently used tenth is
+    evicted. The row count is kept in memory, counted once on connect.
+    """
+
+    def __init__(self, embeddings: Embeddings, path: str, max_entries: int = 200000, model_name: Optional[str] = None):
+        self.embeddings = embeddings
+        self.path = path
+        self.max_entries = max_entries
+        self.model_name = model_name or embedding_model_name(embeddings)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._entries = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+            """)
+            self._entries = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def _key(self, kind: str, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            conn = self._connect()
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(unique_keys), 500):
+                batch = unique_keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+            if found:
+                now = time.time()
+                with conn:
+                    conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+        return found
+
+    def _store(self, items: Dict[str, List[float]]):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                # A concurrent miss may have stored the same key already; its vector is identical
+                inserted = conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                    [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items.items()]
+                ).rowcount
+                entries = self._entries + inserted
+                evicted = 0
+                if entries > self.max_entries:
+                    # Evict down to 90% so a full cache does not evict on every insert
+                    evicted = conn.execute(
+                        "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                        (entries - int(self.max_entries * 0.9),)
+                    ).rowcount
+            # Counted only once the transaction has committed
+            self._entries = entries - evicted
+            self.evictions += evicted
+
+    def _embed(self, kind: str, texts: List[str], embed_missing) -> List[List[float]]:
+        keys = [self._key(kind, text) for text in texts]
+        try:
+            found = self._lookup(keys)
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache read failed: {str(e)}")
+            found = {}
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            computed = dict(zip(missing.keys(), embed_missing(list(missing.values()))))
+            found.update(computed)
+            try:
+                self._store(computed)
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache write failed: {str(e)}")
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed("document", texts, self.embeddings.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed("query", [text], lambda missing: [self.embeddings.embed_query(missing[0])])[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        try:
+            with self._lock:
+                self._connect()
+                entries = self._entries
+        except sqlite3.Error:
+            entries = None
+        return {
+            "model": self.model_name,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
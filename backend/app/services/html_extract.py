@@ -0,0 +1,196 @@
+import asyncio
+import os
+import re
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Any
+from urllib.parse import urljoin, urlparse
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARSER_HTML = "html.parser"
+PARSER_LXML = "lxml"
+PARSER_SELECTOLAX = "selectolax"
+
+REMOVED_TAGS = ["script", "style", "nav", "footer", "header"]
+MAIN_CLASS_PATTERN = re.compile(r'content|main|article')
+EXCLUDED_EXTENSIONS = ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.zip', '.rar', '.exe']
+EXCLUDED_DOMAINS = ['facebook.com', 'twitter.com', 'instagram.com', 'tiktok.com']
+EXCLUDED_SEARCH_DOMAINS = ['youtube.com', 'facebook.com', 'twitter.com']
+
+def is_valid_url(url: str) -> bool:
+    """Check if URL is valid and not a file download"""
+    try:
+        parsed = urlparse(url)
+        if not parsed.scheme or not parsed.netloc:
+            return False
+
+        # Skip certain file types
+        if any(url.lower().endswith(ext) for ext in EXCLUDED_EXTENSIONS):
+            return False
+
+        # Skip social media and video sites for content scraping
+        if any(domain in parsed.netloc.lower() for domain in EXCLUDED_DOMAINS):
+            return False
+
+        return True
+    except Exception:
+        return False
+
+def available_parser(parser: str) -> str:
+    """The requested backend if it is installed, otherwise the stdlib html.parser"""
+    try:
+        if parser == PARSER_LXML:
+            import lxml  # noqa: F401
+        elif parser == PARSER_SELECTOLAX:
+            import selectolax  # noqa: F401
+        elif parser != PARSER_HTML:
+            raise ValueError(f"Unknown HTML parser: {parser}")
+        return parser
+    except ImportError:
+        logger.warning(f"HTML parser {parser} is not installed, falling back to {PARSER_HTML}")
+        return PARSER_HTML
+
+def _clean_text(text_content: str) -> str:
+    lines = (line.strip() for line in text_content.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+def _extract_soup(html: str, url: str, extract_links: bool, extract_images: bool, parser: str) -> Dict[str, Any]:
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, parser)
+
+    title = soup.find('title')
+    title_text = title.get_text().strip() if title else None
+
+    # Remove script and style elements
+    for script in soup(REMOVED_TAGS):
+        script.decompose()
+
+    main_content = soup.find('main') or soup.find('article') or soup.find('div', class_=MAIN_CLASS_PATTERN)
+    content = _clean_text(main_content.get_text() if main_content else soup.get_text())
+
+    result = {"url": url, "title": title_text, "content": content, "word_count": len(content.split())}
+    if extract_links:
+        links = []
+        for link in soup.find_all('a', href=True):
+            absolute_url = urljoin(url, link['href'])
+            if is_valid_url(absolute_url):
+                links.append({"url": absolute_url, "text": link.get_text().strip(), "title": link.get('title', '')})
+        result["links"] = links
+    if extract_images:
+        result["images"] = [
+            {"url": urljoin(url, img['src']), "alt": img.get('alt', ''), "title": img.get('title', '')}
+            for img in soup.find_all('img', src=True)
+        ]
+    return result
+
+def _extract_selectolax(html: str, url: str, extract_links: bool, extract_images: bool) -> Dict[str, Any]:
+    from selectolax.lexbor import LexborHTMLParser
+    tree = LexborHTMLParser(html)
+
+    title = tree.css_first('title')
+    title_text = title.text().strip() if title else None
+
+    tree.strip_tags(REMOVED_TAGS)
+
+    main_content = tree.css_first('main') or tree.css_first('article')
+    if main_content is None:
+        main_content = next((
+            div for div in tree.css('div[class]')
+            if any(MAIN_CLASS_PATTERN.search(name) for name in (div.attributes.get('class') or '').split())
+        ), None)
+    root = main_content or tree.root
+    content = _clean_text(root.text(separator='') if root is not None else '')
+
+    result = {"url": url, "title": title_text, "content": content, "word_count": len(content.split())}
+    if extract_links:
+        links = []
+        for link in tree.css('a[href]'):
+            absolute_url = urljoin(url, link.attributes.get('href') or '')
+            if is_valid_url(absolute_url):
+                links.append({"url": absolute_url, "text": link.text().strip(), "title": link.attributes.get('title') or ''})
+        result["links"] = links
+    if extract_images:
+        result["images"] = [
+            {
+                "url": urljoin(url, img.attributes.get('src') or ''),
+                "alt": img.attributes.get('alt') or '',
+                "title": img.attributes.get('title') or ''
+            }
+            for img in tree.css('img[src]')
+        ]
+    return result
+
+def extract_page(html: str, url: str, extract_links: bool = True, extract_images: bool = False, parser: str = PARSER_HTML) -> Dict[str, Any]:
+    """Extract title, main text, links and images from a page; runs in a worker process"""
+    if parser == PARSER_SELECTOLAX:
+        return _extract_selectolax(html, url, extract_links, extract_images)
+    return _extract_soup(html, url, extract_links, extract_images, parser)
+
+def extract_search_results(html: str, num_results: int, parser: str = PARSER_HTML) -> List[Dict[str, Any]]:
+    """Result URLs, titles and snippets from a Google results page; runs in a worker process"""
+    from bs4 import BeautifulSoup
+    # selectolax has no BeautifulSoup tree builder
+    soup = BeautifulSoup(html, PARSER_HTML if parser == PARSER_SELECTOLAX else parser)
+
+    search_results = []
+    for result in soup.find_all('div', class_='g'):
+        link_tag = result.find('a')
+        if link_tag and link_tag.get('href'):
+            url = link_tag['href']
+            if url.startswith('/url?q='):
+                url = url.split('/url?q=')[1].split('&')[0]
+
+            title_tag = result.find('h3')
+            title = title_tag.get_text() if title_tag else ""
+
+            snippet_tag = result.find('div', class_=['VwiC3b', 's3v9rd'])
+            snippet = snippet_tag.get_text() if snippet_tag else ""
+
+            if is_valid_url(url) and not any(domain in url for domain in EXCLUDED_SEARCH_DOMAINS):
+                search_results.append({"url": url, "title": title, "snippet": snippet})
+
+            if len(search_results) >= num_results:
+                break
+    return search_results
+
+class HtmlExtractor:
+    """Runs extract_page in a process pool so parsing never blocks the event loop.
+
+    Pages scraped concurrently are parsed in parallel on separate cores
+    instead of one after another inside the loop.
+    """
+
+    def __init__(self, parser: str = PARSER_LXML, workers: int = 0):
+        self.parser = available_parser(parser)
+        self.workers = workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_settings(cls) -> "HtmlExtractor":
+        return cls(parser=settings.HTML_PARSER, workers=settings.HTML_PARSE_WORKERS)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def extract(self, html: str, url: str, extract_links: bool = True, extract_images: bool = False) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_pool(), extract_page, html, url, extract_links, extract_images, self.parser
+        )
+
+    async def search_results(self, html: str, num_results: int) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), extract_search_results, html, num_results, self.parser)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"parser": self.parser, "workers": self.workers, "started": self._pool is not None}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
@@ -0,0 +1,323 @@
+import asyncio
+import json
+import os
+import threading
+import logging
+from functools import partial
+from typing import Optional, List, Dict, Any, Set
+import numpy as np
+from langchain.callbacks.manager import CallbackManagerForRetrieverRun, AsyncCallbackManagerForRetrieverRun
+from langchain.docstore.document import Document
+from langchain.docstore.in_memory import InMemoryDocstore
+from langchain.vectorstores import FAISS
+from langchain.vectorstores.base import VectorStoreRetriever
+from ..core.concurrency import ReadWriteLock
+from .vector_index import (
+    VectorIndexConfig, INDEX_FLAT, INDEX_IVFPQ, build_index, create_index, configure_search, index_type_of, add_in_batches
+)
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+def _fsync_dir(path: str):
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _atomic_write(path: str, write):
+    """Write through a temp file, fsync it and rename over ``path``"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _document_records(ids: List[str], documents: List[Document]) -> List[Dict[str, Any]]:
+    return [
+        {"id": doc_id, "page_content": doc.page_content, "metadata": doc.metadata}
+        for doc_id, doc in zip(ids, documents)
+    ]
+
+def _write_documents(f, records: List[Dict[str, Any]]):
+    for record in records:
+        f.write(json.dumps(record, default=str).encode("utf-8") + b"\n")
+
+def _read_documents(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _drop_deleted(records: List[Dict[str, Any]], vectors: np.ndarray, deleted: Set[str]):
+    """Filter tombstoned rows out of one segment's records and vectors"""
+    if not deleted:
+        return records, vectors
+    keep = [i for i, record in enumerate(records) if record["id"] not in deleted]
+    if len(keep) == len(records):
+        return records, vectors
+    return [records[i] for i in keep], np.asarray(vectors[keep], dtype=np.float32).reshape(len(keep), vectors.shape[1])
+
+class LockedRetriever(VectorStoreRetriever):
+    """Similarity search that holds ``lock`` for reading while it touches the index.
+
+    Uploads and deletions mutate the FAISS index and docstore in place under
+    the write side, so a search never sees them half-updated. The query is
+    embedded before the lock is taken, so only the index lookup waits.
+    """
+
+    lock: ReadWriteLock
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        vector = self.vectorstore._embed_query(query)
+        with self.lock.read():
+            return self.vectorstore.similarity_search_by_vector(vector, **self.search_kwargs)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        # The lock blocks, so wait for it in a worker thread rather than on the event loop
+        return await asyncio.get_running_loop().run_in_executor(
+            None, partial(self._get_relevant_documents, run_manager=run_manager), query
+        )
+
+class KnowledgeStore:
+    """Append-only persistence for the FAISS knowledge base.
+
+    Every upload appends a segment (``seg-N.npy`` vectors plus ``seg-N.jsonl``
+    documents) instead of rewriting the whole index, so the cost of a save
+    depends on the upload, not on the corpus. Once ``compact_segments``
+    segments have accumulated they are merged into a single base segment.
+
+    ``manifest.json`` is the only commit point: it is replaced atomically after
+    the files it references are fsynced, and files it does not reference are
+    removed on load. A crash mid-write therefore leaves the previous state.
+    Documents are read from JSON lines and nothing is unpickled.
+
+    Compaction also writes the base's FAISS index (``base-N.faiss``), trained
+    when the corpus passes the configured threshold, so it is not rebuilt on
+    every start. Flat and HNSW base indexes are opened with
+    ``IO_FLAG_MMAP``, so their vectors are paged in by searches rather than
+    read up front; FAISS copies them into memory on the first add, so a base
+    with segments pending, or one that takes a new upload, ends up resident.
+    IVF-PQ bases are read in full (their mapped inverted lists are read-only
+    and could not take new uploads), as are segment vectors, which go into
+    the in-memory index. The langchain docstore is a dict, so every document
+    is held in memory regardless.
+
+    Deleted chunks are recorded as tombstones in the manifest (HNSW cannot
+    remove vectors in place) and skipped on load; compaction drops them.
+    """
+
+    def __init__(self, path: str, compact_segments: int = 16, index_config: Optional[VectorIndexConfig] = None):
+        self.path = path
+        self.compact_segments = compact_segments
+        self.index_config = index_config or VectorIndexConfig()
+        self._lock = threading.Lock()
+        self._manifest = self._read_manifest()
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.path, MANIFEST_NAME)
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"format": FORMAT_VERSION, "dim": None, "next_seq": 1, "base": None, "segments": [], "deleted": []}
+
+    def _commit_manifest(self, manifest: Dict[str, Any]):
+        _atomic_write(self._manifest_path(), lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8")))
+        _fsync_dir(self.path)
+        self._manifest = manifest
+
+    def _segment_files(self, segment: Dict[str, Any]) -> List[str]:
+        files = [os.path.join(self.path, segment["vectors"]), os.path.join(self.path, segment["documents"])]
+        if segment.get("index"):
+            files.append(os.path.join(self.path, segment["index"]))
+        return files
+
+    def _write_index(self, name: str, vectors: np.ndarray) -> Dict[str, Any]:
+        import faiss
+        index = build_index(vectors, self.index_config)
+        file_name = f"{name}.faiss"
+        path = os.path.join(self.path, file_name)
+        faiss.write_index(index, f"{path}.tmp")
+        with open(f"{path}.tmp", "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(f"{path}.tmp", path)
+        return {"index": file_name, "index_type": index_type_of(index)}
+
+    def _write_segment(self, name: str, records: List[Dict[str, Any]], vectors: np.ndarray) -> Dict[str, Any]:
+        segment = {"vectors": f"{name}.npy", "documents": f"{name}.jsonl", "count": len(records)}
+        vectors_path, documents_path = self._segment_files(segment)
+        _atomic_write(vectors_path, lambda f: np.save(f, vectors))
+        _atomic_write(documents_path, lambda f: _write_documents(f, records))
+        return segment
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self._manifest_path())
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._manifest["segments"])
+
+    @property
+    def tombstone_count(self) -> int:
+        return len(self._manifest.get("deleted", []))
+
+    def _parts(self, manifest: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return ([manifest["base"]] if manifest["base"] else []) + manifest["segments"]
+
+    def append(self, ids: List[str], documents: List[Document], vectors: List[List[float]]):
+        """Persist one batch of newly indexed chunks as a new segment"""
+        if not ids:
+            return
+        array = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            manifest = json.loads(json.dumps(self._manifest))
+            seq = manifest["next_seq"]
+            segment = self._write_segment(f"seg-{seq:06d}", _document_records(ids, documents), array)
+            manifest["dim"] = manifest["dim"] or int(array.shape[1])
+            manifest["next_seq"] = seq + 1
+            manifest["segments"].append(segment)
+            self._commit_manifest(manifest)
+
+    def delete(self, ids: List[str]):
+        """Tombstone chunks; they are skipped on load and dropped by the next compaction"""
+        if not ids:
+            return
+        with self._lock:
+            manifest = json.loads(json.dumps(self._manifest))
+            deleted = set(manifest.get("deleted", []))
+            deleted.update(ids)
+            manifest["deleted"] = sorted(deleted)
+            self._commit_manifest(manifest)
+
+    def needs_compaction(self) -> bool:
+        if self.segment_count >= self.compact_segments:
+            return True
+        # Reclaim space once a quarter of the stored chunks are tombstones
+        total = sum(part["count"] for part in self._parts(self._manifest))
+        return self.tombstone_count > 0 and self.tombstone_count * 4 >= total
+
+    def needs_index_upgrade(self, index) -> bool:
+        """True when the corpus crossed the training threshold of the configured index type"""
+        return self.index_config.type_for(index.ntotal) != index_type_of(index)
+
+    def compact(self):
+        """Merge the base and all segments into a new base segment"""
+        with self._lock:
+            manifest = json.loads(json.dumps(self._manifest))
+            deleted = set(manifest.get("deleted", []))
+            if not manifest["segments"] and not deleted:
+                return
+            parts = self._parts(manifest)
+
+            records, vectors = [], []
+            for part in parts:
+                part_records, part_vectors = _drop_deleted(
+                    _read_documents(os.path.join(self.path, part["documents"])),
+                    np.load(os.path.join(self.path, part["vectors"]), mmap_mode="r"),
+                    deleted
+                )
+                records.extend(part_records)
+                vectors.append(part_vectors)
+
+            seq = manifest["next_seq"]
+            base = self._write_segment(f"base-{seq:06d}", records, np.concatenate(vectors))
+            del vectors
+
+            base_vectors = np.load(os.path.join(self.path, base["vectors"]), mmap_mode="r")
+            base.update(self._write_index(f"base-{seq:06d}", base_vectors))
+            del base_vectors
+
+            manifest["base"] = base
+            manifest["segments"] = []
+            manifest["deleted"] = []
+            manifest["next_seq"] = seq + 1
+            self._commit_manifest(manifest)
+
+            # Old files are only removed once the new manifest is durable
+            for part in parts:
+                for file_path in self._segment_files(part):
+                    if os.path.exists(file_path):
+                        os.unlink(file_path)
+            logger.info(f"Compacted knowledge base into {base['count']} chunks")
+
+    def _remove_unreferenced_files(self):
+        referenced = {MANIFEST_NAME}
+        for part in self._parts(self._manifest):
+            referenced.update(os.path.basename(file_path) for file_path in self._segment_files(part))
+        for name in os.listdir(self.path):
+            if (name.startswith(("seg-", "base-")) or name.endswith(".tmp")) and name not in referenced:
+                logger.warning(f"Removing incomplete knowledge base file {name}")
+                os.unlink(os.path.join(self.path, name))
+
+    def load(self, embeddings) -> Optional[FAISS]:
+        """Rebuild the vector store from the committed segments"""
+        if not self.exists:
+            return None
+        with self._lock:
+            self._remove_unreferenced_files()
+            manifest = self._manifest
+            parts = self._parts(manifest)
+            if not parts:
+                return None
+
+            deleted = set(manifest.get("deleted", []))
+            records, vectors = [], []
+            for part in parts:
+                part_records, part_vectors = _drop_deleted(
+                    _read_documents(os.path.join(self.path, part["documents"])),
+                    np.load(os.path.join(self.path, part["vectors"]), mmap_mode="r"),
+                    deleted
+                )
+                records.extend(part_records)
+                vectors.append(part_vectors)
+            target_type = self.index_config.type_for(len(records))
+            base = manifest["base"]
+
+            if base and base.get("index") and base.get("index_type") == target_type and not deleted:
+                # Index persisted by compaction; only segments need adding
+                import faiss
+                flags = 0 if target_type == INDEX_IVFPQ else faiss.IO_FLAG_MMAP
+                index = configure_search(faiss.read_index(os.path.join(self.path, base["index"]), flags), self.index_config)
+                pending = vectors[1:]
+            elif target_type != INDEX_FLAT:
+                index = build_index(np.concatenate(vectors), self.index_config)
+                pending = []
+            else:
+                index = create_index(INDEX_FLAT, manifest["dim"], 0, self.index_config)
+                pending = vectors
+            for part_vectors in pending:
+                add_in_batches(index, part_vectors)
+            del vectors, pending
+
+            docstore = {}
+            index_to_docstore_id = {}
+            for record in records:
+                docstore[record["id"]] = Document(page_content=record["page_content"], metadata=record["metadata"])
+                index_to_docstore_id[len(index_to_docstore_id)] = record["id"]
+
+            logger.info(f"Loaded {index.ntotal} chunks into a {index_type_of(index)} index")
+            return FAISS(embeddings, index, InMemoryDocstore(docstore), index_to_docstore_id)
+
+    def create_vector_store(self, embeddings, dim: int) -> FAISS:
+        return FAISS(embeddings, create_index(INDEX_FLAT, dim, 0, self.index_config), InMemoryDocstore({}), {})
+
+    def import_vector_store(self, vector_store: FAISS):
+        """One-off migration of a store loaded from the legacy save_local format"""
+        index = vector_store.index
+        ids = [vector_store.index_to_docstore_id[i] for i in range(index.ntotal)]
+        documents = [vector_store.docstore.search(doc_id) for doc_id in ids]
+        vectors = index.reconstruct_n(0, index.ntotal)
+        self.append(ids, documents, vectors)
+        self.compact()
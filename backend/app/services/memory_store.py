@@ -0,0 +1,320 @@
+import asyncio
+import json
+import time
+import logging
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple
+from langchain.schema import HumanMessage, AIMessage, BaseMessage
+from ..core.config import settings
+from ..models.schemas import MessageRole
+
+logger = logging.getLogger(__name__)
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+class LocalSpillBackend:
+    """In-process spill area, used when no database or Redis is reachable"""
+
+    name = "local"
+
+    def __init__(self):
+        self._data: Dict[str, str] = {}
+
+    async def save(self, session_id: str, payload: str):
+        self._data[session_id] = payload
+
+    async def load(self, session_id: str) -> Optional[str]:
+        return self._data.get(session_id)
+
+    async def delete(self, session_id: str):
+        self._data.pop(session_id, None)
+
+    async def close(self):
+        pass
+
+class DatabaseSpillBackend:
+    """Spills idle sessions to the SQL database configured by DATABASE_URL"""
+
+    name = "database"
+
+    def __init__(self):
+        from ..core.database import engine, SessionLocal
+        from ..models.db_models import ConversationMemory
+        ConversationMemory.__table__.create(bind=engine, checkfirst=True)
+        self._session_factory = SessionLocal
+        self._model = ConversationMemory
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, fn, *args)
+
+    def _save(self, session_id: str, payload: str):
+        with self._session_factory() as db:
+            db.merge(self._model(session_id=session_id, messages=payload, updated_at=time.time()))
+            db.commit()
+
+    def _load(self, session_id: str) -> Optional[str]:
+        with self._session_factory() as db:
+            row = db.get(self._model, session_id)
+            return row.messages if row else None
+
+    def _delete(self, session_id: str):
+        with self._session_factory() as db:
+            db.query(self._model).filter(self._model.session_id == session_id).delete()
+            db.commit()
+
+    async def save(self, session_id: str, payload: str):
+        await self._run(self._save, session_id, payload)
+
+    async def load(self, session_id: str) -> Optional[str]:
+        return await self._run(self._load, session_id)
+
+    async def delete(self, session_id: str):
+        await self._run(self._delete, session_id)
+
+    async def close(self):
+        pass
+
+class RedisSpillBackend:
+    """Spills idle sessions to Redis (REDIS_URL) with an expiry"""
+
+    name = "redis"
+
+    def __init__(self, ttl: int):
+        import redis.asyncio as redis
+        self._client = redis.from_url(settings.REDIS_URL)
+        self._ttl = ttl
+
+    def _key(self, session_id: str) -> str:
+        return f"dariusai:memory:{session_id}"
+
+    async def save(self, session_id: str, payload: str):
+        await self._client.set(self._key(session_id), payload, ex=self._ttl or None)
+
+    async def load(self, session_id: str) -> Optional[str]:
+        payload = await self._client.get(self._key(session_id))
+        return payload.decode("utf-8") if payload is not None else None
+
+    async def delete(self, session_id: str):
+        await self._client.delete(self._key(session_id))
+
+    async def close(self):
+        await self._client.close()
+
+class _Session:
+    __slots__ = ("messages", "last_access")
+
+    def __init__(self, messages: List[Dict[str, str]]):
+        self.messages = messages
+        self.last_access = time.monotonic()
+
+class SessionMemoryStore:
+    """Per-session conversation memory with a bounded resident set.
+
+    At most ``max_sessions`` sessions are kept in process; the least recently
+    used ones, and any idle for longer than ``session_ttl`` seconds, are
+    spilled to the configured backend and reloaded on their next message.
+    History handed to the LLM is trimmed to ``max_history_tokens`` so prompt
+    size stays bounded however long a conversation runs.
+
+    Changes to the resident set never await, so they need no lock; backend
+    loads, spills and deletes run as per-session tasks outside it. A session
+    with one in flight waits for it, so a reload always sees the last spill
+    and two loads of the same session are never started, while other
+    sessions carry on.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        session_ttl: int = 1800,
+        max_history_tokens: int = 1500,
+        max_turns: int = 20,
+        spill_backend: str = "database",
+        spill_ttl: int = 7 * 24 * 3600
+    ):
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self.max_history_tokens = max_history_tokens
+        self.max_turns = max_turns
+        self.spill_backend_name = spill_backend
+        self.spill_ttl = spill_ttl
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        # Backend load, spill or delete in flight per session
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._backend = None
+        self._backend_lock = asyncio.Lock()
+        self._spills = 0
+        self._reloads = 0
+
+    @classmethod
+    def from_settings(cls) -> "SessionMemoryStore":
+        return cls(
+            max_sessions=settings.MEMORY_MAX_SESSIONS,
+            session_ttl=settings.MEMORY_SESSION_TTL,
+            max_history_tokens=settings.MEMORY_MAX_HISTORY_TOKENS,
+            max_turns=settings.MEMORY_MAX_TURNS,
+            spill_backend=settings.MEMORY_SPILL_BACKEND,
+            spill_ttl=settings.MEMORY_SPILL_TTL
+        )
+
+    async def _get_backend(self):
+        async with self._backend_lock:
+            if self._backend is not None:
+                return self._backend
+            try:
+                if self.spill_backend_name == "redis":
+                    backend = RedisSpillBackend(self.spill_ttl)
+                    await backend._client.ping()
+                elif self.spill_backend_name == "database":
+                    backend = DatabaseSpillBackend()
+                else:
+                    backend = LocalSpillBackend()
+            except Exception as e:
+                logger.warning(f"Memory spill backend '{self.spill_backend_name}' unavailable, using local fallback: {str(e)}")
+                backend = LocalSpillBackend()
+            self._backend = backend
+            return backend
+
+    def _start(self, session_id: str, coro) -> asyncio.Future:
+        """Run backend I/O for a session as a task, visible to later callers until it finishes"""
+        task = asyncio.ensure_future(coro)
+        self._pending[session_id] = task
+
+        def done(_):
+            if self._pending.get(session_id) is task:
+                del self._pending[session_id]
+
+        task.add_done_callback(done)
+        return task
+
+    async def _wait_pending(self, session_id: str):
+        while session_id in self._pending:
+            # Shielded, so a cancelled caller does not abort another caller's load or a spill
+            await asyncio.shield(self._pending[session_id])
+
+    async def _spill(self, session_id: str, session: _Session):
+        payload = json.dumps(session.messages)
+        backend = await self._get_backend()
+        try:
+            await backend.save(session_id, payload)
+            self._spills += 1
+        except Exception as e:
+            logger.error(f"Failed to spill session {session_id}: {str(e)}")
+
+    async def _load(self, session_id: str):
+        messages = []
+        backend = await self._get_backend()
+        try:
+            payload = await backend.load(session_id)
+            if payload:
+                messages = json.loads(payload)
+                self._reloads += 1
+        except Exception as e:
+            logger.error(f"Failed to reload session {session_id}: {str(e)}")
+        self._sessions[session_id] = _Session(messages)
+
+    def _evict(self):
+        """Spill sessions beyond the LRU bound or idle past the TTL, in the background"""
+        now = time.monotonic()
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            over_capacity = len(self._sessions) > self.max_sessions
+            expired = now - session.last_access > self.session_ttl
+            if not (over_capacity or expired):
+                break
+            del self._sessions[session_id]
+            if session.messages:
+                self._start(session_id, self._spill(session_id, session))
+
+    async def _get_session(self, session_id: str) -> _Session:
+        while True:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_access = time.monotonic()
+                self._sessions.move_to_end(session_id)
+                break
+            if session_id not in self._pending:
+                self._start(session_id, self._load(session_id))
+            await self._wait_pending(session_id)
+        self._evict()
+        return session
+
+    def _budgeted(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Newest messages that fit in the history token budget, in chronological order"""
+        selected = []
+        used = 0
+        for item in reversed(messages):
+            cost = estimate_tokens(item["content"])
+            if used + cost > self.max_history_tokens:
+                break
+            selected.append(item)
+            used += cost
+        selected.reverse()
+        return selected
+
+    async def get_messages(self, session_id: str) -> List[BaseMessage]:
+        """Token-budgeted history as chat messages for direct LLM calls"""
+        session = await self._get_session(session_id)
+        history = self._budgeted(session.messages)
+        return [
+            HumanMessage(content=item["content"]) if item["role"] == MessageRole.USER.value else AIMessage(content=item["content"])
+            for item in history
+        ]
+
+    async def get_history_pairs(self, session_id: str) -> List[Tuple[str, str]]:
+        """Token-budgeted history as (question, answer) pairs for retrieval chains"""
+        session = await self._get_session(session_id)
+        history = self._budgeted(session.messages)
+        pairs = []
+        pending_user = None
+        for item in history:
+            if item["role"] == MessageRole.USER.value:
+                pending_user = item["content"]
+            elif pending_user is not None:
+                pairs.append((pending_user, item["content"]))
+                pending_user = None
+        return pairs
+
+    async def has_history(self, session_id: str) -> bool:
+        session = await self._get_session(session_id)
+        return bool(session.messages)
+
+    async def add_exchange(self, session_id: str, user_message: str, ai_message: str):
+        session = await self._get_session(session_id)
+        session.messages.append({"role": MessageRole.USER.value, "content": user_message})
+        session.messages.append({"role": MessageRole.ASSISTANT.value, "content": ai_message})
+        # Keep the stored transcript bounded as well
+        if len(session.messages) > self.max_turns * 2:
+            del session.messages[:len(session.messages) - self.max_turns * 2]
+
+    async def clear(self, session_id: str):
+        backend = await self._get_backend()
+        await self._wait_pending(session_id)
+        # No await from here to the delete starting, so no reload can slip in between
+        self._sessions.pop(session_id, None)
+        await asyncio.shield(self._start(session_id, backend.delete(session_id)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "resident_sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "pending_io": len(self._pending),
+            "spill_backend": self._backend.name if self._backend else self.spill_backend_name,
+            "spills": self._spills,
+            "reloads": self._reloads
+        }
+
+    async def aclose(self):
+        """Spill every resident session so history survives a restart"""
+        sessions = list(self._sessions.items())
+        self._sessions.clear()
+        for session_id, session in sessions:
+            if session.messages:
+                self._start(session_id, self._spill(session_id, session))
+        while self._pending:
+            await asyncio.gather(*self._pending.values(), return_exceptions=True)
+        if self._backend is not None:
+            await self._backend.close()
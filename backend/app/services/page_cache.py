@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, Mapping, Tuple
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+def freshness_lifetime(headers: Mapping[str, str], now: float) -> Optional[float]:
+    """Seconds a response may be reused without revalidation, or None if it must not be stored.
+
+    Follows RFC 9111 for a private cache: ``no-store`` disables caching,
+    ``no-cache`` stores but always revalidates, ``max-age`` wins over
+    ``Expires``, and without either a tenth of the time since
+    ``Last-Modified`` is used as heuristic freshness.
+    """
+    directives = parse_cache_control(headers.get("Cache-Control", ""))
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    max_age = directives.get("max-age")
+    if max_age is not None and re.fullmatch(r"\d+", max_age):
+        return float(max_age)
+    expires = headers.get("Expires")
+    if expires is not None:
+        expires_at = _http_date(expires)
+        date = _http_date(headers.get("Date")) or now
+        return max(0.0, expires_at - date) if expires_at else 0.0
+    last_modified = _http_date(headers.get("Last-Modified"))
+    if last_modified:
+        return max(0.0, (now - last_modified) / 10)
+    return 0.0
+
+class PageCache:
+    """Disk cache of scraped pages that honours Cache-Control, ETag and Last-Modified.
+
+    It stores the extracted result rather than the HTML, so a fresh hit or a
+    ``304 Not Modified`` skips both the download and the parse. Entries past
+    their freshness lifetime are revalidated with If-None-Match /
+    If-Modified-Since. Responses without validators or freshness are not
+    stored. The cache is bounded by ``max_bytes`` (least recently used
+    entries go first) and ``max_age`` since the page was last fetched. The
+    entry count and byte total are kept in memory, summed once on connect.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, max_age: int = 7 * 24 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._entries = 0
+        self._bytes = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls) -> "PageCache":
+        return cls(settings.PAGE_CACHE_PATH, max_bytes=settings.PAGE_CACHE_MAX_BYTES, max_age=settings.PAGE_CACHE_MAX_AGE)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    fresh_until REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    result TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used);
+                CREATE INDEX IF NOT EXISTS pages_fetched_at ON pages (fetched_at);
+            """)
+            self._entries, self._bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def key(url: str, **options) -> str:
+        """The extracted result depends on the extraction options as well as the URL"""
+        return hashlib.sha256(json.dumps([url, options], sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The cached entry with ``fresh`` set, or None"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT etag, last_modified, fetched_at, fresh_until, result, size FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[2] > self.max_age:
+                with conn:
+                    conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self._entries -= 1
+                self._bytes -= row[5]
+                return None
+            with conn:
+                conn.execute("UPDATE pages SET last_used = ? WHERE key = ?", (now, key))
+        return {
+            "etag": row[0],
+            "last_modified": row[1],
+            "fresh": now < row[3],
+            "result": json.loads(row[4])
+        }
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, key: str, url: str, headers: Mapping[str, str], result: Dict[str, Any]) -> bool:
+        now = time.time()
+        lifetime = freshness_lifetime(headers, now)
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if lifetime is None or (lifetime <= 0 and not etag and not last_modified):
+            # Nothing to serve from or revalidate against
+            return False
+
+        payload = json.dumps(result, default=str)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                replaced = conn.execute("SELECT size FROM pages WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO pages (key, url, etag, last_modified, fetched_at, fresh_until, last_used, size, result) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, url, etag, last_modified, now, now + lifetime, now, len(payload), payload)
+                )
+                entries = self._entries + (0 if replaced else 1)
+                total = self._bytes + len(payload) - (replaced[0] if replaced else 0)
+                removed, freed = self._evict(conn, now, total)
+            # Counted only once the transaction has committed
+            self._entries = entries - removed
+            self._bytes = total - freed
+        return True
+
+    def refresh(self, key: str, headers: Mapping[str, str]):
+        """Record a 304: the stored result is valid again for a new freshness lifetime"""
+        now = time.time()
+        lifetime = freshness_lifetime(headers, now) or 0.0
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "UPDATE pages SET fetched_at = ?, fresh_until = ?, last_used = ?, "
+                    "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                    (now, now + lifetime, now, headers.get("ETag"), headers.get("Last-Modified"), key)
+                )
+
+    def _evict(self, conn: sqlite3.Connection, now: float, total: int) -> Tuple[int, int]:
+        """Drop expired pages, then least recently used ones while over budget; returns (entries, bytes) removed"""
+        cutoff = now - self.max_age
+        removed, freed = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages WHERE fetched_at < ?", (cutoff,)
+        ).fetchone()
+        if removed:
+            conn.execute("DELETE FROM pages WHERE fetched_at < ?", (cutoff,))
+        if total - freed <= self.max_bytes:
+            return removed, freed
+        # Drop least recently used pages until back under 90% of the budget
+        target = total - freed - int(self.max_bytes * 0.9)
+        dropped = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM pages ORDER BY last_used"):
+            doomed.append((key,))
+            dropped += size
+            if dropped >= target:
+                break
+        conn.executemany("DELETE FROM pages WHERE key = ?", doomed)
+        return removed + len(doomed), freed + dropped
+
+    def record(self, outcome: str):
+        if outcome == "hit":
+            self.hits += 1
+        elif outcome == "revalidated":
+            self.revalidated += 1
+        else:
+            self.misses += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.revalidated + self.misses
+        try:
+            with self._lock:
+                self._connect()
+                entries, size = self._entries, self._bytes
+        except sqlite3.Error:
+            entries, size = None, None
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.revalidated) / lookups, 4) if lookups else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import re
+import time
+import logging
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class _Entry:
+    __slots__ = ("kb_version", "value", "vector", "created_at")
+
+    def __init__(self, kb_version: int, value: Dict[str, Any], vector: Optional[np.ndarray]):
+        self.kb_version = kb_version
+        self.value = value
+        self.vector = vector
+        self.created_at = time.monotonic()
+
+class ResponseCache:
+    """Two-tier cache of chat responses.
+
+    The exact tier is keyed on the normalised message plus the knowledge-base
+    version; the semantic tier compares the query embedding against cached
+    queries of the same knowledge-base version and returns the closest one
+    above ``similarity_threshold``. Entries expire after ``ttl`` seconds and
+    the cache holds at most ``max_entries`` (LRU).
+    """
+
+    def __init__(self, embeddings=None, max_entries: int = 1000, ttl: int = 3600, similarity_threshold: float = 0.92):
+        self.embeddings = embeddings
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+        self._exact_hits = 0
+        self._semantic_hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def normalize(message: str) -> str:
+        return re.sub(r"\s+", " ", message.lower()).strip().rstrip("?!. ")
+
+    def _key(self, normalized: str, kb_version: int) -> str:
+        return hashlib.sha256(f"{kb_version}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    def _expired(self, entry: _Entry) -> bool:
+        return time.monotonic() - entry.created_at > self.ttl
+
+    def _invalidate_matrix(self):
+        self._matrix = None
+        self._matrix_keys = []
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        if self.embeddings is None:
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+            vector = np.asarray(await loop.run_in_executor(None, self.embeddings.embed_query, text), dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            return vector / norm if norm else None
+        except Exception as e:
+            logger.error(f"Response cache embedding error: {str(e)}")
+            return None
+
+    def _semantic_lookup(self, vector: np.ndarray, kb_version: int) -> Optional[Tuple[str, float]]:
+        if self._matrix is None:
+            keys = [key for key, entry in self._entries.items() if entry.vector is not None]
+            if not keys:
+                return None
+            self._matrix_keys = keys
+            self._matrix = np.vstack([self._entries[key].vector for key in keys])
+
+        scores = self._matrix @ vector
+        for index in np.argsort(scores)[::-1]:
+            score = float(scores[index])
+            if score < self.similarity_threshold:
+                break
+            key = self._matrix_keys[index]
+            entry = self._entries.get(key)
+            if entry is not None and entry.kb_version == kb_version and not self._expired(entry):
+                return key, score
+        return None
+
+    async def get(self, message: str, kb_version: int) -> Tuple[Optional[Dict[str, Any]], Optional[np.ndarray]]:
+        """Look up a response; also returns the query embedding so a miss can be stored without re-embedding"""
+        normalized = self.normalize(message)
+        key = self._key(normalized, kb_version)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if self._expired(entry):
+                del self._entries[key]
+                self._invalidate_matrix()
+            else:
+                self._entries.move_to_end(key)
+                self._exact_hits += 1
+                return {**entry.value, "cache": "exact"}, entry.vector
+
+        vector = await self._embed(normalized)
+        if vector is not None:
+            match = self._semantic_lookup(vector, kb_version)
+            if match is not None:
+                match_key, score = match
+                self._entries.move_to_end(match_key)
+                self._semantic_hits += 1
+                return {**self._entries[match_key].value, "cache": "semantic", "similarity": round(score, 4)}, vector
+
+        self._misses += 1
+        return None, vector
+
+    def put(self, message: str, kb_version: int, value: Dict[str, Any], vector: Optional[np.ndarray] = None):
+        key = self._key(self.normalize(message), kb_version)
+        self._entries[key] = _Entry(kb_version, value, vector)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._invalidate_matrix()
+
+    def clear(self):
+        self._entries.clear()
+        self._invalidate_matrix()
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self._exact_hits + self._semantic_hits
+        lookups = hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "exact_hits": self._exact_hits,
+            "semantic_hits": self._semantic_hits,
+            "misses": self._misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+        }
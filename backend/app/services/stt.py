@@ -0,0 +1,267 @@
+import asyncio
+import io
+import json
+import time
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional, List, Dict, Any, Tuple
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+STT_ENGINE_GOOGLE = "google"
+STT_ENGINE_VOSK = "vosk"
+STT_ENGINE_STUB = "stub"
+
+# Engines decode 16 kHz, 16-bit mono PCM
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+# One utterance: 16-bit mono PCM and its sample rate, or an audio file (WAV/AIFF/FLAC) and 0
+Clip = Tuple[bytes, int]
+
+def to_pcm(clip: Clip) -> bytes:
+    """16 kHz, 16-bit mono PCM of a clip"""
+    import speech_recognition as sr
+    data, sample_rate = clip
+    if sample_rate == SAMPLE_RATE:
+        return data
+    if sample_rate:
+        audio = sr.AudioData(data, sample_rate, SAMPLE_WIDTH)
+    else:
+        with sr.AudioFile(io.BytesIO(data)) as source:
+            audio = sr.Recognizer().record(source)
+    return audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=SAMPLE_WIDTH)
+
+def pcm_duration(pcm: bytes) -> float:
+    return len(pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+
+class GoogleEngine:
+    """The Google Web Speech API; a network round trip per utterance, so batches are never larger than one"""
+
+    max_batch = 1
+
+    def __init__(self):
+        import speech_recognition as sr
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+
+    def transcribe_batch(self, pcms: List[bytes]) -> List[Dict[str, Any]]:
+        results = []
+        for pcm in pcms:
+            try:
+                text = self.recognizer.recognize_google(self.sr.AudioData(pcm, SAMPLE_RATE, SAMPLE_WIDTH))
+                # Google API doesn't return confidence
+                results.append({"success": True, "text": text, "confidence": 1.0})
+            except self.sr.UnknownValueError:
+                results.append({"success": False, "error": "Could not understand audio"})
+            except self.sr.RequestError as e:
+                results.append({"success": False, "error": f"Recognition service error: {str(e)}"})
+        return results
+
+class VoskEngine:
+    """Offline Kaldi recognizer; the model is loaded once per worker process and shared by every utterance"""
+
+    max_batch = 16
+
+    def __init__(self, model_path: str):
+        try:
+            import vosk
+        except ImportError:
+            raise RuntimeError("STT_ENGINE 'vosk' needs the vosk package (pip install vosk) and a model in STT_MODEL_PATH")
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model = vosk.Model(model_path)
+
+    def transcribe_batch(self, pcms: List[bytes]) -> List[Dict[str, Any]]:
+        results = []
+        for pcm in pcms:
+            recognizer = self.vosk.KaldiRecognizer(self.model, SAMPLE_RATE)
+            recognizer.SetWords(True)
+            recognizer.AcceptWaveform(pcm)
+            result = json.loads(recognizer.FinalResult())
+            words = result.get("result", [])
+            if not result.get("text"):
+                results.append({"success": False, "error": "Could not understand audio"})
+                continue
+            results.append({
+                "success": True,
+                "text": result["text"],
+                "confidence": sum(word["conf"] for word in words) / len(words) if words else 0.0
+            })
+        return results
+
+class StubEngine:
+    """Offline stand-in for benchmarks and tests.
+
+    Spends ``call_cost`` seconds of CPU per batch, the fixed cost of running
+    a model at all, plus ``decode_factor`` seconds per second of audio, and
+    transcribes every utterance as its length.
+    """
+
+    max_batch = 16
+
+    def __init__(self, call_cost: float = 0.02, decode_factor: float = 0.05):
+        self.call_cost = call_cost
+        self.decode_factor = decode_factor
+
+    def transcribe_batch(self, pcms: List[bytes]) -> List[Dict[str, Any]]:
+        durations = [pcm_duration(pcm) for pcm in pcms]
+        # Spin on CPU time, so workers sharing a core slow each other down like real engines
+        deadline = time.process_time() + self.call_cost + sum(durations) * self.decode_factor
+        while time.process_time() < deadline:
+            pass
+        return [{"success": True, "text": f"{duration:.2f} seconds of speech", "confidence": 1.0} for duration in durations]
+
+ENGINES = {STT_ENGINE_GOOGLE: GoogleEngine, STT_ENGINE_VOSK: VoskEngine, STT_ENGINE_STUB: StubEngine}
+
+def create_engine(name: str, **options):
+    if name not in ENGINES:
+        raise ValueError(f"Unknown STT engine: {name}")
+    return ENGINES[name](**options)
+
+# Per-process engine, created on the worker's first batch
+_worker_engine = None
+
+def transcribe_batch(engine_name: str, engine_options: Dict[str, Any], clips: List[Clip]) -> List[Dict[str, Any]]:
+    """Transcribe a batch of utterances in one call; runs in a worker process"""
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = create_engine(engine_name, **engine_options)
+
+    start = time.perf_counter()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(clips)
+    pcms = []
+    for i, clip in enumerate(clips):
+        try:
+            pcms.append((i, to_pcm(clip)))
+        except Exception as e:
+            results[i] = {"success": False, "error": f"Unreadable audio: {str(e)}", "audio_seconds": 0.0}
+    if pcms:
+        for (i, pcm), result in zip(pcms, _worker_engine.transcribe_batch([pcm for _, pcm in pcms])):
+            results[i] = {**result, "audio_seconds": pcm_duration(pcm)}
+
+    # The batch is decoded as a whole, so its time is shared out by audio length
+    elapsed = time.perf_counter() - start
+    audio_seconds = sum(result["audio_seconds"] for result in results)
+    for result in results:
+        share = result["audio_seconds"] / audio_seconds if audio_seconds else 1 / len(results)
+        result["processing_seconds"] = elapsed * share
+        result["rtf"] = elapsed / audio_seconds if audio_seconds else None
+    return results
+
+class SttPool:
+    """Speech recognition in worker processes, one engine per process.
+
+    Utterances that arrive within ``batch_window`` seconds of each other are
+    transcribed together in one worker call, up to ``batch_size`` (and the
+    engine's own limit). While every worker is busy new utterances keep
+    queueing, so batches grow with load instead of the queue. Results carry
+    the real-time factor: processing time over audio duration.
+    """
+
+    def __init__(self, engine: str = STT_ENGINE_GOOGLE, workers: int = 2, batch_size: int = 8,
+                 batch_window: float = 0.02, engine_options: Optional[Dict[str, Any]] = None):
+        self.engine = engine
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.batch_window = batch_window
+        self.engine_options = engine_options or {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._queue: deque = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight = 0
+        self.stats = {"requests": 0, "batches": 0, "audio_seconds": 0.0, "processing_seconds": 0.0}
+
+    @classmethod
+    def from_settings(cls) -> "SttPool":
+        engine_options = {"model_path": settings.STT_MODEL_PATH} if settings.STT_ENGINE == STT_ENGINE_VOSK else None
+        return cls(
+            engine=settings.STT_ENGINE,
+            workers=settings.STT_WORKERS,
+            batch_size=settings.STT_BATCH_SIZE,
+            batch_window=settings.STT_BATCH_WINDOW,
+            engine_options=engine_options
+        )
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _max_batch(self) -> int:
+        engine_class = ENGINES.get(self.engine)
+        return min(self.batch_size, engine_class.max_batch) if engine_class else self.batch_size
+
+    async def transcribe(self, audio: bytes, sample_rate: int = 0) -> Dict[str, Any]:
+        """Transcribe one utterance: 16-bit mono PCM at ``sample_rate``, or an audio file when it is 0"""
+        if not audio:
+            return {"success": False, "error": "No audio data"}
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append(((audio, sample_rate), future))
+        self.stats["requests"] += 1
+
+        if len(self._queue) >= self._max_batch():
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.batch_window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        loop = asyncio.get_running_loop()
+        max_batch = self._max_batch()
+        while self._queue and self._in_flight < self.workers:
+            batch = []
+            while self._queue and len(batch) < max_batch:
+                clip, future = self._queue.popleft()
+                if not future.done():
+                    batch.append((clip, future))
+            if not batch:
+                break
+            self._in_flight += 1
+            task = loop.run_in_executor(
+                self._get_pool(), transcribe_batch, self.engine, self.engine_options, [clip for clip, _ in batch]
+            )
+            task.add_done_callback(partial(self._finish, batch))
+
+    def _finish(self, batch: List[Tuple[Clip, asyncio.Future]], task: asyncio.Future):
+        self._in_flight -= 1
+        self.stats["batches"] += 1
+        error = task.exception() if not task.cancelled() else asyncio.CancelledError()
+        for i, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                result = task.result()[i]
+                self.stats["audio_seconds"] += result["audio_seconds"]
+                self.stats["processing_seconds"] += result["processing_seconds"]
+                future.set_result(result)
+        # Whatever queued up while the workers were busy goes out as the next batches
+        self._flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        audio_seconds = self.stats["audio_seconds"]
+        return {
+            "engine": self.engine,
+            "workers": self.workers,
+            "started": self._pool is not None,
+            "queued": len(self._queue),
+            **self.stats,
+            "rtf": self.stats["processing_seconds"] / audio_seconds if audio_seconds else None
+        }
+
+    def close(self, wait: bool = False):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
@@ -0,0 +1,142 @@
+"""Extractive summarisation without an LLM.
+
+Sentences are scored over a sparse TF-IDF matrix, either by similarity to
+the document centroid or by TextRank (PageRank over the sentence
+similarity graph), and the best ones are returned in document order.
+
+This module only depends on numpy, scipy and scikit-learn (for its stop
+word list) so the desktop app (mark8.py) can import it without the
+backend settings.
+"""
+import re
+from itertools import chain
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+METHOD_CENTROID = "centroid"
+METHOD_TEXTRANK = "textrank"
+
+# Sentence boundary: terminal punctuation (plus closing quotes/brackets) and whitespace, or a blank line
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])["\')\]]*\s+|\n\s*\n')
+WHITESPACE = re.compile(r'\s+')
+# Same token pattern as scikit-learn's vectorizers: runs of two or more word characters
+TOKEN = re.compile(r'(?u)\b\w\w+\b')
+MIN_SENTENCE_WORDS = 4
+# TextRank builds an n x n similarity graph, so long documents are first cut down by centroid score
+TEXTRANK_MAX_SENTENCES = 600
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_TOLERANCE = 1e-6
+TEXTRANK_MAX_ITERATIONS = 100
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences with whitespace collapsed; fragments under MIN_SENTENCE_WORDS words are dropped"""
+    sentences = []
+    for part in SENTENCE_BOUNDARY.split(text):
+        words = part.split()
+        if len(words) >= MIN_SENTENCE_WORDS:
+            sentences.append(' '.join(words))
+    return sentences
+
+def _tfidf(sentences: List[str]) -> sparse.csr_matrix:
+    """L2-normalised sparse TF-IDF rows, one per sentence, with sublinear term frequency and smoothed IDF.
+
+    Equivalent to scikit-learn's TfidfVectorizer(stop_words="english",
+    sublinear_tf=True), but counts terms with one sparse matrix build
+    instead of a Python loop over every token.
+    """
+    tokens = [TOKEN.findall(sentence.lower()) for sentence in sentences]
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    vocabulary: Dict[str, int] = {}
+    term_ids = np.fromiter(
+        (vocabulary.setdefault(token, len(vocabulary)) for token in chain.from_iterable(tokens)),
+        dtype=np.int64,
+        count=int(lengths.sum())
+    )
+    is_stop_word = np.fromiter((term in ENGLISH_STOP_WORDS for term in vocabulary), dtype=bool, count=len(vocabulary))
+    keep = ~is_stop_word[term_ids]
+    if not keep.any():
+        raise ValueError("Empty vocabulary; the text only contains stop words")
+
+    rows = np.repeat(np.arange(len(sentences)), lengths)[keep]
+    counts = sparse.csr_matrix(
+        (np.ones(int(keep.sum()), dtype=np.float32), (rows, term_ids[keep])),
+        shape=(len(sentences), len(vocabulary))
+    )
+    counts.sum_duplicates()
+    counts.data = 1 + np.log(counts.data)
+
+    document_frequency = np.bincount(counts.indices, minlength=len(vocabulary))
+    idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+    counts.data *= idf[counts.indices].astype(np.float32)
+
+    norms = np.sqrt(np.asarray(counts.multiply(counts).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms).dot(counts).tocsr()
+
+def _centroid_scores(matrix) -> np.ndarray:
+    centroid = np.asarray(matrix.sum(axis=0)).ravel()
+    norm = np.linalg.norm(centroid)
+    if not norm:
+        return np.zeros(matrix.shape[0], dtype=np.float32)
+    return matrix @ (centroid / norm)
+
+def _textrank_scores(matrix) -> np.ndarray:
+    n = matrix.shape[0]
+    similarity = (matrix @ matrix.T).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+
+    # Row-stochastic transition matrix; sentences with no neighbours spread their rank uniformly
+    degree = np.asarray(similarity.sum(axis=1)).ravel()
+    dangling = degree == 0
+    degree[dangling] = 1
+    transition = similarity.multiply(1 / degree[:, None]).tocsr().T.tocsr()
+
+    rank = np.full(n, 1 / n)
+    for _ in range(TEXTRANK_MAX_ITERATIONS):
+        updated = (1 - TEXTRANK_DAMPING) / n + TEXTRANK_DAMPING * (transition @ rank + rank[dangling].sum() / n)
+        converged = np.abs(updated - rank).sum() < TEXTRANK_TOLERANCE
+        rank = updated
+        if converged:
+            break
+    return rank
+
+def rank_sentences(sentences: List[str], method: str = METHOD_TEXTRANK) -> np.ndarray:
+    """Score each sentence; higher is more central to the text"""
+    if method not in (METHOD_CENTROID, METHOD_TEXTRANK):
+        raise ValueError(f"Unknown summarisation method: {method}")
+    try:
+        matrix = _tfidf(sentences)
+    except ValueError:
+        # Empty vocabulary (nothing but stop words): keep document order
+        return np.linspace(1, 0, len(sentences), endpoint=False)
+
+    scores = _centroid_scores(matrix)
+    if method == METHOD_TEXTRANK:
+        candidates = np.arange(len(sentences))
+        if len(sentences) > TEXTRANK_MAX_SENTENCES:
+            candidates = np.sort(np.argpartition(-scores, TEXTRANK_MAX_SENTENCES)[:TEXTRANK_MAX_SENTENCES])
+        textrank = np.zeros(len(sentences))
+        textrank[candidates] = _textrank_scores(matrix[candidates])
+        scores = textrank
+    return scores
+
+def summarize(text: str, max_sentences: int = 3, method: str = METHOD_TEXTRANK, max_chars: Optional[int] = None) -> str:
+    """The ``max_sentences`` highest-scoring sentences of ``text``, in their original order"""
+    # Repeated sentences (boilerplate, page headers) would otherwise crowd out everything else
+    sentences = list(dict.fromkeys(split_sentences(text)))
+    if not sentences:
+        # Nothing sentence-like (a title, a list of fragments): pass the text through
+        sentences = [WHITESPACE.sub(' ', text).strip()]
+    elif len(sentences) > max_sentences:
+        scores = rank_sentences(sentences, method)
+        top = np.argpartition(-scores, max_sentences - 1)[:max_sentences]
+        sentences = [sentences[i] for i in np.sort(top)]
+
+    summary = ' '.join(sentences)
+    if max_chars and len(summary) > max_chars:
+        summary = summary[:max_chars] + "..."
+    return summary
@@ -0,0 +1,263 @@
+import asyncio
+import atexit
+import io
+import os
+import re
+import struct
+import tempfile
+import time
+import wave
+import zlib
+import logging
+from collections import deque
+from dataclasses import dataclass, replace
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TTS_ENGINE_PYTTSX3 = "pyttsx3"
+TTS_ENGINE_STUB = "stub"
+
+# Data size written into the header of a WAV whose length is not known yet
+STREAMING_SIZE = 0xFFFFFFFF
+SPEECH_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n+')
+# Speech rate limits in words per minute
+MIN_RATE = 50
+MAX_RATE = 300
+# Voice names clients send to mean "the engine's default voice"
+DEFAULT_VOICE_NAMES = ("", "default")
+
+@dataclass(frozen=True)
+class VoiceSettings:
+    """Voice, rate and volume of one TTS request.
+
+    Sent to the worker with every chunk and applied there, so requests with
+    different settings can render side by side without touching shared state.
+    """
+    voice: Optional[str] = None  # engine voice id; None is the engine's default voice
+    rate: int = 150  # words per minute
+    volume: float = 0.8  # 0.0 to 1.0
+
+    def override(self, voice: Optional[str] = None, rate: Optional[int] = None,
+                 volume: Optional[float] = None) -> "VoiceSettings":
+        """A copy with the given values, clamped to what the engines accept; None keeps the current value"""
+        if voice is not None:
+            voice = None if voice.lower() in DEFAULT_VOICE_NAMES else voice
+        else:
+            voice = self.voice
+        return replace(
+            self,
+            voice=voice,
+            rate=self.rate if rate is None else max(MIN_RATE, min(MAX_RATE, int(rate))),
+            volume=self.volume if volume is None else max(0.0, min(1.0, float(volume)))
+        )
+
+def split_for_speech(text: str, max_chars: int = 300) -> List[str]:
+    """Split text at sentence boundaries, breaking sentences longer than ``max_chars`` at word boundaries"""
+    chunks = []
+    for sentence in SPEECH_BOUNDARY.split(text):
+        words = sentence.split()
+        current = ""
+        for word in words:
+            if current and len(current) + 1 + len(word) > max_chars:
+                chunks.append(current)
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+        if current:
+            chunks.append(current)
+    return chunks
+
+def wav_header(channels: int, sample_width: int, sample_rate: int, data_size: int = STREAMING_SIZE) -> bytes:
+    """44-byte PCM WAV header; the default sizes mark a stream of unknown length"""
+    riff_size = STREAMING_SIZE if data_size == STREAMING_SIZE else 36 + data_size
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", riff_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * channels * sample_width, channels * sample_width, sample_width * 8,
+        b"data", data_size
+    )
+
+def complete_wav(stream_header: bytes, frames: bytes) -> bytes:
+    """Turn a streaming header plus the frames that followed it into a WAV file with exact sizes"""
+    return (
+        stream_header[:4] + struct.pack("<I", 36 + len(frames)) + stream_header[8:40]
+        + struct.pack("<I", len(frames)) + frames
+    )
+
+def read_wav(data: bytes) -> Tuple[Tuple[int, int, int], bytes]:
+    """((channels, sample width, sample rate), PCM frames) of a WAV file"""
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        return (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()), wav.readframes(wav.getnframes())
+
+def audio_duration(params: Tuple[int, int, int], frames_size: int) -> float:
+    channels, sample_width, sample_rate = params
+    return frames_size / (channels * sample_width * sample_rate)
+
+class Pyttsx3Engine:
+    """One pyttsx3 driver per worker process; pyttsx3 can only render to a file, so each worker reuses its own"""
+
+    def __init__(self):
+        import pyttsx3
+        self.engine = pyttsx3.init()
+        voices = self.engine.getProperty('voices')
+
+        # Female voice if available
+        if voices and len(voices) > 1:
+            self.default_voice = voices[1].id
+        else:
+            self.default_voice = self.engine.getProperty('voice')
+        self.applied: Optional[VoiceSettings] = None
+
+        fd, self.path = tempfile.mkstemp(suffix=".wav", prefix="tts_worker_")
+        os.close(fd)
+        atexit.register(os.unlink, self.path)
+
+    def _apply(self, voice: VoiceSettings):
+        # The driver belongs to this process and renders one chunk at a time,
+        # so setting the properties right before rendering cannot race
+        if voice == self.applied:
+            return
+        self.engine.setProperty('voice', voice.voice or self.default_voice)
+        self.engine.setProperty('rate', voice.rate)
+        self.engine.setProperty('volume', voice.volume)
+        self.applied = voice
+
+    def synthesize(self, text: str, voice: VoiceSettings) -> bytes:
+        self._apply(voice)
+        self.engine.save_to_file(text, self.path)
+        self.engine.runAndWait()
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+class StubEngine:
+    """Offline stand-in for benchmarks and tests.
+
+    Produces a tone as long as the text would take to say at the requested
+    rate, spending ``render_factor`` seconds of CPU per second of audio the
+    way a local synthesiser would. The pitch follows the voice and the
+    amplitude the volume, so the settings each request rendered with can be
+    checked in its audio.
+    """
+
+    SAMPLE_RATE = 16000
+
+    def __init__(self, render_factor: float = 0.05):
+        self.render_factor = render_factor
+
+    @staticmethod
+    def pitch(voice: Optional[str]) -> int:
+        return 220 if voice is None else 160 + zlib.crc32(voice.encode("utf-8")) % 160
+
+    def synthesize(self, text: str, voice: VoiceSettings) -> bytes:
+        import numpy as np
+        duration = max(1, len(text.split())) * 60 / max(voice.rate, 1)
+        # Spin on CPU time, so workers sharing a core slow each other down like real engines
+        deadline = time.process_time() + duration * self.render_factor
+        while time.process_time() < deadline:
+            pass
+
+        t = np.arange(int(duration * self.SAMPLE_RATE)) / self.SAMPLE_RATE
+        samples = (np.sin(2 * np.pi * self.pitch(voice.voice) * t) * 10000 * voice.volume).astype("<i2").tobytes()
+        return wav_header(1, 2, self.SAMPLE_RATE, len(samples)) + samples
+
+def create_engine(name: str, **options):
+    if name == TTS_ENGINE_PYTTSX3:
+        return Pyttsx3Engine()
+    if name == TTS_ENGINE_STUB:
+        return StubEngine(**options)
+    raise ValueError(f"Unknown TTS engine: {name}")
+
+# Per-process engine, created on the worker's first request
+_worker_engine = None
+
+def synthesize_chunk(engine_name: str, engine_options: Dict[str, Any], text: str, voice: VoiceSettings) -> bytes:
+    """Render one chunk of text to WAV bytes with the request's voice settings; runs in a worker process"""
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = create_engine(engine_name, **engine_options)
+    return _worker_engine.synthesize(text, voice)
+
+class TtsPool:
+    """Speech synthesis in worker processes, one engine per process.
+
+    Text is split into sentences which are rendered in parallel and
+    streamed in order, so the first sentence can play while the rest are
+    still rendering. Each request keeps at most ``workers`` chunks in
+    flight so one long text cannot hold up every other request.
+    """
+
+    def __init__(self, engine: str = TTS_ENGINE_PYTTSX3, workers: int = 2, chunk_chars: int = 300,
+                 engine_options: Optional[Dict[str, Any]] = None):
+        self.engine = engine
+        self.workers = max(1, workers)
+        self.chunk_chars = chunk_chars
+        self.engine_options = engine_options or {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {"requests": 0, "chunks": 0, "audio_seconds": 0.0}
+
+    @classmethod
+    def from_settings(cls) -> "TtsPool":
+        return cls(engine=settings.TTS_ENGINE, workers=settings.TTS_WORKERS, chunk_chars=settings.TTS_CHUNK_CHARS)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def _submit(self, text: str, voice: VoiceSettings) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._get_pool(), synthesize_chunk, self.engine, self.engine_options, text, voice)
+
+    async def _iter_chunks(self, text: str, voice: VoiceSettings) -> AsyncIterator[Tuple[Tuple[int, int, int], bytes]]:
+        """(audio params, PCM frames) of each chunk of text, in order"""
+        chunks = deque(split_for_speech(text, self.chunk_chars))
+        if not chunks:
+            raise ValueError("No text to speak")
+        self.stats["requests"] += 1
+
+        pending: deque = deque()
+        params = None
+        try:
+            while chunks or pending:
+                while chunks and len(pending) < self.workers:
+                    pending.append(self._submit(chunks.popleft(), voice))
+                chunk_params, frames = read_wav(await pending.popleft())
+                if params is None:
+                    params = chunk_params
+                elif chunk_params != params:
+                    raise RuntimeError(f"TTS engine changed audio format mid-stream: {chunk_params} != {params}")
+                self.stats["chunks"] += 1
+                self.stats["audio_seconds"] += audio_duration(params, len(frames))
+                yield params, frames
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def iter_audio(self, text: str, voice: VoiceSettings) -> AsyncIterator[bytes]:
+        """A streaming WAV: the header, then each sentence's PCM frames as soon as it and those before it are rendered"""
+        first = True
+        async for params, frames in self._iter_chunks(text, voice):
+            if first:
+                yield wav_header(*params)
+                first = False
+            yield frames
+
+    async def synthesize(self, text: str, voice: VoiceSettings) -> Tuple[bytes, float]:
+        """A complete WAV file and its duration in seconds"""
+        params = None
+        frames = []
+        async for params, chunk_frames in self._iter_chunks(text, voice):
+            frames.append(chunk_frames)
+        audio = b"".join(frames)
+        return wav_header(*params, data_size=len(audio)) + audio, audio_duration(params, len(audio))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"engine": self.engine, "workers": self.workers, "started": self._pool is not None, **self.stats}
+
+    def close(self, wait: bool = False):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
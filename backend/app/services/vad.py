@@ -0,0 +1,107 @@
+from collections import deque
+from typing import Optional, List, Tuple
+import numpy as np
+from ..core.config import settings
+
+VAD_SPEECH_START = "speech_start"
+VAD_SPEECH_END = "speech_end"
+
+class EnergyVad:
+    """Splits a stream of 16-bit mono PCM into utterances by frame energy.
+
+    A frame is voiced when its RMS is above both ``threshold`` and
+    ``noise_ratio`` times the noise floor, which tracks the energy of
+    unvoiced frames so steady background noise does not count as speech.
+    ``start_ms`` of consecutive voiced frames start an utterance, together
+    with ``pre_roll_ms`` of audio before it so the first syllable is kept;
+    ``end_ms`` of silence, or ``max_utterance_seconds`` of audio, end it.
+    Trailing silence is trimmed to ``tail_ms`` before the utterance is
+    handed on, since the recognizer would only spend time on it.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 20, threshold: float = 500.0, noise_ratio: float = 3.0,
+                 start_ms: int = 60, end_ms: int = 500, pre_roll_ms: int = 200, tail_ms: int = 100,
+                 max_utterance_seconds: float = 15.0):
+        self.sample_rate = sample_rate
+        self.frame_bytes = max(1, sample_rate * frame_ms // 1000) * 2
+        self.threshold = threshold
+        self.noise_ratio = noise_ratio
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.end_frames = max(1, end_ms // frame_ms)
+        self.tail_frames = tail_ms // frame_ms
+        self.max_frames = max(1, int(max_utterance_seconds * 1000 / frame_ms))
+        self.noise_floor = 0.0
+        self.in_speech = False
+        self._buffer = bytearray()
+        self._pre_roll: deque = deque(maxlen=max(self.start_frames, pre_roll_ms // frame_ms))
+        self._utterance: List[bytes] = []
+        self._voiced_run = 0
+        self._silent_run = 0
+
+    @classmethod
+    def from_settings(cls, sample_rate: int) -> "EnergyVad":
+        return cls(
+            sample_rate=sample_rate,
+            frame_ms=settings.VAD_FRAME_MS,
+            threshold=settings.VAD_ENERGY_THRESHOLD,
+            start_ms=settings.VAD_START_MS,
+            end_ms=settings.VAD_END_SILENCE_MS,
+            max_utterance_seconds=settings.VAD_MAX_UTTERANCE_SECONDS
+        )
+
+    def feed(self, pcm: bytes) -> List[Tuple[str, Optional[bytes]]]:
+        """Events for the audio so far: (VAD_SPEECH_START, None) and (VAD_SPEECH_END, utterance PCM)"""
+        self._buffer += pcm
+        count = len(self._buffer) // self.frame_bytes
+        if not count:
+            return []
+        data = bytes(self._buffer[:count * self.frame_bytes])
+        del self._buffer[:count * self.frame_bytes]
+
+        samples = np.frombuffer(data, dtype="<i2").astype(np.float32).reshape(count, -1)
+        energies = np.sqrt((samples * samples).mean(axis=1))
+        events = []
+        for i, energy in enumerate(energies):
+            event = self._frame(data[i * self.frame_bytes:(i + 1) * self.frame_bytes], float(energy))
+            if event:
+                events.append(event)
+        return events
+
+    def flush(self) -> Optional[bytes]:
+        """End the stream: the utterance in progress, if any"""
+        self._buffer.clear()
+        utterance = self._end() if self.in_speech else None
+        self._pre_roll.clear()
+        self._voiced_run = 0
+        return utterance
+
+    def _frame(self, frame: bytes, energy: float) -> Optional[Tuple[str, Optional[bytes]]]:
+        voiced = energy > max(self.threshold, self.noise_floor * self.noise_ratio)
+
+        if not self.in_speech:
+            if not voiced:
+                self.noise_floor = 0.95 * self.noise_floor + 0.05 * energy
+            self._pre_roll.append(frame)
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= self.start_frames:
+                self.in_speech = True
+                self._utterance = list(self._pre_roll)
+                self._pre_roll.clear()
+                self._silent_run = 0
+                return VAD_SPEECH_START, None
+            return None
+
+        self._utterance.append(frame)
+        self._silent_run = 0 if voiced else self._silent_run + 1
+        if self._silent_run >= self.end_frames or len(self._utterance) >= self.max_frames:
+            return VAD_SPEECH_END, self._end()
+        return None
+
+    def _end(self) -> bytes:
+        keep = len(self._utterance) - max(0, self._silent_run - self.tail_frames)
+        utterance = b"".join(self._utterance[:keep])
+        self.in_speech = False
+        self._utterance = []
+        self._voiced_run = 0
+        self._silent_run = 0
+        return utterance
@@ -0,0 +1,112 @@
+import math
+import logging
+from dataclasses import dataclass
+import numpy as np
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_FLAT = "flat"
+INDEX_IVFPQ = "ivfpq"
+INDEX_HNSW = "hnsw"
+INDEX_TYPES = (INDEX_FLAT, INDEX_IVFPQ, INDEX_HNSW)
+
+@dataclass(frozen=True)
+class VectorIndexConfig:
+    """Index type and recall/speed knobs for the knowledge-base FAISS index.
+
+    Corpora smaller than ``train_threshold`` always use an exact flat index;
+    past it the configured approximate index is trained and used instead.
+    """
+    index_type: str = INDEX_FLAT
+    train_threshold: int = 50000
+    ivf_nlist: int = 0  # 0 picks ~4*sqrt(n)
+    ivf_nprobe: int = 16
+    pq_m: int = 48
+    pq_nbits: int = 8
+    hnsw_m: int = 32
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 64
+    train_sample_size: int = 100000
+
+    @classmethod
+    def from_settings(cls) -> "VectorIndexConfig":
+        index_type = settings.VECTOR_INDEX_TYPE.lower()
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown VECTOR_INDEX_TYPE '{settings.VECTOR_INDEX_TYPE}', expected one of {INDEX_TYPES}")
+        return cls(
+            index_type=index_type,
+            train_threshold=settings.VECTOR_INDEX_TRAIN_THRESHOLD,
+            ivf_nlist=settings.IVF_NLIST,
+            ivf_nprobe=settings.IVF_NPROBE,
+            pq_m=settings.PQ_M,
+            pq_nbits=settings.PQ_NBITS,
+            hnsw_m=settings.HNSW_M,
+            hnsw_ef_construction=settings.HNSW_EF_CONSTRUCTION,
+            hnsw_ef_search=settings.HNSW_EF_SEARCH
+        )
+
+    def type_for(self, ntotal: int) -> str:
+        """Index type to use for a corpus of ``ntotal`` vectors"""
+        if self.index_type == INDEX_FLAT or ntotal < self.train_threshold:
+            return INDEX_FLAT
+        return self.index_type
+
+def index_type_of(index) -> str:
+    import faiss
+    if isinstance(index, faiss.IndexIVFPQ):
+        return INDEX_IVFPQ
+    if isinstance(index, faiss.IndexHNSW):
+        return INDEX_HNSW
+    return INDEX_FLAT
+
+def _pq_subquantizers(dim: int, requested: int) -> int:
+    """Largest divisor of ``dim`` not above ``requested`` (IVF-PQ needs dim % m == 0)"""
+    for m in range(min(requested, dim), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+def configure_search(index, config: VectorIndexConfig):
+    """Apply query-time recall/speed parameters"""
+    import faiss
+    if isinstance(index, faiss.IndexIVF):
+        index.nprobe = min(config.ivf_nprobe, index.nlist)
+    elif isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = config.hnsw_ef_search
+    return index
+
+def create_index(index_type: str, dim: int, ntotal: int, config: VectorIndexConfig):
+    """Empty (possibly untrained) index of the given type"""
+    import faiss
+    if index_type == INDEX_IVFPQ:
+        # Keep ~39+ training points per centroid as faiss recommends
+        nlist = config.ivf_nlist or int(4 * math.sqrt(max(ntotal, 1)))
+        nlist = max(1, min(nlist, ntotal // 39 or 1))
+        quantizer = faiss.IndexFlatL2(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, _pq_subquantizers(dim, config.pq_m), config.pq_nbits)
+    elif index_type == INDEX_HNSW:
+        index = faiss.IndexHNSWFlat(dim, config.hnsw_m)
+        index.hnsw.efConstruction = config.hnsw_ef_construction
+    else:
+        index = faiss.IndexFlatL2(dim)
+    return configure_search(index, config)
+
+def build_index(vectors: np.ndarray, config: VectorIndexConfig):
+    """Create, train if needed, and fill the index appropriate for ``vectors``"""
+    ntotal, dim = vectors.shape
+    index_type = config.type_for(ntotal)
+    index = create_index(index_type, dim, ntotal, config)
+    if not index.is_trained:
+        rng = np.random.default_rng(0)
+        sample_size = min(ntotal, config.train_sample_size)
+        sample = vectors[np.sort(rng.choice(ntotal, sample_size, replace=False))] if sample_size < ntotal else vectors
+        logger.info(f"Training {index_type} index on {len(sample)} of {ntotal} vectors")
+        index.train(np.ascontiguousarray(sample, dtype=np.float32))
+    add_in_batches(index, vectors)
+    return index
+
+def add_in_batches(index, vectors: np.ndarray, batch_size: int = 65536):
+    """Add (possibly memory-mapped) vectors without materialising them all at once"""
+    for start in range(0, len(vectors), batch_size):
+        index.add(np.ascontiguousarray(vectors[start:start + batch_size], dtype=np.float32))
@@ -1,39 +1,40 @@
 import pyttsx3
 import speech_recognition as sr
 import asyncio
-import io
 import wave
 import threading
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Union, Set
 import logging
-import tempfile
-import os
+from ..core.config import settings
+from .tts import TtsPool, VoiceSettings, TTS_ENGINE_PYTTSX3, DEFAULT_VOICE_NAMES, complete_wav, read_wav, audio_duration
+from .audio_cache import AudioCache
+from .stt import SttPool, SAMPLE_RATE, SAMPLE_WIDTH
 
 logger = logging.getLogger(__name__)
 
 class VoiceService:
-    def __init__(self):
-        # Initialize TTS engine
-        try:
-            self.tts_engine = pyttsx3.init()
-            voices = self.tts_engine.getProperty('voices')
-            
-            # Set female voice if available
-            if voices and len(voices) > 1:
-                self.tts_engine.setProperty('voice', voices[1].id)
-            
-            # Set default properties
-            self.tts_engine.setProperty('rate', 150)  # Speed
-            self.tts_engine.setProperty('volume', 0.8)  # Volume (0.0 to 1.0)
-            
-            self.tts_available = True
-            logger.info("TTS engine initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize TTS engine: {str(e)}")
-            self.tts_engine = None
-            self.tts_available = False
+    def __init__(self, tts: Optional[TtsPool] = None, audio_cache: Optional[AudioCache] = None, stt: Optional[SttPool] = None):
+        # Speech for clients is synthesised in worker processes, each with its own engine
+        self.tts = tts or TtsPool.from_settings()
+        # Likewise recognised, with concurrent utterances batched per worker call
+        self.stt = stt or SttPool.from_settings()
+        # Phrases the assistant repeats are served from memory or disk instead of re-synthesised
+        if audio_cache is None and settings.TTS_CACHE_ENABLED:
+            audio_cache = AudioCache.from_settings()
+        self.audio_cache = audio_cache
+        # Defaults for new requests; replaced, never mutated, so requests in flight keep the settings they started with
+        self.default_voice_settings = VoiceSettings(rate=settings.DEFAULT_VOICE_SPEED)
+        self.tts_engine = None
+        # Voice ids the engine offers, listed once at start-up; None when the engine has no fixed list (stub)
+        self.voice_ids: Optional[Set[str]] = None
+        self.tts_lock = threading.Lock()
+        self.tts_available = True
+        
+        # Initialize the local TTS engine (voice listing and speaker playback)
+        if self.tts.engine == TTS_ENGINE_PYTTSX3:
+            self._init_local_engine()
         
-        # Initialize Speech Recognition
+        # Initialize the local microphone
         try:
             self.sr_recognizer = sr.Recognizer()
             self.microphone = sr.Microphone()
@@ -43,91 +44,143 @@ class VoiceService:
                 self.sr_recognizer.adjust_for_ambient_noise(source, duration=1)
             
             self.sr_available = True
-            logger.info("Speech recognition initialized successfully")
+            logger.info("Microphone initialized successfully")
         except Exception as e:
-            logger.error(f"Failed to initialize speech recognition: {str(e)}")
+            logger.error(f"Failed to initialize microphone: {str(e)}")
             self.sr_recognizer = None
             self.microphone = None
             self.sr_available = False
     
-    async def text_to_speech(self, text: str, voice: Optional[str] = None, speed: int = 150) -> Dict[str, Any]:
+    def _init_local_engine(self):
+        try:
+            self.tts_engine = pyttsx3.init()
+            voices = self.tts_engine.getProperty('voices')
+            self.voice_ids = {voice.id for voice in voices or []}
+            
+            # Set female voice if available
+            if voices and len(voices) > 1:
+                self.tts_engine.setProperty('voice', voices[1].id)
+            self.default_engine_voice = self.tts_engine.getProperty('voice')
+            
+            logger.info("TTS engine initialized successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize TTS engine: {str(e)}")
+            self.tts_engine = None
+            self.tts_available = False
+    
+    def check_voice(self, voice: Optional[str]):
+        """Raise ValueError for a voice id the engine does not offer; None and "default" are always accepted"""
+        if voice is None or voice.lower() in DEFAULT_VOICE_NAMES or self.voice_ids is None:
+            return
+        if voice not in self.voice_ids:
+            raise ValueError(f"Unknown voice: {voice}")
+    
+    def voice_settings(self, voice: Optional[str] = None, speed: Optional[int] = None) -> VoiceSettings:
+        """Settings for one request: the current defaults with the request's voice and speed applied"""
+        # Checked here, before the voice reaches a worker process
+        self.check_voice(voice)
+        return self.default_voice_settings.override(voice=voice, rate=speed)
+    
+    async def text_to_speech(self, text: str, voice: Optional[str] = None, speed: Optional[int] = None) -> Dict[str, Any]:
         """Convert text to speech and return audio data"""
         if not self.tts_available:
             return {"error": "TTS not available", "success": False}
         
         try:
-            # Set voice properties
-            self.tts_engine.setProperty('rate', speed)
-            
-            # Create temporary file for audio output
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_path = temp_file.name
-            
-            # Save speech to file
-            self.tts_engine.save_to_file(text, temp_path)
-            self.tts_engine.runAndWait()
-            
-            # Read the audio file
-            with open(temp_path, 'rb') as audio_file:
-                audio_data = audio_file.read()
-            
-            # Clean up
-            os.unlink(temp_path)
+            voice_settings = self.voice_settings(voice, speed)
+            loop = asyncio.get_running_loop()
+            key = self.audio_cache.key(text, voice_settings, "wav") if self.audio_cache else None
+            audio_data = await loop.run_in_executor(None, self.audio_cache.read, key) if key else None
+            if audio_data is None:
+                audio_data, duration = await self.tts.synthesize(text, voice_settings)
+                if key:
+                    await loop.run_in_executor(None, self.audio_cache.put, key, audio_data)
+            else:
+                params, frames = read_wav(audio_data)
+                duration = audio_duration(params, len(frames))
             
             return {
                 "success": True,
                 "audio_data": audio_data,
                 "format": "wav",
                 "text": text,
-                "duration": len(text) * 0.1  # Rough estimation
+                "duration": duration
             }
             
         except Exception as e:
             logger.error(f"TTS error: {str(e)}")
             return {"error": str(e), "success": False}
     
+    def cached_speech(self, text: str, voice: Optional[str] = None, speed: Optional[int] = None) -> Optional[Union[bytes, str]]:
+        """Previously synthesised audio: the WAV bytes from memory, the path of the WAV file on disk, or None"""
+        if self.audio_cache is None:
+            return None
+        return self.audio_cache.get(self.audio_cache.key(text, self.voice_settings(voice, speed), "wav"))
+    
+    def stream_speech(self, text: str, voice: Optional[str] = None, speed: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Streaming WAV of the text, rendered sentence by sentence in the worker pool"""
+        if not self.tts_available:
+            raise RuntimeError("TTS not available")
+        voice_settings = self.voice_settings(voice, speed)
+        stream = self.tts.iter_audio(text, voice_settings)
+        if self.audio_cache is None:
+            return stream
+        return self._cache_stream(self.audio_cache.key(text, voice_settings, "wav"), stream)
+    
+    async def _cache_stream(self, key: str, stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Pass the stream through, then cache the complete WAV; abandoned streams are not cached"""
+        header = None
+        frames = []
+        async for chunk in stream:
+            if header is None:
+                header = chunk
+            else:
+                frames.append(chunk)
+            yield chunk
+        audio = complete_wav(header, b"".join(frames))
+        await asyncio.get_running_loop().run_in_executor(None, self.audio_cache.put, key, audio)
+    
     async def speech_to_text(self, audio_data: bytes = None, timeout: int = 10) -> Dict[str, Any]:
-        """Convert speech to text from microphone or audio data"""
-        if not self.sr_available:
+        """Convert speech to text from microphone or audio data (a WAV, AIFF or FLAC file)"""
+        if not audio_data and not self.sr_available:
             return {"error": "Speech recognition not available", "success": False}
         
         try:
             if audio_data:
-                # Process provided audio data
-                audio_file = io.BytesIO(audio_data)
-                with sr.AudioFile(audio_file) as source:
-                    audio = self.sr_recognizer.record(source)
-            else:
-                # Listen from microphone
+                # Decoded and recognised in the worker pool
+                return await self.stt.transcribe(audio_data)
+            
+            # Listen from microphone, off the event loop
+            def _listen():
                 with self.microphone as source:
                     logger.info("Listening for speech...")
-                    audio = self.sr_recognizer.listen(source, timeout=timeout, phrase_time_limit=10)
+                    return self.sr_recognizer.listen(source, timeout=timeout, phrase_time_limit=10)
             
-            # Recognize speech using Google Speech Recognition
-            text = self.sr_recognizer.recognize_google(audio)
-            
-            return {
-                "success": True,
-                "text": text,
-                "confidence": 1.0  # Google API doesn't return confidence
-            }
+            audio = await asyncio.get_running_loop().run_in_executor(None, _listen)
+            pcm = audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=SAMPLE_WIDTH)
+            return await self.stt.transcribe(pcm, SAMPLE_RATE)
             
         except sr.WaitTimeoutError:
             return {"error": "No speech detected within timeout", "success": False}
-        except sr.UnknownValueError:
-            return {"error": "Could not understand audio", "success": False}
-        except sr.RequestError as e:
-            return {"error": f"Recognition service error: {str(e)}", "success": False}
         except Exception as e:
             logger.error(f"Speech recognition error: {str(e)}")
             return {"error": str(e), "success": False}
     
+    def _speak_local(self, text: str):
+        # The speaker engine is shared, so each utterance applies the current defaults while holding it
+        voice_settings = self.default_voice_settings
+        with self.tts_lock:
+            self.tts_engine.setProperty('voice', voice_settings.voice or self.default_engine_voice)
+            self.tts_engine.setProperty('rate', voice_settings.rate)
+            self.tts_engine.setProperty('volume', voice_settings.volume)
+            self.tts_engine.say(text)
+            self.tts_engine.runAndWait()
+    
     def speak_sync(self, text: str):
         """Synchronous speech - blocks until finished"""
-        if self.tts_available:
+        if self.tts_engine is not None:
             try:
-                self.tts_engine.say(text)
-                self.tts_engine.runAndWait()
+                self._speak_local(text)
                 return True
             except Exception as e:
                 logger.error(f"Sync speech error: {str(e)}")
@@ -138,12 +191,11 @@ class VoiceService:
         """Asynchronous speech - non-blocking"""
         def _speak():
             try:
-                self.tts_engine.say(text)
-                self.tts_engine.runAndWait()
+                self._speak_local(text)
             except Exception as e:
                 logger.error(f"Async speech error: {str(e)}")
         
-        if self.tts_available:
+        if self.tts_engine is not None:
             thread = threading.Thread(target=_speak)
             thread.daemon = True
             thread.start()
@@ -152,7 +204,7 @@ class VoiceService:
     
     def get_available_voices(self) -> Dict[str, Any]:
         """Get list of available TTS voices"""
-        if not self.tts_available:
+        if self.tts_engine is None:
             return {"voices": [], "error": "TTS not available"}
         
         try:
@@ -168,37 +220,33 @@ class VoiceService:
                 }
                 voice_list.append(voice_info)
             
-            return {"voices": voice_list, "current_voice": self.tts_engine.getProperty('voice')}
+            return {"voices": voice_list, "current_voice": self.default_voice_settings.voice or self.default_engine_voice}
             
         except Exception as e:
             logger.error(f"Error getting voices: {str(e)}")
             return {"voices": [], "error": str(e)}
     
     def set_voice(self, voice_id: str) -> bool:
-        """Set the TTS voice"""
+        """Set the default TTS voice for new requests"""
         if not self.tts_available:
             return False
         
         try:
-            self.tts_engine.setProperty('voice', voice_id)
+            self.check_voice(voice_id)
+            self.default_voice_settings = self.default_voice_settings.override(voice=voice_id)
             return True
         except Exception as e:
             logger.error(f"Error setting voice: {str(e)}")
             return False
     
     def set_speech_rate(self, rate: int) -> bool:
-        """Set the speech rate (words per minute)"""
+        """Set the default speech rate (words per minute) for new requests"""
         if not self.tts_available:
             return False
         
-        try:
-            # Clamp rate between reasonable limits
-            rate = max(50, min(300, rate))
-            self.tts_engine.setProperty('rate', rate)
-            return True
-        except Exception as e:
-            logger.error(f"Error setting speech rate: {str(e)}")
-            return False
+        # Clamped between reasonable limits
+        self.default_voice_settings = self.default_voice_settings.override(rate=rate)
+        return True
     
     def get_microphone_list(self) -> Dict[str, Any]:
         """Get list of available microphones"""
@@ -254,7 +302,14 @@ class VoiceService:
         return {
             "tts_available": self.tts_available,
             "speech_recognition_available": self.sr_available,
-            "current_voice": self.tts_engine.getProperty('voice') if self.tts_available else None,
-            "current_rate": self.tts_engine.getProperty('rate') if self.tts_available else None,
-            "energy_threshold": self.sr_recognizer.energy_threshold if self.sr_available else None
+            "current_voice": self.default_voice_settings.voice,
+            "current_rate": self.default_voice_settings.rate,
+            "energy_threshold": self.sr_recognizer.energy_threshold if self.sr_available else None,
+            "tts": self.tts.get_stats(),
+            "stt": self.stt.get_stats(),
+            "tts_cache": self.audio_cache.get_stats() if self.audio_cache else None
         }
+    
+    def close(self):
+        self.tts.close()
+        self.stt.close()
@@ -1,37 +1,72 @@
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any, Optional
+from functools import partial
+from typing import List, Dict, Any, Optional, AsyncIterator, Awaitable, Callable, Iterable
 import logging
-from urllib.parse import urljoin, urlparse
-import re
 from ..core.config import settings
+from .page_cache import PageCache
+from .html_extract import HtmlExtractor, extract_page, extract_search_results, is_valid_url
+from .summarizer import summarize
 
 logger = logging.getLogger(__name__)
 
+ResultProcessor = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+async def iter_completed(coros: Iterable[Awaitable[Any]]) -> AsyncIterator[Any]:
+    """Yield results in completion order; cancels the rest if the consumer stops early"""
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
 class WebScrapingService:
-    def __init__(self):
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None, page_cache: Optional[PageCache] = None, extractor: Optional[HtmlExtractor] = None):
         self.max_pages = settings.MAX_SCRAPE_PAGES
         self.timeout = settings.SCRAPE_TIMEOUT
-        self.session = None
+        # A session passed in (normally the shared pool) is borrowed, never closed here
+        self.session = session
+        self._owns_session = False
+        self.page_cache = page_cache
+        # Parses pages in a process pool; without one they are parsed in a thread
+        self.extractor = extractor
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.timeout),
-            headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-        )
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'User-Agent': settings.HTTP_USER_AGENT}
+            )
+            self._owns_session = True
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
+            self.session = None
+            self._owns_session = False
     
-    async def scrape_url(self, url: str, extract_links: bool = True, extract_images: bool = False) -> Dict[str, Any]:
-        """Scrape a single URL and extract content"""
+    async def scrape_url(self, url: str, extract_links: bool = True, extract_images: bool = False,
+                         headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Scrape a single URL and extract content; ``headers`` override the session's"""
         try:
-            async with self.session.get(url) as response:
+            loop = asyncio.get_running_loop()
+            cache_key = PageCache.key(url, extract_links=extract_links, extract_images=extract_images)
+            cached = await loop.run_in_executor(None, self.page_cache.get, cache_key) if self.page_cache else None
+            if cached and cached["fresh"]:
+                self.page_cache.record("hit")
+                return self._from_cache(cached["result"], "hit")
+            
+            # Revalidate a stale copy instead of downloading and parsing it again
+            request_headers = {**(headers or {}), **(self.page_cache.conditional_headers(cached) if self.page_cache else {})}
+            async with self.session.get(url, headers=request_headers) as response:
+                if response.status == 304 and cached:
+                    await loop.run_in_executor(None, self.page_cache.refresh, cache_key, response.headers)
+                    self.page_cache.record("revalidated")
+                    return self._from_cache(cached["result"], "revalidated")
+                
                 if response.status != 200:
                     return {
                         "url": url,
@@ -41,66 +76,19 @@ class WebScrapingService:
                     }
                 
                 html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Extract title
-                title = soup.find('title')
-                title_text = title.get_text().strip() if title else None
-                
-                # Remove script and style elements
-                for script in soup(["script", "style", "nav", "footer", "header"]):
-                    script.decompose()
-                
-                # Extract main content
-                main_content = soup.find('main') or soup.find('article') or soup.find('div', class_=re.compile(r'content|main|article'))
-                if main_content:
-                    text_content = main_content.get_text()
+                if self.extractor:
+                    result = await self.extractor.extract(html, url, extract_links, extract_images)
                 else:
-                    text_content = soup.get_text()
-                
-                # Clean up text
-                lines = (line.strip() for line in text_content.splitlines())
-                chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                content = ' '.join(chunk for chunk in chunks if chunk)
-                
-                result = {
-                    "url": url,
-                    "title": title_text,
-                    "content": content,
-                    "word_count": len(content.split()),
-                    "metadata": {
-                        "status_code": response.status,
-                        "content_type": response.headers.get('content-type', ''),
-                        "last_modified": response.headers.get('last-modified', ''),
-                    }
+                    result = await loop.run_in_executor(None, extract_page, html, url, extract_links, extract_images)
+                result["metadata"] = {
+                    "status_code": response.status,
+                    "content_type": response.headers.get('content-type', ''),
+                    "last_modified": response.headers.get('last-modified', ''),
                 }
                 
-                # Extract links if requested
-                if extract_links:
-                    links = []
-                    for link in soup.find_all('a', href=True):
-                        href = link['href']
-                        absolute_url = urljoin(url, href)
-                        if self._is_valid_url(absolute_url):
-                            links.append({
-                                "url": absolute_url,
-                                "text": link.get_text().strip(),
-                                "title": link.get('title', '')
-                            })
-                    result["links"] = links
-                
-                # Extract images if requested
-                if extract_images:
-                    images = []
-                    for img in soup.find_all('img', src=True):
-                        src = img['src']
-                        absolute_url = urljoin(url, src)
-                        images.append({
-                            "url": absolute_url,
-                            "alt": img.get('alt', ''),
-                            "title": img.get('title', '')
-                        })
-                    result["images"] = images
+                if self.page_cache:
+                    self.page_cache.record("miss")
+                    await loop.run_in_executor(None, self.page_cache.put, cache_key, url, response.headers, result)
                 
                 return result
                 
@@ -110,6 +98,9 @@ class WebScrapingService:
             logger.error(f"Error scraping {url}: {str(e)}")
             return {"url": url, "error": str(e), "content": "", "title": None}
     
+    def _from_cache(self, result: Dict[str, Any], outcome: str) -> Dict[str, Any]:
+        return {**result, "metadata": {**result.get("metadata", {}), "cache": outcome}}
+    
     async def scrape_multiple(self, urls: List[str], **kwargs) -> List[Dict[str, Any]]:
         """Scrape multiple URLs concurrently"""
         if not self.session:
@@ -120,83 +111,76 @@ class WebScrapingService:
             tasks = [self.scrape_url(url, **kwargs) for url in urls[:self.max_pages]]
             return await asyncio.gather(*tasks, return_exceptions=False)
     
+    async def iter_scrape(self, urls: List[str], process: Optional[ResultProcessor] = None, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Scrape URLs concurrently, yielding each result as soon as it is ready.
+
+        ``process`` runs on each result inside the same task (e.g. a summary),
+        so one slow page delays neither the others nor their processing.
+        """
+        async def scrape(url: str) -> Dict[str, Any]:
+            result = await self.scrape_url(url, **kwargs)
+            return await process(result) if process else result
+        
+        async for result in iter_completed([scrape(url) for url in urls[:self.max_pages]]):
+            yield result
+    
+    async def search(self, query: str, num_results: int = 3) -> List[Dict[str, Any]]:
+        """Search Google and return the top result URLs with their titles and snippets"""
+        # Create Google search URL
+        search_url = f"https://www.google.com/search?q={query.replace(' ', '+')}&num={num_results * 2}"
+        
+        async with self.session.get(search_url) as response:
+            if response.status != 200:
+                return []
+            
+            html = await response.text()
+            # Parsed off the event loop, like the pages themselves
+            if self.extractor:
+                return await self.extractor.search_results(html, num_results)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, extract_search_results, html, num_results)
+    
     async def search_and_scrape(self, query: str, num_results: int = 3) -> List[Dict[str, Any]]:
         """Search Google and scrape the top results"""
         try:
-            # Create Google search URL
-            search_url = f"https://www.google.com/search?q={query.replace(' ', '+')}&num={num_results * 2}"
+            search_results = await self.search(query, num_results)
+            
+            # Scrape the actual pages
+            urls = [result["url"] for result in search_results]
+            scraped_results = await self.scrape_multiple(urls, extract_links=False)
+            
+            # Combine search metadata with scraped content
+            return [
+                self._with_search_metadata(scraped, hit, query)
+                for scraped, hit in zip(scraped_results, search_results)
+            ]
             
-            async with self.session.get(search_url) as response:
-                if response.status != 200:
-                    return []
-                
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Extract search result URLs
-                search_results = []
-                for result in soup.find_all('div', class_='g'):
-                    link_tag = result.find('a')
-                    if link_tag and link_tag.get('href'):
-                        url = link_tag['href']
-                        if url.startswith('/url?q='):
-                            url = url.split('/url?q=')[1].split('&')[0]
-                        
-                        title_tag = result.find('h3')
-                        title = title_tag.get_text() if title_tag else ""
-                        
-                        snippet_tag = result.find('div', class_=['VwiC3b', 's3v9rd'])
-                        snippet = snippet_tag.get_text() if snippet_tag else ""
-                        
-                        if self._is_valid_url(url) and not any(domain in url for domain in ['youtube.com', 'facebook.com', 'twitter.com']):
-                            search_results.append({
-                                "url": url,
-                                "title": title,
-                                "snippet": snippet
-                            })
-                        
-                        if len(search_results) >= num_results:
-                            break
-                
-                # Scrape the actual pages
-                urls = [result["url"] for result in search_results]
-                scraped_results = await self.scrape_multiple(urls, extract_links=False)
-                
-                # Combine search metadata with scraped content
-                for i, scraped in enumerate(scraped_results):
-                    if i < len(search_results):
-                        scraped.update({
-                            "search_title": search_results[i]["title"],
-                            "search_snippet": search_results[i]["snippet"],
-                            "query": query
-                        })
-                
-                return scraped_results
-                
         except Exception as e:
             logger.error(f"Error in search and scrape: {str(e)}")
             return []
     
+    async def iter_search_and_scrape(self, query: str, num_results: int = 3, process: Optional[ResultProcessor] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming search_and_scrape: yields each page as soon as it is scraped (and processed)"""
+        search_results = await self.search(query, num_results)
+        
+        async def scrape(hit: Dict[str, Any]) -> Dict[str, Any]:
+            result = self._with_search_metadata(await self.scrape_url(hit["url"], extract_links=False), hit, query)
+            return await process(result) if process else result
+        
+        async for result in iter_completed([scrape(hit) for hit in search_results[:self.max_pages]]):
+            yield result
+    
+    def _with_search_metadata(self, scraped: Dict[str, Any], hit: Dict[str, Any], query: str) -> Dict[str, Any]:
+        scraped.update({
+            "search_title": hit["title"],
+            "search_snippet": hit["snippet"],
+            "query": query
+        })
+        return scraped
+    
     def _is_valid_url(self, url: str) -> bool:
         """Check if URL is valid and not a file download"""
-        try:
-            parsed = urlparse(url)
-            if not parsed.scheme or not parsed.netloc:
-                return False
-            
-            # Skip certain file types
-            excluded_extensions = ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.zip', '.rar', '.exe']
-            if any(url.lower().endswith(ext) for ext in excluded_extensions):
-                return False
-            
-            # Skip social media and video sites for content scraping
-            excluded_domains = ['facebook.com', 'twitter.com', 'instagram.com', 'tiktok.com']
-            if any(domain in parsed.netloc.lower() for domain in excluded_domains):
-                return False
-            
-            return True
-        except:
-            return False
+        return is_valid_url(url)
     
     async def get_page_summary(self, url: str) -> str:
         """Get a concise summary of a web page"""
@@ -211,12 +195,8 @@ class WebScrapingService:
         if not content:
             return f"No content found at {url}"
         
-        # Simple summarization - take first few sentences
-        sentences = content.split('. ')
-        summary_sentences = sentences[:3]  # First 3 sentences
-        summary = '. '.join(summary_sentences)
-        
-        if len(summary) > 500:
-            summary = summary[:500] + "..."
+        # Extractive summary, scored off the event loop
+        loop = asyncio.get_running_loop()
+        summary = await loop.run_in_executor(None, partial(summarize, content, 3, max_chars=500))
         
         return f"**{title}**\n\n{summary}" if title else summary
@@ -1,6 +1,7 @@
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from contextlib import asynccontextmanager
 import uvicorn
 import asyncio
 import json
@@ -8,14 +9,30 @@ from typing import Dict, List
 import logging
 
 from app.core.config import settings
+from app.core.services import services
 from app.api.endpoints import router
-from app.services.ai_service import AdvancedAIService
-from app.services.voice_service import VoiceService
+from app.api.websocket import manager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize shared services on startup and release them on shutdown"""
+    logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
+    logger.info(f"Debug mode: {settings.DEBUG}")
+    logger.info(f"API Documentation available at: /api/docs")
+    await services.startup()
+    
+    yield
+    
+    logger.info("Shutting down DariusAI...")
+    # Close any open connections, then release the shared services
+    for session_id in list(manager.active_connections.keys()):
+        manager.disconnect(session_id)
+    await services.shutdown()
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
@@ -23,7 +40,8 @@ app = FastAPI(
     description="Advanced Web-Based AI Assistant with Voice, Web Scraping, and Automation Capabilities",
     openapi_url="/api/openapi.json",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -38,73 +56,6 @@ app.add_middleware(
 # Include API routes
 app.include_router(router, prefix=settings.API_V1_STR)
 
-# WebSocket connection manager for real-time chat
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.ai_service = AdvancedAIService()
-        self.voice_service = VoiceService()
-
-    async def connect(self, websocket: WebSocket, session_id: str):
-        await websocket.accept()
-        self.active_connections[session_id] = websocket
-        logger.info(f"WebSocket connection established: {session_id}")
-
-    def disconnect(self, session_id: str):
-        if session_id in self.active_connections:
-            del self.active_connections[session_id]
-            logger.info(f"WebSocket connection closed: {session_id}")
-
-    async def send_personal_message(self, message: dict, session_id: str):
-        if session_id in self.active_connections:
-            websocket = self.active_connections[session_id]
-            await websocket.send_text(json.dumps(message))
-
-    async def handle_message(self, message: dict, session_id: str):
-        """Handle incoming WebSocket messages"""
-        try:
-            message_type = message.get("type", "chat")
-            content = message.get("content", "")
-            
-            if message_type == "chat":
-                # Regular chat message
-                response = await self.ai_service.chat(
-                    message=content,
-                    session_id=session_id,
-                    context=message.get("context")
-                )
-                
-                await self.send_personal_message({
-                    "type": "chat_response",
-                    "content": response["response"],
-                    "metadata": response.get("metadata", {}),
-                    "suggestions": response.get("suggestions", [])
-                }, session_id)
-                
-            elif message_type == "voice":
-                # Voice message (base64 encoded audio)
-                # This would be implemented to handle voice data
-                await self.send_personal_message({
-                    "type": "voice_response",
-                    "content": "Voice processing not fully implemented in WebSocket yet"
-                }, session_id)
-                
-            elif message_type == "typing":
-                # Handle typing indicators
-                await self.send_personal_message({
-                    "type": "typing_response",
-                    "content": "I'm thinking..."
-                }, session_id)
-                
-        except Exception as e:
-            logger.error(f"Error handling WebSocket message: {str(e)}")
-            await self.send_personal_message({
-                "type": "error",
-                "content": "Sorry, I encountered an error processing your message."
-            }, session_id)
-
-manager = ConnectionManager()
-
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     """WebSocket endpoint for real-time chat"""
@@ -119,9 +70,14 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     
     try:
         while True:
-            # Receive message from client
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            # Receive message from client: JSON text, or binary PCM for a voice conversation
+            data = await websocket.receive()
+            if data["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(data.get("code", 1000))
+            if data.get("bytes") is not None:
+                await manager.handle_audio(data["bytes"], session_id)
+                continue
+            message = json.loads(data["text"])
             
             # Handle the message
             await manager.handle_message(message, session_id)
@@ -133,6 +89,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             "type": "error",
             "content": "Invalid message format. Please send valid JSON."
         }, session_id)
+        manager.disconnect(session_id)
     except Exception as e:
         logger.error(f"WebSocket error: {str(e)}")
         await manager.send_personal_message({
@@ -169,7 +126,7 @@ async def api_status():
         "environment": "development" if settings.DEBUG else "production",
         "services": {
             "ai_service": "available",
-            "voice_service": manager.voice_service.get_status(),
+            "voice_service": manager.voice_service.get_status() if services.is_initialized("voice_service") else "not_initialized",
             "web_scraping": "available",
             "websocket": f"{len(manager.active_connections)} active connections"
         },
@@ -185,21 +142,6 @@ async def api_status():
         }
     }
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize services on startup"""
-    logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
-    logger.info(f"Debug mode: {settings.DEBUG}")
-    logger.info(f"API Documentation available at: /api/docs")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup on shutdown"""
-    logger.info("Shutting down DariusAI...")
-    # Close any open connections, save state, etc.
-    for session_id in list(manager.active_connections.keys()):
-        manager.disconnect(session_id)
-
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
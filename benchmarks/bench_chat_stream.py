@@ -0,0 +1,83 @@
+"""Time-to-first-token of chat_stream versus the buffered chat call.
+
+Runs fully offline against the fake streaming LLM (FAKE_LLM=true), so the
+only latency measured is the per-token delay plus our own overhead. The
+response cache is off for the streaming comparison, otherwise the stream
+would replay the answer the buffered call just cached; its effect is
+reported separately as a cold question versus the same question repeated
+in a new session.
+
+    python benchmarks/bench_chat_stream.py --runs 20 --token-delay 0.05
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+
+
+async def _measure(ai_service, runs):
+    buffered, first_token, stream_total = [], [], []
+    for i in range(runs):
+        start = time.perf_counter()
+        await ai_service.chat(f"buffered benchmark question {i}", session_id=f"bench-{i}")
+        buffered.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ttft = None
+        async for frame in ai_service.chat_stream(f"streamed benchmark question {i}", session_id=f"bench-stream-{i}"):
+            if ttft is None and frame["type"] == "chat_delta":
+                ttft = time.perf_counter() - start
+        stream_total.append(time.perf_counter() - start)
+        first_token.append(ttft)
+    return buffered, first_token, stream_total
+
+
+async def _measure_cache(ai_service, runs):
+    uncached, cached = [], []
+    for i in range(runs):
+        for samples, session_id in ((uncached, f"bench-cold-{i}"), (cached, f"bench-repeat-{i}")):
+            start = time.perf_counter()
+            async for _ in ai_service.chat_stream(f"cached benchmark question {i}", session_id=session_id):
+                pass
+            samples.append(time.perf_counter() - start)
+    return uncached, cached
+
+
+def _fmt(samples):
+    return f"median {statistics.median(samples) * 1000:8.1f} ms, max {max(samples) * 1000:8.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--token-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    os.environ["FAKE_LLM"] = "true"
+    os.environ["FAKE_LLM_TOKEN_DELAY"] = str(args.token_delay)
+    sys.path.insert(0, os.path.abspath(BACKEND_DIR))
+    # Run from an empty directory so no on-disk knowledge base is picked up
+    os.chdir(tempfile.mkdtemp(prefix="bench_chat_stream_"))
+
+    from app.core.config import settings
+    from app.services.ai_service import AdvancedAIService
+
+    settings.RESPONSE_CACHE_ENABLED = False
+    buffered, first_token, stream_total = asyncio.run(_measure(AdvancedAIService(), args.runs))
+    print(f"chat (time to full reply):      {_fmt(buffered)}")
+    print(f"chat_stream (time to 1st token): {_fmt(first_token)}")
+    print(f"chat_stream (time to chat_done): {_fmt(stream_total)}")
+
+    settings.RESPONSE_CACHE_ENABLED = True
+    uncached, cached = asyncio.run(_measure_cache(AdvancedAIService(), args.runs))
+    print(f"chat_stream, cache miss:         {_fmt(uncached)}")
+    print(f"chat_stream, cache hit:          {_fmt(cached)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Breadth-first crawl of a local mock site, checking politeness and dedup.
+
+Serves a generated site from a local aiohttp server. Every page links to its
+children, to the home page, and to fragment/query variants of the same
+URLs, and robots.txt disallows /private/ to the crawler's agent only. The
+site is crawled with the backend Crawler, with and without per-host rate
+limiting. For each run the script reports pages fetched, elapsed time, the
+peak request rate the server saw in any one-second window, duplicate
+fetches, robots violations, and requests that did not carry the crawler's
+User-Agent.
+
+    python benchmarks/bench_crawler.py --pages 60 --depth 3 --rate 20
+"""
+import argparse
+import asyncio
+import collections
+import os
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.core.config import settings  # noqa: E402
+from app.core.http import HttpClientPool  # noqa: E402
+from app.services.crawler import Crawler, HostRateLimiter, RobotsCache, robots_agent  # noqa: E402
+from app.services.web_scraping import WebScrapingService  # noqa: E402
+
+
+def _page(i, fanout):
+    children = range(i * fanout + 1, i * fanout + fanout + 1)
+    links = "".join(
+        f'<li><a href="/p/{c}">Page {c}</a> <a href="/p/{c}#top">top</a> <a href="/p/{c}?b=2&a=1">v</a></li>'
+        for c in children
+    )
+    return (
+        f"<html><head><title>Page {i}</title></head><body>"
+        f'<main><p>Content of page {i}.</p><ul>{links}</ul>'
+        f'<a href="/">Home</a> <a href="/private/{i}">Private</a> <a href="/p/{i}?a=1&b=2">self</a></main>'
+        "</body></html>"
+    )
+
+
+async def _start_site(fanout, latency):
+    hits = []
+    agents = collections.Counter()
+
+    @web.middleware
+    async def record_agent(request, handler):
+        agents[request.headers.get("User-Agent", "")] += 1
+        return await handler(request)
+
+    async def robots(request):
+        # Only the crawler's own group disallows /private/
+        return web.Response(text=f"User-agent: {robots_agent(settings.CRAWL_USER_AGENT)}\nDisallow: /private/\n\n"
+                                 "User-agent: *\nDisallow:\n")
+
+    async def home(request):
+        hits.append((time.monotonic(), request.path_qs))
+        return web.Response(text=_page(0, fanout), content_type="text/html")
+
+    async def page(request):
+        hits.append((time.monotonic(), request.path_qs))
+        await asyncio.sleep(latency)
+        return web.Response(text=_page(int(request.match_info["i"]), fanout), content_type="text/html")
+
+    async def private(request):
+        hits.append((time.monotonic(), request.path_qs))
+        return web.Response(text="secret", content_type="text/html")
+
+    app = web.Application(middlewares=[record_agent])
+    app.router.add_get("/robots.txt", robots)
+    app.router.add_get("/", home)
+    app.router.add_get("/p/{i}", page)
+    app.router.add_get("/private/{i}", private)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/", hits, agents
+
+
+def _peak_rate(hits):
+    times = sorted(t for t, _ in hits)
+    peak, start = 0, 0
+    for end in range(len(times)):
+        while times[end] - times[start] > 1.0:
+            start += 1
+        peak = max(peak, end - start + 1)
+    return peak
+
+
+async def _crawl(label, root, hits, agents, args, rate):
+    hits.clear()
+    agents.clear()
+    pool = HttpClientPool()
+    try:
+        async with WebScrapingService(session=await pool.get_session()) as scraper:
+            crawler = Crawler(
+                scraper,
+                max_pages=args.pages,
+                max_depth=args.depth,
+                concurrency=args.concurrency,
+                robots=RobotsCache(),
+                rate_limiter=HostRateLimiter(rate=rate, burst=args.burst)
+            )
+            start = time.perf_counter()
+            first = None
+            results = []
+            async for result in crawler.iter_crawl([root], extract_links=False):
+                first = first or time.perf_counter() - start
+                results.append(result)
+            elapsed = time.perf_counter() - start
+    finally:
+        await pool.aclose()
+
+    paths = collections.Counter(path for _, path in hits)
+    duplicates = sum(count - 1 for count in paths.values())
+    violations = sum(1 for path in paths if path.startswith("/private/"))
+    other_agents = sum(count for agent, count in agents.items() if agent != settings.CRAWL_USER_AGENT)
+    depths = collections.Counter(result["metadata"]["depth"] for result in results)
+    print(
+        f"{label:<14} {len(results):4d} pages  {elapsed:6.2f}s  first {first * 1000:6.1f}ms  "
+        f"peak {_peak_rate(hits):4d} req/s  duplicates {duplicates}  robots violations {violations}  "
+        f"other user agents {other_agents}  depths {dict(sorted(depths.items()))}"
+    )
+
+
+async def main_async(args):
+    runner, root, hits, agents = await _start_site(args.fanout, args.latency)
+    try:
+        await _crawl("unthrottled", root, hits, agents, args, rate=10000.0)
+        await _crawl(f"{args.rate:g} req/s/host", root, hits, agents, args, rate=args.rate)
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=20.0, help="Per-host requests per second")
+    parser.add_argument("--burst", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds the mock site takes per page")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
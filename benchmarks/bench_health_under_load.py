@@ -0,0 +1,110 @@
+"""Latency of /api/v1/health while chats are in flight.
+
+Starts the backend with the offline fake LLM (FAKE_LLM=true), measures
+/api/v1/health latency idle, then again while N chat requests are being
+served. With the LLM off the event loop the p99 should stay flat.
+
+    python benchmarks/bench_health_under_load.py --chats 50
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _wait_until_up(session, base_url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{base_url}/api/v1/health") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Backend did not start in time")
+
+
+async def _probe_health(session, base_url, duration, interval=0.01):
+    latencies = []
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        async with session.get(f"{base_url}/api/v1/health") as response:
+            await response.read()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def _chat(session, base_url, i):
+    async with session.post(f"{base_url}/api/v1/chat", json={"message": f"load test {i}", "session_id": f"load-{i}"}) as response:
+        await response.read()
+        return response.status
+
+
+async def _run(base_url, chats, duration):
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=chats + 10)) as session:
+        await _wait_until_up(session, base_url)
+        # Warm the AI service so model construction is not measured
+        await _chat(session, base_url, "warmup")
+
+        idle = await _probe_health(session, base_url, duration)
+
+        chat_tasks = [asyncio.create_task(_chat(session, base_url, i)) for i in range(chats)]
+        loaded = await _probe_health(session, base_url, duration)
+        statuses = await asyncio.gather(*chat_tasks)
+
+    for label, samples in (("idle", idle), (f"{chats} chats in flight", loaded)):
+        print(f"health {label:>22}: p50 {_percentile(samples, 50) * 1000:7.2f} ms, "
+              f"p99 {_percentile(samples, 99) * 1000:7.2f} ms ({len(samples)} probes)")
+    print(f"chat statuses: {dict((s, statuses.count(s)) for s in set(statuses))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to probe health in each phase")
+    parser.add_argument("--token-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    port = _free_port()
+    env = dict(
+        os.environ,
+        FAKE_LLM="true",
+        FAKE_LLM_TOKEN_DELAY=str(args.token_delay),
+        PYTHONPATH=BACKEND_DIR,
+        DEBUG="false"
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR, "--port", str(port), "--log-level", "warning"],
+        cwd=tempfile.mkdtemp(prefix="bench_health_"), env=env
+    )
+    try:
+        asyncio.run(_run(f"http://127.0.0.1:{port}", args.chats, args.duration))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Pages/sec of HTML extraction per parser backend, inline and in the process pool.
+
+Runs app.services.html_extract.extract_page over a corpus of HTML files:
+the saved pages in benchmarks/fixtures/html by default, or the *.html in
+--fixtures DIR. --generate uses synthetic article-like pages with
+navigation, scripts and link lists instead.
+For each installed backend (html.parser, lxml, selectolax) it reports
+single-process pages/sec, then pages/sec through HtmlExtractor's process
+pool and the worst event-loop stall while that pool is busy.
+
+    python benchmarks/bench_html_extract.py
+    python benchmarks/bench_html_extract.py --fixtures saved_pages/
+    python benchmarks/bench_html_extract.py --generate --pages 200
+"""
+import argparse
+import asyncio
+import glob
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.services.html_extract import (  # noqa: E402
+    PARSER_HTML, PARSER_LXML, PARSER_SELECTOLAX, HtmlExtractor, available_parser, extract_page
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "html")
+
+WORDS = (
+    "assistant knowledge document retrieval vector index embedding latency throughput "
+    "language model context question answer summary search page chunk token batch "
+    "process worker memory cache network request response stream pipeline parser"
+).split()
+
+
+def generate_page(rng, paragraphs):
+    def sentence():
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+    nav = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(30))
+    body = "".join(
+        f"<p>{' '.join(sentence() for _ in range(4))} <a href=\"/article/{rng.randint(0, 10000)}\">more</a></p>"
+        + (f'<img src="/img/{i}.png" alt="figure {i}">' if i % 5 == 0 else "")
+        for i in range(paragraphs)
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>Generated article</title>"
+        "<style>body { font-family: sans-serif; }</style><script>var tracking = {};</script></head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f'<div class="page-content"><article><h1>Generated article</h1>{body}</article></div>'
+        f"<footer><ul>{nav}</ul></footer></body></html>"
+    )
+
+
+def load_corpus(args):
+    if args.generate:
+        rng = random.Random(0)
+        return [generate_page(rng, rng.randint(20, 200)) for _ in range(args.pages)]
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(args.fixtures, "*.html"))):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            corpus.append(f.read())
+    return corpus * args.repeat
+
+
+def bench_inline(corpus, parser):
+    start = time.perf_counter()
+    words = sum(extract_page(html, "https://example.com/", True, True, parser)["word_count"] for html in corpus)
+    return len(corpus) / (time.perf_counter() - start), words
+
+
+async def bench_pool(corpus, parser, workers):
+    extractor = HtmlExtractor(parser=parser, workers=workers)
+    stalls = []
+    done = asyncio.Event()
+
+    async def watch_loop(interval=0.005):
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            stalls.append(time.perf_counter() - start - interval)
+
+    try:
+        # Warm the pool so process start-up is not counted
+        await asyncio.gather(*(extractor.extract(corpus[0], "https://example.com/") for _ in range(extractor.workers)))
+        watcher = asyncio.create_task(watch_loop())
+        start = time.perf_counter()
+        await asyncio.gather(*(extractor.extract(html, "https://example.com/", True, True) for html in corpus))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await watcher
+        return len(corpus) / elapsed, max(stalls, default=0.0)
+    finally:
+        extractor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", default=FIXTURES, help="Directory of saved *.html pages")
+    parser.add_argument("--repeat", type=int, default=20, help="Times each saved page is parsed")
+    parser.add_argument("--generate", action="store_true", help="Use generated pages instead of saved ones")
+    parser.add_argument("--pages", type=int, default=200, help="Generated pages with --generate")
+    parser.add_argument("--workers", type=int, default=0, help="Pool processes, 0 = one per CPU")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args)
+    if not corpus:
+        sys.exit("No HTML fixtures found")
+    size = sum(len(html) for html in corpus)
+    print(f"Corpus: {len(corpus)} pages, {size / len(corpus) / 1024:.0f} KiB average")
+
+    for backend in (PARSER_HTML, PARSER_LXML, PARSER_SELECTOLAX):
+        if available_parser(backend) != backend:
+            print(f"{backend:<12} not installed, skipped")
+            continue
+        inline_rate, words = bench_inline(corpus, backend)
+        pool_rate, stall = asyncio.run(bench_pool(corpus, backend, args.workers))
+        print(
+            f"{backend:<12} inline {inline_rate:8.1f} pages/s   pool {pool_rate:8.1f} pages/s   "
+            f"max loop stall {stall * 1000:6.1f}ms   words {words}"
+        )
+
+
+if __name__ == "__main__":
+    main()
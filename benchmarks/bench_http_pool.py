@@ -0,0 +1,103 @@
+"""Per-request scrape latency with a fresh session vs the shared connection pool.
+
+Serves a generated HTML page from a local aiohttp server, then scrapes it
+with WebScrapingService the legacy way (a new ClientSession, connection and
+DNS lookup per request) and with a session borrowed from HttpClientPool.
+Requests are issued sequentially and in concurrent bursts. Against a remote
+HTTPS host the gap is larger, since every fresh connection also pays for a
+DNS lookup and a TLS handshake.
+
+    python benchmarks/bench_http_pool.py --requests 500 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.core.http import HttpClientPool  # noqa: E402
+from app.services.web_scraping import WebScrapingService  # noqa: E402
+
+PAGE = (
+    "<html><head><title>Benchmark page</title></head><body><main>"
+    + "".join(f"<p>Paragraph {i} of the benchmark page with some text to extract.</p>" for i in range(50))
+    + "</main></body></html>"
+)
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _start_server():
+    async def page(request):
+        return web.Response(text=PAGE, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/page", page)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/page"
+
+
+async def _scrape_fresh(url):
+    async with WebScrapingService() as scraper:
+        return await scraper.scrape_url(url, extract_links=False)
+
+
+async def _scrape_pooled(pool, url):
+    async with WebScrapingService(session=await pool.get_session()) as scraper:
+        return await scraper.scrape_url(url, extract_links=False)
+
+
+async def _run(label, scrape, requests, concurrency):
+    latencies = []
+
+    async def timed():
+        start = time.perf_counter()
+        result = await scrape()
+        latencies.append(time.perf_counter() - start)
+        if result.get("error"):
+            raise RuntimeError(result["error"])
+
+    start = time.perf_counter()
+    for offset in range(0, requests, concurrency):
+        await asyncio.gather(*(timed() for _ in range(min(concurrency, requests - offset))))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<26} mean {statistics.mean(latencies) * 1000:7.2f}ms  "
+        f"p50 {_percentile(latencies, 50) * 1000:7.2f}ms  p99 {_percentile(latencies, 99) * 1000:7.2f}ms  "
+        f"{requests / elapsed:8.1f} req/s"
+    )
+
+
+async def main_async(args):
+    runner, url = await _start_server()
+    pool = HttpClientPool(limit=args.concurrency * 2, limit_per_host=args.concurrency)
+    try:
+        for concurrency in sorted({1, args.concurrency}):
+            await _run(f"fresh session  (c={concurrency})", lambda: _scrape_fresh(url), args.requests, concurrency)
+            await _run(f"shared pool    (c={concurrency})", lambda: _scrape_pooled(pool, url), args.requests, concurrency)
+    finally:
+        await pool.aclose()
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Throughput of the document ingestion pipeline on a generated PDF.
+
+Generates an N-page text PDF, then measures parse + split + embed for the
+legacy sequential path (PyPDFLoader on one core) and for IngestionPipeline
+with 1 and all CPU workers. Embeddings are langchain's FakeEmbeddings so the
+numbers isolate our own pipeline; pass --hf to use all-MiniLM-L6-v2.
+
+    python benchmarks/bench_ingestion.py --pages 500
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+WORDS = (
+    "assistant knowledge document retrieval vector index embedding latency throughput "
+    "language model context question answer summary search page chunk token batch "
+    "process worker memory cache network request response stream pipeline parser"
+).split()
+
+
+def generate_pdf(path, num_pages, lines_per_page=45, seed=0):
+    """Write a minimal, valid text-only PDF without third-party libraries"""
+    rng = random.Random(seed)
+    objects = {
+        1: "<< /Type /Catalog /Pages 2 0 R >>",
+        3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    page_ids = []
+    next_id = 4
+    for _ in range(num_pages):
+        lines = [" ".join(rng.choice(WORDS) for _ in range(12)) + "." for _ in range(lines_per_page)]
+        stream = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(f"({line}) '" for line in lines) + " ET"
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        objects[content_id] = f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"
+        objects[page_id] = (
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        page_ids.append(page_id)
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += f"{obj_id} 0 obj\n{objects[obj_id]}\nendobj\n".encode("latin-1")
+    xref_offset = len(out)
+    size = max(objects) + 1
+    out += f"xref\n0 {size}\n0000000000 65535 f \n".encode("latin-1")
+    for obj_id in range(1, size):
+        out += f"{offsets[obj_id]:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def legacy_ingest(path, embeddings):
+    from langchain.document_loaders import PyPDFLoader
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    documents = PyPDFLoader(path).load()
+    splits = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200).split_documents(documents)
+    embeddings.embed_documents([doc.page_content for doc in splits])
+    return len(documents), len(splits)
+
+
+async def pipeline_ingest(path, embeddings, workers, batch_size):
+    from app.services.ingestion import IngestionPipeline
+    pipeline = IngestionPipeline(workers=workers, embed_batch_size=batch_size)
+    try:
+        documents = await pipeline.load_documents(path, "pdf")
+        splits = await pipeline.split(documents)
+        await pipeline.embed(embeddings, [doc.page_content for doc in splits])
+        return len(documents), len(splits)
+    finally:
+        pipeline.close()
+
+
+def _report(label, pages, chunks, elapsed):
+    print(f"{label:<28} {elapsed:7.2f}s  {pages / elapsed:8.1f} pages/s  {chunks / elapsed:8.1f} chunks/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--hf", action="store_true", help="Use HuggingFace all-MiniLM-L6-v2 embeddings")
+    args = parser.parse_args()
+
+    if args.hf:
+        from langchain.embeddings import HuggingFaceEmbeddings
+        embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    else:
+        from langchain.embeddings import FakeEmbeddings
+        embeddings = FakeEmbeddings(size=384)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_ingestion_"), "generated.pdf")
+    generate_pdf(path, args.pages)
+    print(f"Generated {args.pages}-page PDF ({os.path.getsize(path) / 1024:.0f} KiB)")
+
+    start = time.perf_counter()
+    pages, chunks = legacy_ingest(path, embeddings)
+    _report("legacy (PyPDFLoader)", pages, chunks, time.perf_counter() - start)
+
+    for workers in sorted({1, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        pages, chunks = asyncio.run(pipeline_ingest(path, embeddings, workers, args.batch_size))
+        _report(f"pipeline ({workers} workers)", pages, chunks, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Cold-start time and peak RSS of the backend service layout.
+
+Compares the old layout (the REST router and the WebSocket manager each
+building their own AdvancedAIService/VoiceService) with the shared
+ServiceContainer. Every layout runs in a fresh interpreter so the numbers
+are not polluted by models already loaded in this process.
+
+    python benchmarks/bench_service_startup.py
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+
+
+def _peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _run_layout(layout):
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(BACKEND_DIR)
+    start = time.perf_counter()
+
+    if layout == "legacy":
+        from app.services.ai_service import AdvancedAIService
+        from app.services.voice_service import VoiceService
+        # endpoints.py module level + ConnectionManager.__init__
+        instances = [AdvancedAIService(), VoiceService(), AdvancedAIService(), VoiceService()]
+    else:
+        from app.core.services import services
+        # The REST router and the WebSocket manager resolve the same instances
+        instances = [services.ai_service, services.voice_service, services.ai_service, services.voice_service]
+
+    elapsed = time.perf_counter() - start
+    return {
+        "layout": layout,
+        "cold_start_s": round(elapsed, 3),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "distinct_instances": len({id(instance) for instance in instances}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layout", choices=["legacy", "shared"], help="Run a single layout in-process")
+    args = parser.parse_args()
+
+    if args.layout:
+        print(json.dumps(_run_layout(args.layout)))
+        return
+
+    for layout in ("legacy", "shared"):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--layout", layout],
+            check=True, capture_output=True, text=True
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        print(f"{result['layout']:>7}: cold start {result['cold_start_s']:.3f}s, "
+              f"peak RSS {result['peak_rss_mb']:.1f} MB, "
+              f"{result['distinct_instances']} service instances")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Import time, time to first window and time to models ready for the DariusAI desktop app.
+
+Each measurement runs in a fresh interpreter so nothing is cached between
+runs (model weights still come from the Hugging Face disk cache). The
+current mark8.py is compared with the version at --baseline, a git
+revision, which loads every model eagerly in DariusAI.__init__. The app
+needs its desktop dependencies (customtkinter, pywin32, pyttsx3), so run
+this on the machine the assistant runs on.
+
+    python benchmarks/bench_startup.py --runs 3
+    python benchmarks/bench_startup.py --baseline HEAD~3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {module_dir!r})
+sys.path.insert(0, {root!r})
+import {module} as desktop
+imported = time.perf_counter()
+app = desktop.DariusAI()
+app.update()
+window = time.perf_counter()
+models_ready = getattr(app, "models_ready", None)
+while models_ready is not None and not models_ready.is_set():
+    app.update()
+    time.sleep(0.02)
+ready = time.perf_counter()
+print(json.dumps({{"import": imported - start, "window": window - start, "ready": ready - start}}))
+app.after(0, app.destroy)
+app.mainloop()
+"""
+
+
+def probe(module_dir, module):
+    # Each run gets an empty working directory, so the knowledge base cache starts empty
+    with tempfile.TemporaryDirectory(prefix="bench_startup_") as cwd:
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module_dir=module_dir, root=os.path.abspath(ROOT), module=module)],
+            cwd=cwd, capture_output=True, text=True
+        )
+    if result.returncode:
+        sys.exit(f"{module} failed to start: {result.stderr.strip().splitlines()[-1]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def report(label, runs):
+    medians = {key: statistics.median(run[key] for run in runs) for key in ("import", "window", "ready")}
+    print(
+        f"{label:<10} import {medians['import']:6.2f}s   first window {medians['window']:6.2f}s   "
+        f"models ready {medians['ready']:6.2f}s   ({len(runs)} runs, median)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--baseline", help="Git revision of mark8.py to compare against (default: the root commit)")
+    args = parser.parse_args()
+
+    baseline = args.baseline or subprocess.run(
+        ["git", "rev-list", "--max-parents=0", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.split()[0]
+    with tempfile.TemporaryDirectory(prefix="bench_startup_baseline_") as baseline_dir:
+        source = subprocess.run(
+            ["git", "show", f"{baseline}:mark8.py"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        with open(os.path.join(baseline_dir, "mark8_baseline.py"), "w", encoding="utf-8") as f:
+            f.write(source)
+
+        report("baseline", [probe(baseline_dir, "mark8_baseline") for _ in range(args.runs)])
+    report("current", [probe(os.path.abspath(ROOT), "mark8") for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""STT latency, throughput and real-time factor: blocking recognition vs the SttPool, unbatched and batched.
+
+Every WAV in --fixtures is sent --repeat times as concurrent requests; the
+default fixtures are recorded 16 kHz mono speech, 1 to 7 seconds long (see
+benchmarks/fixtures/stt/README.md). The legacy path mirrors the old
+VoiceService.speech_to_text: one recognizer in the server process, called
+on the event loop, so requests serialise. The pool paths send the same
+requests through SttPool, once with batching off (--batch-size 1) and once
+batched. --render benchmarks utterances synthesised with --tts-engine
+instead of the recordings. The stub STT engine needs no model; for real
+numbers point --engine vosk at a Vosk model.
+
+    python benchmarks/bench_stt.py --repeat 4 --workers 2
+    python benchmarks/bench_stt.py --engine vosk --model models/vosk-model-small-en-us-0.15
+    python benchmarks/bench_stt.py --render --tts-engine pyttsx3
+"""
+import argparse
+import asyncio
+import glob
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.services.stt import SttPool, create_engine, to_pcm, pcm_duration  # noqa: E402
+from app.services.tts import TtsPool, VoiceSettings  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "stt")
+UTTERANCES = [
+    "What is the weather like today?",
+    "Open my documents folder.",
+    "Search the web for the latest news about renewable energy.",
+    "Remind me to call the dentist tomorrow morning.",
+    "How many kilometres are there in a mile?",
+    "Summarise the file I uploaded this afternoon and tell me the three most important points.",
+]
+
+
+async def render_utterances(tts_engine):
+    pool = TtsPool(engine=tts_engine, workers=1)
+    try:
+        return [(await pool.synthesize(text, VoiceSettings()))[0] for text in UTTERANCES]
+    finally:
+        pool.close(wait=True)
+
+
+def load_fixtures(directory):
+    paths = sorted(glob.glob(os.path.join(directory, "*.wav")))
+    clips = []
+    for path in paths:
+        with open(path, "rb") as f:
+            clips.append(f.read())
+    return clips
+
+
+def report(label, latencies, elapsed, audio_seconds, rtf):
+    print(
+        f"{label:<24} latency p50 {statistics.median(latencies) * 1000:7.0f}ms  max {max(latencies) * 1000:7.0f}ms   "
+        f"total {elapsed:6.2f}s   {audio_seconds / elapsed:6.1f} audio s/s   RTF {rtf:.3f}"
+    )
+
+
+async def bench_legacy(clips, engine_name, engine_options):
+    engine = create_engine(engine_name, **engine_options)
+    # Decoding and recognising on the event loop, as the old speech_to_text did
+    start = time.perf_counter()
+    latencies = []
+    audio_seconds = 0.0
+    for clip in clips:
+        pcm = to_pcm((clip, 0))
+        engine.transcribe_batch([pcm])
+        audio_seconds += pcm_duration(pcm)
+        latencies.append(time.perf_counter() - start)
+    elapsed = time.perf_counter() - start
+    report("blocking recognizer", latencies, elapsed, audio_seconds, elapsed / audio_seconds)
+
+
+async def bench_pool(clips, engine_name, engine_options, workers, batch_size, batch_window):
+    pool = SttPool(engine=engine_name, workers=workers, batch_size=batch_size, batch_window=batch_window,
+                   engine_options=engine_options)
+    try:
+        # Start the worker processes and load their models so start-up is not counted
+        await asyncio.gather(*(pool.transcribe(clips[0]) for _ in range(workers)))
+        pool.stats.update(requests=0, batches=0, audio_seconds=0.0, processing_seconds=0.0)
+        start = time.perf_counter()
+
+        async def request(clip):
+            result = await pool.transcribe(clip)
+            if not result["success"]:
+                print(f"  failed: {result['error']}")
+            return time.perf_counter() - start
+
+        latencies = await asyncio.gather(*(request(clip) for clip in clips))
+        stats = pool.get_stats()
+        label = f"pool, batches of {batch_size}" if batch_size > 1 else "pool, unbatched"
+        report(label, latencies, time.perf_counter() - start, stats["audio_seconds"], stats["rtf"])
+        print(f"{'':<24} {stats['batches']} batches for {stats['requests']} requests")
+    finally:
+        pool.close(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", default=FIXTURES, help="Directory of recorded WAV utterances")
+    parser.add_argument("--render", action="store_true", help="Synthesise utterances with --tts-engine instead")
+    parser.add_argument("--repeat", type=int, default=4, help="Times each fixture is sent")
+    parser.add_argument("--engine", default="stub", help="STT engine: stub, vosk or google")
+    parser.add_argument("--model", help="Vosk model directory")
+    parser.add_argument("--tts-engine", default="pyttsx3", help="TTS engine used by --render: pyttsx3 or stub")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--batch-window", type=float, default=0.02)
+    args = parser.parse_args()
+
+    engine_options = {"model_path": args.model} if args.engine == "vosk" else {}
+    if args.render:
+        print(f"Rendering {len(UTTERANCES)} utterances with the {args.tts_engine} TTS engine")
+        fixtures = asyncio.run(render_utterances(args.tts_engine))
+    else:
+        fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        sys.exit(f"No WAV fixtures in {args.fixtures}; pass --render to synthesise utterances instead")
+    clips = fixtures * args.repeat
+    print(f"{len(clips)} requests ({len(fixtures)} fixtures x {args.repeat}), {args.engine} engine, {os.cpu_count()} CPUs")
+    asyncio.run(bench_legacy(clips, args.engine, engine_options))
+    asyncio.run(bench_pool(clips, args.engine, engine_options, args.workers, 1, args.batch_window))
+    asyncio.run(bench_pool(clips, args.engine, engine_options, args.workers, args.batch_size, args.batch_window))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Latency of summarising N search results: sequential chat calls vs AdvancedAIService.summarize.
+
+Uses the offline fake LLM (FAKE_LLM=true), so each LLM call costs a fixed
+token delay. The legacy path awaits ai_service.chat() once per result, as
+/web/search used to, which also writes every summary into a chat session.
+The new path gathers ai_service.summarize() for all results, then repeats
+the run to show content-hash cache hits.
+
+    python benchmarks/bench_summaries.py --results 5 --token-delay 0.02
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+
+async def main_async(args):
+    from app.services.ai_service import AdvancedAIService
+    ai_service = AdvancedAIService()
+    texts = [f"Search result {i} talks about retrieval, caching and latency. " * 40 for i in range(args.results)]
+
+    start = time.perf_counter()
+    for text in texts:
+        await ai_service.chat(f"Summarize this web content in 2-3 sentences: {text[:1000]}", "web_search")
+    print(f"sequential chat()      {time.perf_counter() - start:6.2f}s")
+
+    for label in ("concurrent summarize()", "cached summarize()"):
+        start = time.perf_counter()
+        await asyncio.gather(*(ai_service.summarize(text) for text in texts))
+        print(f"{label:<22} {time.perf_counter() - start:6.2f}s")
+
+    print(f"summary stats: {ai_service.get_stats()['summaries']}")
+    await ai_service.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--results", type=int, default=5)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    os.environ.update(
+        FAKE_LLM="true",
+        FAKE_LLM_TOKEN_DELAY=str(args.token_delay),
+        MEMORY_SPILL_BACKEND="local",
+        RESPONSE_CACHE_ENABLED="false"
+    )
+    # The service keeps its knowledge base and caches relative to the working directory
+    os.chdir(tempfile.mkdtemp(prefix="bench_summaries_"))
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Throughput of the extractive summariser vs the desktop app's summarize_file loop.
+
+The legacy path is the word-frequency loop mark8.py used before: dict
+counts with .keys() lookups, then every sentence re-tokenised and scored
+word by word. It uses nltk's tokenizers and stop words when nltk (with its
+punkt and stopwords data) is installed, and the closest stand-ins
+otherwise. The new path is app.services.summarizer with centroid and
+TextRank scoring.
+Pass --file to summarise your own text files; otherwise article-like text
+of --size MB is generated. Reports MB/s on one core for each path.
+
+    python benchmarks/bench_summarizer.py --size 2
+    python benchmarks/bench_summarizer.py --file book.txt --sentences 7
+"""
+import argparse
+import heapq
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.services.summarizer import METHOD_CENTROID, METHOD_TEXTRANK, summarize  # noqa: E402
+
+TOPICS = [
+    "retrieval index embedding vector search nearest neighbour recall".split(),
+    "speech audio voice microphone transcription latency stream".split(),
+    "crawler page link robots host politeness frontier".split(),
+    "cache memory eviction entry hit miss disk".split(),
+]
+FILLER = "the a of to and in is that for with as on it this by are be from".split()
+
+
+def generate_text(rng, size):
+    sentences, total = [], 0
+    while total < size:
+        topic = rng.choice(TOPICS)
+        words = [rng.choice(topic if rng.random() < 0.6 else FILLER) for _ in range(rng.randint(8, 24))]
+        sentence = " ".join(words).capitalize() + "."
+        sentences.append(sentence)
+        total += len(sentence) + 1
+    return "\n\n".join(" ".join(sentences[i:i + 5]) for i in range(0, len(sentences), 5))
+
+
+def legacy_tokenizers():
+    """nltk's tokenizers and stop words as mark8.py used them, falling back as far as what is installed allows"""
+    sentence_pattern = re.compile(r"(?<=[.!?])\s+")
+    try:
+        import nltk
+    except ImportError:
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        word_pattern = re.compile(r"\w+|[^\w\s]")
+        return set(ENGLISH_STOP_WORDS), word_pattern.findall, sentence_pattern.split, "regex"
+
+    try:
+        from nltk.corpus import stopwords
+        stop_words = set(stopwords.words('english'))
+    except LookupError:
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        stop_words = set(ENGLISH_STOP_WORDS)
+    try:
+        nltk.sent_tokenize("Probe.")
+        return stop_words, nltk.word_tokenize, nltk.sent_tokenize, "nltk"
+    except LookupError:
+        # Without the punkt models word_tokenize is the Treebank tokenizer applied per sentence
+        treebank = nltk.tokenize.TreebankWordTokenizer()
+
+        def word_tokenize(text):
+            return [token for sentence in sentence_pattern.split(text) for token in treebank.tokenize(sentence)]
+
+        return stop_words, word_tokenize, sentence_pattern.split, "nltk treebank, regex sentences"
+
+
+def legacy_summarize(text, sentences, stop_words, word_tokenize, sent_tokenize):
+    """summarize_file's scoring loop, as it was in mark8.py"""
+    word_frequencies = {}
+    for word in word_tokenize(text):
+        if word not in stop_words:
+            if word not in word_frequencies.keys():
+                word_frequencies[word] = 1
+            else:
+                word_frequencies[word] += 1
+
+    maximum_frequencies = max(word_frequencies.values())
+
+    for word in word_frequencies.keys():
+        word_frequencies[word] = word_frequencies[word] / maximum_frequencies
+
+    sentence_scores = {}
+    for sent in sent_tokenize(text):
+        for word in word_tokenize(sent.lower()):
+            if word in word_frequencies.keys():
+                if sent not in sentence_scores.keys():
+                    sentence_scores[sent] = word_frequencies[word]
+                else:
+                    sentence_scores[sent] += word_frequencies[word]
+
+    return ' '.join(heapq.nlargest(sentences, sentence_scores, key=sentence_scores.get))
+
+
+def timed(label, size, run, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        summary = run()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<22} {best * 1000:9.1f}ms  {size / 1e6 / best:7.2f} MB/s  summary {len(summary)} chars")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=float, default=2.0, help="MB of generated text when --file is not given")
+    parser.add_argument("--file", action="append", help="Text file to summarise (repeatable)")
+    parser.add_argument("--sentences", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.file:
+        texts = []
+        for path in args.file:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                texts.append(f.read())
+    else:
+        texts = [generate_text(random.Random(0), int(args.size * 1e6))]
+
+    stop_words, word_tokenize, sent_tokenize, tokenizers = legacy_tokenizers()
+    for text in texts:
+        size = len(text.encode("utf-8"))
+        print(f"Text: {size / 1e6:.2f} MB, legacy tokenizers: {tokenizers}")
+        timed("legacy summarize_file", size, lambda: legacy_summarize(
+            text, args.sentences, stop_words, word_tokenize, sent_tokenize), args.repeat)
+        for method in (METHOD_CENTROID, METHOD_TEXTRANK):
+            timed(f"summarizer {method}", size, lambda: summarize(text, args.sentences, method), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""TTS throughput and time to first audio: one shared engine vs the TtsPool worker processes.
+
+Uses the offline stub engine, which renders a tone at a fixed CPU cost
+per second of audio (--render-factor), so no speech driver is needed.
+The legacy path mirrors the old VoiceService.text_to_speech: one engine
+in the server process that renders each whole text while blocking the
+event loop, so concurrent requests serialise. The pool path streams each
+request sentence by sentence from TtsPool. For --requests concurrent
+requests it reports the time to each request's first audio byte,
+the total wall time and audio seconds rendered per wall second.
+
+    python benchmarks/bench_tts.py --requests 8 --sentences 6 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.services.tts import StubEngine, TtsPool, VoiceSettings, read_wav, audio_duration  # noqa: E402
+
+VOICE = VoiceSettings(rate=150)
+
+
+def make_text(request, sentences):
+    return " ".join(f"Request {request} says sentence {i}, which is about a dozen words long." for i in range(sentences))
+
+
+def report(label, first_bytes, elapsed, audio_seconds):
+    print(
+        f"{label:<22} first audio p50 {statistics.median(first_bytes) * 1000:7.0f}ms  "
+        f"max {max(first_bytes) * 1000:7.0f}ms   total {elapsed:6.2f}s   "
+        f"{audio_seconds / elapsed:6.1f} audio s/s"
+    )
+
+
+async def bench_legacy(texts, render_factor):
+    engine = StubEngine(render_factor=render_factor)
+    lock = asyncio.Lock()
+    start = time.perf_counter()
+
+    async def request(text):
+        async with lock:
+            # Rendering the whole text blocks the event loop, as the shared pyttsx3 engine did
+            params, frames = read_wav(engine.synthesize(text, VOICE))
+        return time.perf_counter() - start, audio_duration(params, len(frames))
+
+    results = await asyncio.gather(*(request(text) for text in texts))
+    report("shared engine", [first for first, _ in results], time.perf_counter() - start, sum(d for _, d in results))
+
+
+async def bench_pool(texts, render_factor, workers):
+    pool = TtsPool(engine="stub", workers=workers, engine_options={"render_factor": render_factor})
+    try:
+        # Start the worker processes so their start-up is not counted
+        await asyncio.gather(*(pool.synthesize("Warm up.", VOICE) for _ in range(workers)))
+        pool.stats.update(requests=0, chunks=0, audio_seconds=0.0)
+        start = time.perf_counter()
+
+        async def request(text):
+            first = None
+            async for _ in pool.iter_audio(text, VOICE):
+                first = first or time.perf_counter() - start
+            return first
+
+        first_bytes = await asyncio.gather(*(request(text) for text in texts))
+        report(f"pool, {workers} workers", first_bytes, time.perf_counter() - start, pool.stats["audio_seconds"])
+    finally:
+        pool.close(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=8, help="Concurrent TTS requests")
+    parser.add_argument("--sentences", type=int, default=6, help="Sentences per request")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--render-factor", type=float, default=0.05, help="Stub CPU seconds per audio second")
+    args = parser.parse_args()
+
+    texts = [make_text(i, args.sentences) for i in range(args.requests)]
+    print(f"{args.requests} requests x {args.sentences} sentences, render factor {args.render_factor}, {os.cpu_count()} CPUs")
+    asyncio.run(bench_legacy(texts, args.render_factor))
+    asyncio.run(bench_pool(texts, args.render_factor, args.workers))
+
+
+if __name__ == "__main__":
+    main()
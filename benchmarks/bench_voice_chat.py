@@ -0,0 +1,156 @@
+"""End-to-end voice latency: the sequential /chat/voice flow vs the WebSocket voice pipeline.
+
+Both paths use the stub STT and TTS engines and a simulated LLM that
+streams --reply-words words at --words-per-second, so no models or API
+keys are needed. Latency is measured from the end of the user's speech to
+the first byte of reply audio. The sequential path mirrors /chat/voice:
+the whole recording is transcribed, the whole reply generated, then the
+speech streamed sentence by sentence. The pipeline path feeds the same
+speech in real time, as 20 ms PCM frames, to a VoiceSession; its latency
+includes the silence the voice activity detector waits for
+(--end-silence-ms) before it ends the utterance.
+
+    python benchmarks/bench_voice_chat.py --turns 5 --words-per-second 30
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.core.config import settings  # noqa: E402
+from app.services.stt import SttPool  # noqa: E402
+from app.services.tts import TtsPool, wav_header  # noqa: E402
+
+SAMPLE_RATE = 16000
+FRAME_BYTES = SAMPLE_RATE * 20 // 1000 * 2
+
+
+def speech(seconds, silence):
+    """A voiced tone followed by quiet noise, as 16-bit mono PCM"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    voiced = (np.sin(2 * np.pi * 200 * t) * 6000).astype("<i2").tobytes()
+    quiet = (np.random.default_rng(0).standard_normal(int(silence * SAMPLE_RATE)) * 50).astype("<i2").tobytes()
+    return voiced, quiet
+
+
+class SimulatedChat:
+    def __init__(self, words, words_per_second):
+        self.words = words
+        self.delay = 1 / words_per_second
+
+    async def chat_stream(self, message, session_id, context=None):
+        sentences = ["That is a good question.", "Here is what I found about it.", "The details follow in a moment."]
+        words = " ".join(sentences[i % len(sentences)] for i in range(self.words)).split()[:self.words]
+        reply = ""
+        for word in words:
+            await asyncio.sleep(self.delay)
+            reply += word + " "
+            yield {"type": "chat_delta", "content": word + " "}
+        yield {"type": "chat_done", "content": reply}
+
+    async def chat(self, message, session_id, context=None):
+        reply = ""
+        async for frame in self.chat_stream(message, session_id, context):
+            if frame["type"] == "chat_done":
+                reply = frame["content"]
+        return {"response": reply}
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.first_audio = None
+        self.done = asyncio.Event()
+
+    async def send_text(self, text):
+        if '"voice_done"' in text:
+            self.done.set()
+
+    async def send_bytes(self, data):
+        self.first_audio = self.first_audio or time.perf_counter()
+
+
+async def bench_sequential(voice_service, chat, voiced, quiet, turns):
+    latencies = []
+    for _ in range(turns):
+        recording = voiced + quiet[:SAMPLE_RATE // 5]
+        start = time.perf_counter()
+        result = await voice_service.stt.transcribe(wav_header(1, 2, SAMPLE_RATE, len(recording)) + recording)
+        reply = await chat.chat(result["text"], "bench")
+        stream = voice_service.stream_speech(reply["response"])
+        await stream.__anext__()  # header
+        await stream.__anext__()  # first sentence
+        latencies.append(time.perf_counter() - start)
+        await stream.aclose()
+    return latencies
+
+
+async def bench_pipeline(voice_service, chat, voiced, quiet, turns):
+    from app.api.voice_chat import VoiceSession
+    latencies = []
+    for _ in range(turns):
+        socket = RecordingSocket()
+        session = VoiceSession(socket, "bench", chat, voice_service)
+        session.start(SAMPLE_RATE)
+        audio = voiced + quiet
+        speech_end = None
+        started = time.perf_counter()
+        for offset in range(0, len(audio), FRAME_BYTES):
+            # Real time: each frame is sent when it would have been recorded
+            await asyncio.sleep(max(0.0, started + offset / (2 * SAMPLE_RATE) - time.perf_counter()))
+            if offset >= len(voiced) and speech_end is None:
+                speech_end = time.perf_counter()
+            await session.feed(audio[offset:offset + FRAME_BYTES])
+        await socket.done.wait()
+        latencies.append(socket.first_audio - speech_end)
+        session.close()
+    return latencies
+
+
+def report(label, latencies):
+    print(f"{label:<22} speech end to first audio p50 {statistics.median(latencies) * 1000:7.0f}ms  "
+          f"max {max(latencies) * 1000:7.0f}ms")
+
+
+async def run(args):
+    settings.TTS_CACHE_ENABLED = False
+    settings.VAD_END_SILENCE_MS = args.end_silence_ms
+    from app.services.voice_service import VoiceService
+    voice_service = VoiceService(
+        tts=TtsPool(engine="stub", workers=args.workers),
+        stt=SttPool(engine="stub", workers=args.workers)
+    )
+    chat = SimulatedChat(args.reply_words, args.words_per_second)
+    voiced, quiet = speech(args.speech_seconds, args.end_silence_ms / 1000 + 0.5)
+    try:
+        # Start the worker processes so their start-up is not counted
+        await voice_service.text_to_speech("Warm up.")
+        await voice_service.stt.transcribe(voiced, SAMPLE_RATE)
+        report("sequential", await bench_sequential(voice_service, chat, voiced, quiet, args.turns))
+        report("websocket pipeline", await bench_pipeline(voice_service, chat, voiced, quiet, args.turns))
+    finally:
+        voice_service.tts.close(wait=True)
+        voice_service.stt.close(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--speech-seconds", type=float, default=2.0)
+    parser.add_argument("--reply-words", type=int, default=60)
+    parser.add_argument("--words-per-second", type=float, default=30.0, help="Simulated LLM streaming speed")
+    parser.add_argument("--end-silence-ms", type=int, default=settings.VAD_END_SILENCE_MS)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    print(f"{args.turns} turns, {args.speech_seconds}s of speech, {args.reply_words}-word replies "
+          f"at {args.words_per_second} words/s, {os.cpu_count()} CPUs")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,26 +5,112 @@ import webbrowser
 import os
 from tkinter import filedialog
 import PyPDF2
-import nltk
 import subprocess
 import win32com.client
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import pyttsx3
 import speech_recognition as sr
 import threading
 import asyncio
+import hashlib
 from collections import defaultdict
 import pickle
 import numpy as np
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, AutoModelForQuestionAnswering, pipeline
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
 
 # Set the appearance mode and color theme
 customtkinter.set_appearance_mode("dark")
 customtkinter.set_default_color_theme("blue")
 
+# Models are loaded on a background thread once the window is up
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+QA_MODEL = "deepset/roberta-base-squad2"
+
+# Retrieve-then-read question answering over the knowledge base
+QA_CHUNK_WORDS = 200  # Words per knowledge base chunk, well inside the reader's window
+QA_CHUNK_OVERLAP = 50  # Words shared by neighbouring chunks so answers are not cut in half
+QA_TOP_K = 4  # Chunks retrieved by embedding and read per question
+QA_BATCH_SIZE = 8  # Chunks per reader forward pass
+QA_MAX_LENGTH = 384  # Tokens of question plus chunk given to the reader
+QA_MAX_ANSWER_TOKENS = 30
+
+def chunk_text(text, size=QA_CHUNK_WORDS, overlap=QA_CHUNK_OVERLAP):
+    words = text.split()
+    step = size - overlap
+    return [" ".join(words[start:start + size]) for start in range(0, max(len(words) - overlap, 1), step)]
+
+class EmbeddingIndex:
+    """Unit-normalised sentence embeddings of knowledge base chunks, one row per chunk.
+
+    Only chunks that are new or whose text changed are encoded, in one
+    batch, and the matrix is saved next to cache.pkl so a restart does not
+    re-encode anything. A search is one matrix-vector product.
+    """
+
+    def __init__(self, path, encode, model_name):
+        self.path = path
+        self.encode = encode
+        self.model_name = model_name
+        self.keys = []
+        self.digests = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                if str(data["model"]) != self.model_name:
+                    return
+                self.keys = data["keys"].tolist()
+                self.digests = data["digests"].tolist()
+                self.matrix = data["matrix"]
+        except Exception as e:
+            print(f"Ignoring unreadable embedding index: {e}")
+
+    def save(self):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(
+                f,
+                model=np.array(self.model_name),
+                keys=np.array(self.keys, dtype=str),
+                digests=np.array(self.digests, dtype=str),
+                matrix=self.matrix
+            )
+        os.replace(temp_path, self.path)
+
+    def _embed(self, texts):
+        vectors = np.asarray(self.encode(texts), dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    def sync(self, chunks):
+        """Bring the matrix in line with chunks, encoding only new or changed ones"""
+        wanted = {key: hashlib.sha1(text.encode("utf-8")).hexdigest() for key, text in chunks.items()}
+        if wanted == dict(zip(self.keys, self.digests)):
+            return
+
+        keep = [i for i, key in enumerate(self.keys) if wanted.get(key) == self.digests[i]]
+        kept_keys = {self.keys[i] for i in keep}
+        stale = [key for key in wanted if key not in kept_keys]
+        rows = [self.matrix[keep]] if keep else []
+        if stale:
+            rows.append(self._embed([chunks[key] for key in stale]))
+
+        self.keys = [self.keys[i] for i in keep] + stale
+        self.digests = [wanted[key] for key in self.keys]
+        self.matrix = np.vstack(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+        self.save()
+
+    def search(self, query, k=1):
+        """(key, cosine similarity) of the k entries closest to query, best first"""
+        if not self.keys:
+            return []
+        scores = self.matrix @ self._embed([query])[0]
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.keys[i], float(scores[i])) for i in top]
+
 class DariusAI(customtkinter.CTk):
     def __init__(self):
         super().__init__()
@@ -76,22 +162,27 @@ class DariusAI(customtkinter.CTk):
         self.engine.setProperty("voice", self.voices[1].id)  # Setting the voice to female
         self.shell = win32com.client.Dispatch("WScript.Shell")
         self.knowledge_base = defaultdict(str)
+        self.chunks = {}
 
         # Initialize Speech Recognizer
         self.recognizer = sr.Recognizer()
 
-        # Initialize Machine Learning Models
-        self.tokenizer = AutoTokenizer.from_pretrained("bert-base-uncased")
-        self.qa_model = AutoModelForQuestionAnswering.from_pretrained("deepset/roberta-base-squad2")
-        self.qa_pipeline = pipeline("question-answering", model=self.qa_model, tokenizer=self.tokenizer)
-        self.text_classifier = AutoModelForSequenceClassification.from_pretrained("bert-base-uncased", num_labels=2)
-        self.sentence_transformer = SentenceTransformer('all-MiniLM-L6-v2')
-
         # Initialize cache
         self.cache_dir = "cache"
         os.makedirs(self.cache_dir, exist_ok=True)
+        self.embedding_index = EmbeddingIndex(os.path.join(self.cache_dir, "embeddings.npz"), self.encode, EMBEDDING_MODEL)
+        self.index_lock = threading.Lock()
+        self.embedder_ready = threading.Event()
+        self.models_ready = threading.Event()
+        self.model_error = None
         self.load_cache()
 
+        # Initialize Machine Learning Models in the background, so the window does not wait for them
+        self.status_label = customtkinter.CTkLabel(self.sidebar_frame, text="Loading models...", text_color="orange")
+        self.status_label.pack(side="bottom", pady=10, padx=10)
+        threading.Thread(target=self._load_models, daemon=True).start()
+        self.after(200, self._poll_models)
+
         # Set initial conversation text
         self.insert_text("DariusAI: Hello, I'm DariusAI, your personal assistant inspired by J.A.R.V.I.S. from Iron Man.\n")
         self.insert_text("DariusAI: You can give me voice commands, and I'll respond accordingly.\n")
@@ -103,16 +194,94 @@ class DariusAI(customtkinter.CTk):
         self.insert_text("DariusAI: - Open folders, files, and applications\n")
         self.insert_text("DariusAI: To stop me, just say 'stop'.\n")
 
+    def _load_models(self):
+        try:
+            from sentence_transformers import SentenceTransformer
+            self.sentence_transformer = SentenceTransformer(EMBEDDING_MODEL)
+            self.embedder_ready.set()
+            # Encode anything learned before the embedder was available
+            self.sync_index()
+
+            from transformers import AutoTokenizer, AutoModelForQuestionAnswering
+            self.tokenizer = AutoTokenizer.from_pretrained(QA_MODEL)
+            self.qa_model = AutoModelForQuestionAnswering.from_pretrained(QA_MODEL)
+        except Exception as e:
+            self.model_error = e
+        finally:
+            self.models_ready.set()
+
+    def _poll_models(self):
+        # Tk widgets are only touched from the main thread
+        if not self.models_ready.is_set():
+            self.after(200, self._poll_models)
+        elif self.model_error is not None:
+            self.status_label.configure(text="Models failed to load", text_color="red")
+            self.insert_text(f"DariusAI: I couldn't load my models: {self.model_error}\n")
+        else:
+            self.status_label.configure(text="Models ready", text_color="green")
+
     def load_cache(self):
         cache_file = os.path.join(self.cache_dir, "cache.pkl")
         if os.path.exists(cache_file):
             with open(cache_file, "rb") as f:
                 self.knowledge_base = pickle.load(f)
+        self.sync_index()
 
     def save_cache(self):
         cache_file = os.path.join(self.cache_dir, "cache.pkl")
         with open(cache_file, "wb") as f:
             pickle.dump(self.knowledge_base, f)
+        self.sync_index()
+
+    def sync_index(self):
+        # Until the embedder has loaded, the loader thread syncs once it is available
+        if not self.embedder_ready.is_set():
+            return
+        with self.index_lock:
+            chunks = {
+                f"{key}#{i}": chunk
+                for key, text in list(self.knowledge_base.items()) if isinstance(text, str) and text.strip()
+                for i, chunk in enumerate(chunk_text(text))
+            }
+            self.embedding_index.sync(chunks)
+            # Published only once the index holds the same keys
+            self.chunks = chunks
+
+    def encode(self, texts):
+        return self.sentence_transformer.encode(texts, batch_size=32, show_progress_bar=False)
+
+    def read_chunks(self, question, contexts):
+        """Best answer span across contexts and its probability, reading QA_BATCH_SIZE chunks per forward pass"""
+        import torch
+
+        best_answer, best_score = "", 0.0
+        for start in range(0, len(contexts), QA_BATCH_SIZE):
+            batch = contexts[start:start + QA_BATCH_SIZE]
+            inputs = self.tokenizer(
+                [question] * len(batch), batch,
+                truncation="only_second", max_length=QA_MAX_LENGTH, padding=True,
+                return_offsets_mapping=True, return_tensors="pt"
+            )
+            offsets = inputs.pop("offset_mapping").numpy()
+            # Answers may only start and end inside the chunk, never in the question or padding
+            in_context = np.array([[sequence == 1 for sequence in inputs.sequence_ids(row)] for row in range(len(batch))])
+            with torch.no_grad():
+                outputs = self.qa_model(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"])
+
+            def probabilities(logits):
+                logits = np.where(in_context, logits.numpy(), -np.inf)
+                exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+                return exp / exp.sum(axis=1, keepdims=True)
+
+            # Joint probability of every span that runs forward and is at most QA_MAX_ANSWER_TOKENS long
+            spans = probabilities(outputs.start_logits)[:, :, None] * probabilities(outputs.end_logits)[:, None, :]
+            spans = np.triu(spans) - np.triu(spans, QA_MAX_ANSWER_TOKENS)
+            for row, index in enumerate(spans.reshape(len(batch), -1).argmax(axis=1)):
+                answer_start, answer_end = divmod(int(index), spans.shape[2])
+                if spans[row, answer_start, answer_end] > best_score:
+                    best_score = float(spans[row, answer_start, answer_end])
+                    best_answer = batch[row][offsets[row, answer_start, 0]:offsets[row, answer_end, 1]]
+        return best_answer, best_score
 
     def on_text_modified(self, event=None):
         self.update_ui = True
@@ -216,53 +385,23 @@ class DariusAI(customtkinter.CTk):
 
     def summarize_file(self, file_path):
         try:
+            # Check if summary is already cached
+            if file_path in self.knowledge_base:
+                return self.knowledge_base[file_path]
+
             with open(file_path, 'rb') as file:
                 if file_path.endswith('.pdf'):
                     pdf_reader = PyPDF2.PdfReader(file)
-                    text = ''
-                    for page in range(len(pdf_reader.pages)):
-                        text += pdf_reader.pages[page].extract_text()
+                    text = ''.join(page.extract_text() for page in pdf_reader.pages)
                 else:
                     text = file.read().decode('utf-8')
 
-            # Check if summary is already cached
-            if file_path in self.knowledge_base:
-                summary = self.knowledge_base[file_path]
-            else:
-                from nltk.corpus import stopwords
-                from nltk.tokenize import word_tokenize, sent_tokenize
-                import heapq
-
-                stop_words = set(stopwords.words('english'))
-
-                word_frequencies = {}
-                for word in word_tokenize(text):
-                    if word not in stop_words:
-                        if word not in word_frequencies.keys():
-                            word_frequencies[word] = 1
-                        else:
-                            word_frequencies[word] += 1
-
-                maximum_frequencies = max(word_frequencies.values())
-
-                for word in word_frequencies.keys():
-                    word_frequencies[word] = word_frequencies[word] / maximum_frequencies
-
-                sentence_scores = {}
-                for sent in sent_tokenize(text):
-                    for word in word_tokenize(sent.lower()):
-                        if word in word_frequencies.keys():
-                            if sent not in sentence_scores.keys():
-                                sentence_scores[sent] = word_frequencies[word]
-                            else:
-                                sentence_scores[sent] += word_frequencies[word]
-
-                summary_sentences = heapq.nlargest(7, sentence_scores, key=sentence_scores.get)
-                summary = ' '.join(summary_sentences)
-                print(f"Summary for file {file_path.split('/')[-1]}:")
-                print(summary)
-                self.knowledge_base[file_path] = summary
-                self.save_cache()
+            from backend.app.services.summarizer import summarize as extractive_summary
+            summary = extractive_summary(text, max_sentences=7)
+            print(f"Summary for file {file_path.split('/')[-1]}:")
+            print(summary)
+            self.knowledge_base[file_path] = summary
+            self.save_cache()
 
             return summary
         except Exception as e:
@@ -270,21 +409,28 @@ class DariusAI(customtkinter.CTk):
             return ""
 
     def answer_query(self, query):
-        # Use question-answering pipeline
-        context = " ".join(self.knowledge_base.values())
-        result = self.qa_pipeline(question=query, context=context)
-
-        if result['score'] >= 0.5:
-            self.speak(f"Based on my knowledge, here is my answer: {result['answer']}")
-            self.insert_text(f"DariusAI: {result['answer']}\n")
+        if not self.models_ready.is_set():
+            self.speak("My models are still loading. Please ask me again in a moment.")
+            self.insert_text("DariusAI: My models are still loading. Please ask me again in a moment.\n")
+            return
+        if self.model_error is not None:
+            self.speak("I can't answer questions because my models failed to load.")
+            self.insert_text(f"DariusAI: I can't answer questions because my models failed to load: {self.model_error}\n")
+            return
+
+        # Retrieve the most relevant chunks by embedding, then run the reader over only those.
+        # Keys and texts are read under the lock, so a concurrent sync cannot swap one without the other
+        with self.index_lock:
+            matches = [(key, score, self.chunks[key]) for key, score in self.embedding_index.search(query, k=QA_TOP_K)]
+        answer, score = self.read_chunks(query, [text for _, _, text in matches])
+
+        if score >= 0.5:
+            self.speak(f"Based on my knowledge, here is my answer: {answer}")
+            self.insert_text(f"DariusAI: {answer}\n")
         else:
-            # Compute semantic similarity using sentence transformers
-            query_embedding = self.sentence_transformer.encode([query])[0]
-            knowledge_embeddings = [self.sentence_transformer.encode([text])[0] for text in self.knowledge_base.values()]
-            similarities = [cosine_similarity([query_embedding], [knowledge_embedding])[0][0] for knowledge_embedding in knowledge_embeddings]
-
-            if max(similarities) > 0.5:
-                most_relevant_text = self.knowledge_base.values()[np.argmax(similarities)]
+            # Fall back to the closest chunk itself
+            if matches and matches[0][1] > 0.5:
+                most_relevant_text = matches[0][2]
                 self.speak(f"Based on my knowledge, here is the most relevant information: {most_relevant_text}")
                 self.insert_text(f"DariusAI: {most_relevant_text}\n")
             else: